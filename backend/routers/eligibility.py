@@ -1,6 +1,7 @@
 from fastapi import APIRouter
 from pydantic import BaseModel
-from services import snowflake_service
+import numpy as np
+from services import grant_catalog, snowflake_service
 
 router = APIRouter()
 
@@ -10,41 +11,57 @@ class UserProfile(BaseModel):
     citizenship: str
     student: bool
     residency: str = None
+    organization_type: str = None
 
 @router.post("/")
-def check_eligibility(profile: UserProfile):
+async def check_eligibility(profile: UserProfile):
     """
     Check eligibility based on user profile
-    Returns grants that match basic criteria
+    Returns open grants whose eligibility criteria the profile meets,
+    limited to grants aimed at the profile (students, youth, newcomers)
     """
-    # Build search keywords based on profile
-    keywords = []
+    catalog = await snowflake_service.run_blocking(grant_catalog.get_catalog)
+    
+    # Hard filters: precomputed criteria masks
+    eligible = catalog.open_mask() & catalog.eligible_mask(
+        age=profile.age,
+        student=profile.student,
+        income=profile.income,
+        residency=profile.residency or None,
+        org_type=profile.organization_type,
+    )
+    
+    # Grants aimed at this profile
+    focus = []
     if profile.student:
-        keywords.append("student")
+        focus.append(catalog.text_mask("student"))
     if profile.age < 30:
-        keywords.append("youth")
+        focus.append(catalog.text_mask("youth"))
     if profile.citizenship != "Canadian":
-        keywords.append("immigrant")
+        focus.append(catalog.newcomer)
     
-    # Search for matching grants
-    all_grants = []
-    if keywords:
-        for keyword in keywords:
-            grants = snowflake_service.get_grants(limit=50, keyword=keyword)
-            all_grants.extend(grants)
-    else:
-        all_grants = snowflake_service.get_grants(limit=20)
+    matched = eligible & np.logical_or.reduce(focus) if focus else eligible
     
     # Remove duplicates based on program_name
     seen = set()
     unique_grants = []
-    for grant in all_grants:
+    for i in np.flatnonzero(matched):
+        grant = catalog.grants[i]
         if grant["program_name"] not in seen:
             seen.add(grant["program_name"])
-            unique_grants.append(grant)
+            unique_grants.append({
+                "program_name": grant["program_name"],
+                "funding_low": grant["funding_low"],
+                "funding_high": grant["funding_high"],
+                "description": grant["description"],
+                "eligibility": grant["eligibility"],
+                "deadline": grant["deadline"],
+                "url": grant["url"],
+                "source": grant["source"],
+            })
     
     return {
         "user": profile.dict(),
         "eligible_grants": unique_grants[:20],
         "total_found": len(unique_grants)
-    }
\ No newline at end of file
+    }
@@ -1,50 +1,98 @@
-from fastapi import APIRouter
-from services.matching_service import match_user_to_grants
-from services import snowflake_service
+from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
+from services.matching_service import cached_rank_user_grants, format_match
+from services import grant_catalog, match_pages, match_precompute, match_stream, snowflake_service
 
 router = APIRouter()
 
+
+def _resolve(cursor, catalog, owner):
+    try:
+        return match_pages.resolve_cursor(cursor, catalog.version, owner)
+    except match_pages.InvalidCursor as e:
+        raise HTTPException(status_code=410, detail=f"{e}; request the first page again")
+
+
 @router.get("/{user_id}")
-def get_matches(user_id: str):
+async def get_matches(user_id: str, boost_closing_soon: bool = False, cursor: str | None = None,
+                page_size: int = match_pages.DEFAULT_PAGE_SIZE):
+    """
+    Get personalized grant matches for a user, one page at a time
+    Expired grants are excluded; optionally boost grants closing soon.
+    Pass `next_cursor` back as `cursor` for the next page - later pages
+    slice the ranking computed for the first one. `degraded` is true when
+    the embedding provider was unavailable and grants were scored lexically.
     """
-    Get personalized grant matches for a user
+    page_size = match_pages.clamp_page_size(page_size)
+    if cursor:
+        catalog = await snowflake_service.run_blocking(grant_catalog.get_catalog)
+        ranking, offset = _resolve(cursor, catalog, owner=user_id)
+    else:
+        # A profile save may still be ranking this user; its result lands in the match cache
+        await match_precompute.get_precomputer().wait(user_id)
+        catalog, ranked, degraded = await cached_rank_user_grants(user_id, boost_closing_soon=boost_closing_soon)
+        if catalog is None:
+            return {"user_id": user_id, "matches": [], "total": 0, "next_cursor": None, "degraded": False}
+        ranking = match_pages.store_ranking(catalog, [i for i, _ in ranked], [score for _, score in ranked],
+                                           owner=user_id, degraded=degraded)
+        offset = 0
+
+    page, next_cursor = match_pages.paginate(ranking, offset, page_size)
+    results = [format_match(ranking.catalog.grants[i], score) for i, score in page]
+    return {"user_id": user_id, "matches": results, "total": len(ranking), "next_cursor": next_cursor,
+            "degraded": ranking.degraded}
+
+@router.get("/{user_id}/stream")
+async def stream_matches(user_id: str, boost_closing_soon: bool = False, format: str = "ndjson",
+                         limit: int | None = None, first: int = match_stream.FIRST_CARDS):
     """
-    results = match_user_to_grants(user_id)
-    return {"user_id": user_id, "matches": results}
+    Stream a user's grant matches for the swipe deck as NDJSON or server-sent
+    events (`format=sse`). A `start` event goes out before ranking begins;
+    the best `first` cards are sent as soon as the ranking is known, the
+    rest follow in chunks. Same ranking as /match; `limit` caps how many
+    matches are sent (default: all).
+    """
+    if format not in match_stream.FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {sorted(match_stream.FORMATS)}")
+
+    async def rank():
+        await match_precompute.get_precomputer().wait(user_id)
+        return await cached_rank_user_grants(user_id, boost_closing_soon=boost_closing_soon)
+
+    return StreamingResponse(
+        match_stream.stream_matches(user_id, rank, fmt=format, limit=limit, first=max(1, first)),
+        media_type=match_stream.FORMATS[format],
+        # Keep proxies from buffering the stream
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @router.get("/grants/all")
-def get_all_grants(limit: int = 20):
+async def get_all_grants(limit: int = match_pages.DEFAULT_PAGE_SIZE, cursor: str | None = None,
+                   page_size: int | None = None):
     """
-    Get all available grants for swiping
-    Returns grants formatted for the swipe UI
+    Get all available grants for swiping, one page at a time
+    Returns open (not yet expired) grants formatted for the swipe UI.
+    `page_size` (or the older `limit`) sets the page length; pass
+    `next_cursor` back as `cursor` for the next page.
     """
-    conn = snowflake_service.get_connection()
-    cur = conn.cursor()
-    
-    cur.execute("""
-        SELECT 
-            program_name,
-            description,
-            funding_low,
-            funding_high,
-            deadline,
-            eligibility,
-            url,
-            source
-        FROM FUND_DB.PUBLIC.GRANTS
-        WHERE description IS NOT NULL
-        ORDER BY scraped_at DESC
-        LIMIT %s
-    """, (limit,))
-    
-    grants = cur.fetchall()
-    cur.close()
-    conn.close()
+    catalog = await snowflake_service.run_blocking(grant_catalog.get_catalog)
+    page_size = match_pages.clamp_page_size(page_size or limit)
+    if cursor:
+        ranking, offset = _resolve(cursor, catalog, owner="all")
+    else:
+        # Open grants only, newest first (catalog order)
+        ranking, offset = match_pages.store_ranking(catalog, catalog.open_indices(), owner="all"), 0
+
+    page, next_cursor = match_pages.paginate(ranking, offset, page_size)
+    grants = [(i, ranking.catalog.grants[i]) for i, _ in page]
     
     # Format for swipe UI
     formatted_grants = []
-    for idx, grant in enumerate(grants):
-        name, desc, low, high, deadline, eligibility, url, source = grant
+    for idx, grant in grants:
+        name, desc = grant["program_name"], grant["description"]
+        low, high = grant["funding_low"], grant["funding_high"]
+        deadline, eligibility = grant["deadline"], grant["eligibility"]
+        url, source = grant["url"], grant["source"]
         
         # Format funding display
         if low and high:
@@ -57,14 +105,31 @@ def get_all_grants(limit: int = 20):
             funding_display = "Contact for details"
         
         formatted_grants.append({
-            "id": str(idx + 1),
+            "id": ranking.catalog.ids[idx],
             "title": name or "Untitled Grant",
             "description": desc or "No description available",
             "region": source or "Ontario",
             "deadline": deadline or "Rolling deadline",
+            "deadline_date": grant["deadline_date"].isoformat() if grant["deadline_date"] else None,
             "funding": funding_display,
             "eligibility": eligibility,
             "url": url
         })
     
-    return {"grants": formatted_grants, "total": len(formatted_grants)}
\ No newline at end of file
+    return {"grants": formatted_grants, "total": len(ranking), "next_cursor": next_cursor}
+
+@router.get("/grants/{grant_id}/similar")
+async def get_similar_grants(grant_id: str, limit: int = 10):
+    """
+    Open grants most similar to `grant_id` (the grant's stable `id`)
+    A lookup in the precomputed neighbour graph - no scoring on request.
+    """
+    catalog = await snowflake_service.run_blocking(grant_catalog.get_catalog)
+    position = catalog.positions.get(grant_id)
+    if position is None:
+        raise HTTPException(status_code=404, detail="Grant not found")
+    similar = catalog.similar(position, limit=max(1, min(limit, 50)))
+    return {
+        "grant_id": grant_id,
+        "similar": [format_match(catalog.grants[i], score) for i, score in similar],
+    }
@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 import json
-from services import snowflake_service
+from services import snowflake_service, match_cache, match_precompute
 
 router = APIRouter()
 
@@ -25,8 +25,16 @@ class UserProfile(BaseModel):
 
 
 @router.post("/")
-def create_or_update_profile(profile: UserProfile):
+async def create_or_update_profile(profile: UserProfile):
     """Create or update user profile"""
+    # Blocking warehouse writes run on the bounded warehouse pool
+    result = await snowflake_service.run_blocking(_save_profile, profile)
+    # Embed the summary and rank matches in the background, ready for the first /match
+    result["match_status"] = match_precompute.get_precomputer().enqueue(profile.user_id, profile.project_summary)
+    return result
+
+
+def _save_profile(profile: UserProfile):
     try:
         conn = snowflake_service.get_connection()
         cur = conn.cursor()
@@ -186,6 +194,9 @@ def create_or_update_profile(profile: UserProfile):
         cur.close()
         conn.close()
         
+        # Cached matches were computed for the old profile
+        match_cache.get_cache().invalidate_user(profile.user_id, profile.model_dump())
+        
         return {
             "status": "success",
             "message": "Profile saved successfully",
@@ -200,8 +211,14 @@ def create_or_update_profile(profile: UserProfile):
 
 
 @router.get("/{user_id}")
-def get_user(user_id: str):
-    """Fetch user profile from Snowflake"""
+async def get_user(user_id: str):
+    """Fetch user profile from Snowflake (match_status: background match precompute, if any)"""
+    result = await snowflake_service.run_blocking(_fetch_user, user_id)
+    result["match_status"] = match_precompute.get_precomputer().status(user_id)
+    return result
+
+
+def _fetch_user(user_id: str):
     conn = snowflake_service.get_connection()
     cur = conn.cursor()
     
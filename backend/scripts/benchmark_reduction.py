@@ -0,0 +1,165 @@
+"""
+Embedding reduction benchmark
+
+Fits an SVD projection for each candidate dimension and reports how much of
+each query's full 768-d top-20 survives in the reduced space:
+
+    python scripts/benchmark_reduction.py
+    python scripts/benchmark_reduction.py --dims 32 64 128 --k 20 --out reduction.json
+    python scripts/benchmark_reduction.py --queries user_vectors.npy
+    python scripts/benchmark_reduction.py --centered
+
+Queries are never part of the fit. By default a sample of grants is split
+into --folds folds; each fold is held out of the projection and ranked
+against the remaining grants. With --queries (e.g. user profile vectors)
+the projection is fitted on every grant and the file's vectors are ranked
+against them.
+
+Dimensions at or above the rank of the fitted grant matrix are skipped: the
+catalog then lies inside the projected subspace, so the overlap is 1.0 by
+construction rather than by anything the benchmark measured.
+
+The projection is uncentered by default (see services/embedding_reduction);
+--centered fits mean-centered PCA components instead, for comparison.
+If overlap holds, publish reduced vectors with:
+python services/run_full_pipeline.py --reduce-dim <dims>
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Embeddings live in the backend root
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import embedding_reduction
+
+CACHE_FILE = "grant_embeddings.npy"
+FULL_CACHE_FILE = "grant_embeddings_full.npy"     # present when the published index is reduced
+
+DEFAULT_DIMS = [16, 32, 64, 128, 256]
+
+
+def load_grant_matrix():
+    path = FULL_CACHE_FILE if os.path.exists(FULL_CACHE_FILE) else CACHE_FILE
+    if not os.path.exists(path):
+        print(f"✗ No grant embeddings at {path}. Run the pipeline or an embedding script first.")
+        sys.exit(1)
+    return np.load(path).astype(np.float32)
+
+
+def _timed_scores(queries, grants):
+    start = time.perf_counter()
+    scores = queries @ grants.T
+    return scores, (time.perf_counter() - start) * 1000
+
+
+def _splits(grants, queries, sample, folds, seed):
+    """(fit_index, query_vectors) per fold; the fit never includes the fold's queries"""
+    if queries is not None:
+        return [(np.arange(len(grants)), queries)]
+    candidates = np.flatnonzero(np.any(grants, axis=1))
+    rng = np.random.default_rng(seed)
+    held_out = rng.choice(candidates, size=min(sample, len(candidates)), replace=False)
+    return [
+        (np.setdiff1d(np.arange(len(grants)), fold), grants[fold])
+        for fold in np.array_split(held_out, min(folds, len(held_out)))
+    ]
+
+
+def run_benchmark(grants, splits, dims, k, centered=False):
+    rank = min(int(np.linalg.matrix_rank(grants[fit_index])) for fit_index, _ in splits)
+    report = {
+        "grants": int(len(grants)),
+        "queries": int(sum(len(q) for _, q in splits)),
+        "folds": len(splits),
+        "full_dim": int(grants.shape[1]),
+        "fit_rank": rank,
+        "centered": centered,
+        "k": k,
+        "full_score_ms": 0.0,
+        "skipped_dims": [d for d in dims if d >= rank],
+        "dims": [],
+    }
+
+    folds = []
+    for fit_index, queries in splits:
+        catalog = grants[fit_index]
+        full_scores, full_ms = _timed_scores(queries, catalog)
+        # Blank grants never rank
+        full_scores[:, ~np.any(catalog, axis=1)] = -np.inf
+        report["full_score_ms"] += full_ms
+        folds.append((catalog, queries, full_scores))
+    report["full_score_ms"] = round(report["full_score_ms"], 2)
+
+    for dim in dims:
+        if dim >= rank:
+            continue
+        overlaps, score_ms = [], 0.0
+        for catalog, queries, full_scores in folds:
+            projection = embedding_reduction.fit_projection(catalog, dim, centered=centered)
+            reduced_scores, ms = _timed_scores(projection.apply(queries), projection.apply(catalog))
+            reduced_scores[:, ~np.any(catalog, axis=1)] = -np.inf
+            overlaps.append(embedding_reduction.top_k_overlap(full_scores, reduced_scores, k))
+            score_ms += ms
+        overlap = np.concatenate(overlaps)
+        report["dims"].append({
+            "dim": dim,
+            "mean_overlap": round(float(overlap.mean()), 4),
+            "p10_overlap": round(float(np.percentile(overlap, 10)), 4),
+            "min_overlap": round(float(overlap.min()), 4),
+            "score_ms": round(score_ms, 2),
+            "memory_ratio": round(dim / grants.shape[1], 3),
+        })
+    return report
+
+
+def print_report(report):
+    print("="*70)
+    print("EMBEDDING REDUCTION BENCHMARK")
+    print("="*70)
+    print(f"Grants: {report['grants']}  Queries: {report['queries']} ({report['folds']} folds)  "
+          f"Full dim: {report['full_dim']}  Top-{report['k']} overlap")
+    print(f"Fit rank: {report['fit_rank']}  Centered: {report['centered']}")
+    print(f"Full scoring: {report['full_score_ms']:.2f} ms\n")
+    print(f"  {'dim':>5} {'mean':>7} {'p10':>7} {'min':>7} {'score ms':>9} {'memory':>7}")
+    for row in report["dims"]:
+        print(f"  {row['dim']:>5} {row['mean_overlap']:>7.3f} {row['p10_overlap']:>7.3f} "
+              f"{row['min_overlap']:>7.3f} {row['score_ms']:>9.2f} {row['memory_ratio']:>6.0%}")
+    if report["skipped_dims"]:
+        print(f"\n⚠️  Skipped dims {report['skipped_dims']}: at or above the fit rank the overlap is 1.0 by construction")
+    print("="*70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report top-k overlap of SVD-reduced embeddings")
+    parser.add_argument("--dims", type=int, nargs="+", default=DEFAULT_DIMS, help="Reduced dimensions to try")
+    parser.add_argument("--k", type=int, default=20, help="Ranking depth compared")
+    parser.add_argument("--queries", help="Query vectors (.npy), e.g. user profiles; default: held-out grants")
+    parser.add_argument("--sample", type=int, default=500, help="Grants held out as queries")
+    parser.add_argument("--folds", type=int, default=5, help="Folds the held-out grants are split into")
+    parser.add_argument("--centered", action="store_true", help="Fit mean-centered PCA components")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the JSON report here")
+    args = parser.parse_args()
+
+    grants = load_grant_matrix()
+    queries = np.load(args.queries).astype(np.float32) if args.queries else None
+    splits = _splits(grants, queries, args.sample, args.folds, args.seed)
+    dims = [d for d in args.dims if d < grants.shape[1]]
+    report = run_benchmark(grants, splits, dims, args.k, centered=args.centered)
+    print_report(report)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""
+Offline scraper benchmark (record / replay)
+
+Record a snapshot of every source once:
+    python scripts/benchmark_scraper.py record scrape_archive/2025-10
+
+Then benchmark the scrapers against it as often as needed, fully offline:
+    python scripts/benchmark_scraper.py replay scrape_archive/2025-10 --out before.json
+    python scripts/benchmark_scraper.py replay scrape_archive/2025-10 --compare before.json
+
+Reports throughput, per-source fetch/parse times and field completeness, so
+selector breakage from markup drift shows up as a completeness drop.
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import scrape_archive
+from services.scrape_sources import STANDARD_COLUMNS, CrawlScheduler, get_sources
+
+# Replay budget: the archive server is local, so don't throttle like the live sites
+REPLAY_RATE = 1000.0
+REPLAY_CONCURRENCY = 4
+
+
+def _timed(fn, bucket, lock, materialize=False):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = fn(*args, **kwargs)
+            if materialize and result is not None:
+                result = list(result)  # parsers may be lazy; time the real work
+            return result
+        finally:
+            with lock:
+                bucket.append(time.perf_counter() - start)
+    return wrapper
+
+
+def _summary(samples):
+    if not samples:
+        return {"count": 0, "total_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "total_ms": round(sum(ordered) * 1000, 2),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 2),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+    }
+
+
+def run_benchmark(pages=5, headless=True, throttled=True, source_names=None):
+    """Crawl every source once (no incremental state) and measure it"""
+    sources = get_sources(source_names, options={
+        "The Grant Portal": {"pages": pages, "headless": headless},
+    })
+    if not throttled:
+        for source in sources:
+            source.rate = REPLAY_RATE
+            source.burst = REPLAY_CONCURRENCY
+            source.concurrency = REPLAY_CONCURRENCY
+
+    lock = threading.Lock()
+    timings = defaultdict(lambda: {"fetch": [], "parse": []})
+    for source in sources:
+        source.fetch = _timed(source.fetch, timings[source.name]["fetch"], lock)
+        source.parse = _timed(source.parse, timings[source.name]["parse"], lock, materialize=True)
+
+    pages_done = defaultdict(int)
+
+    def on_job_done(job, grants, follow_ups):
+        with lock:
+            pages_done[job.source.name] += 1
+
+    start = time.perf_counter()
+    results = CrawlScheduler(state=None, on_job_done=on_job_done).run(sources)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "created_at": datetime.now().isoformat(),
+        "elapsed_s": round(elapsed, 3),
+        "total_grants": sum(len(g) for g in results.values()),
+        "total_pages": sum(pages_done.values()),
+        "sources": {},
+    }
+    report["grants_per_s"] = round(report["total_grants"] / elapsed, 2) if elapsed else 0.0
+    report["pages_per_s"] = round(report["total_pages"] / elapsed, 2) if elapsed else 0.0
+
+    for source in sources:
+        grants = results.get(source.name, [])
+        completeness = {
+            col: round(sum(1 for g in grants if g.get(col)) / len(grants), 3) if grants else 0.0
+            for col in STANDARD_COLUMNS
+        }
+        report["sources"][source.name] = {
+            "grants": len(grants),
+            "pages": pages_done[source.name],
+            "fetch": _summary(timings[source.name]["fetch"]),
+            "parse": _summary(timings[source.name]["parse"]),
+            "completeness": completeness,
+        }
+    return report
+
+
+def print_report(report, baseline=None):
+    def delta(value, base):
+        if base is None:
+            return ""
+        diff = value - base
+        return f"  ({'+' if diff >= 0 else ''}{diff:.3g})"
+
+    base_sources = (baseline or {}).get("sources", {})
+    print("\n" + "=" * 70)
+    print("SCRAPER BENCHMARK")
+    print("=" * 70)
+    print(f"Elapsed:    {report['elapsed_s']:.2f}s{delta(report['elapsed_s'], baseline and baseline['elapsed_s'])}")
+    print(f"Pages:      {report['total_pages']}  ({report['pages_per_s']}/s)")
+    print(f"Grants:     {report['total_grants']}  ({report['grants_per_s']}/s)"
+          f"{delta(report['grants_per_s'], baseline and baseline['grants_per_s'])}")
+
+    for name, stats in report["sources"].items():
+        base = base_sources.get(name, {})
+        print(f"\n{name}")
+        print(f"  Grants: {stats['grants']}{delta(stats['grants'], base.get('grants'))}   Pages: {stats['pages']}")
+        for phase in ["fetch", "parse"]:
+            s = stats[phase]
+            base_mean = base.get(phase, {}).get("mean_ms")
+            print(f"  {phase.capitalize():<6} mean {s['mean_ms']:.1f} ms{delta(s['mean_ms'], base_mean)}"
+                  f"   p95 {s['p95_ms']:.1f} ms   total {s['total_ms']:.0f} ms")
+        print("  Field completeness:")
+        for col, value in stats["completeness"].items():
+            base_value = base.get("completeness", {}).get(col)
+            flag = "  ⚠️ dropped" if base_value is not None and value < base_value else ""
+            print(f"    {col:<18} {value * 100:5.1f}%{delta(value * 100, None if base_value is None else base_value * 100)}{flag}")
+    print("=" * 70)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record or replay a scraper archive and benchmark it")
+    parser.add_argument("mode", choices=["record", "replay"])
+    parser.add_argument("archive", help="Archive directory")
+    parser.add_argument("--pages", type=int, default=5, help="Grant Portal pages to crawl")
+    parser.add_argument("--out", help="Write the JSON report here")
+    parser.add_argument("--compare", help="Baseline JSON report to diff against")
+    parser.add_argument("--throttled", action="store_true", help="Keep live per-host rate budgets during replay")
+    args = parser.parse_args()
+
+    if args.mode == "record":
+        scrape_archive.start_recording(args.archive)
+        try:
+            report = run_benchmark(pages=args.pages)
+        finally:
+            scrape_archive.stop_recording()
+        print(f"\n✓ Recorded {len(scrape_archive.load_index(args.archive))} pages to {args.archive}")
+    else:
+        if not os.path.exists(os.path.join(args.archive, scrape_archive.INDEX_FILE)):
+            print(f"✗ No archive found at {args.archive}. Run in record mode first.")
+            sys.exit(1)
+        with scrape_archive.ReplayServer(args.archive) as server:
+            print(f"Replaying {len(server.routes)} archived pages from {server.base_url}")
+            report = run_benchmark(pages=args.pages, throttled=args.throttled)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report saved to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
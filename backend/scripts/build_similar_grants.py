@@ -0,0 +1,48 @@
+"""
+Build the similar-grants neighbour graph for the published embeddings
+
+The pipeline's index stage builds it automatically; run this after
+publishing embeddings any other way (e.g. generate_embeddings_with_ratelimit.py):
+
+    python scripts/build_similar_grants.py
+    python scripts/build_similar_grants.py --k 20
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Always save next to the embeddings in backend root
+os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import grant_neighbors
+
+CACHE_FILE = "grant_embeddings.npy"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the similar-grants kNN graph")
+    parser.add_argument("--k", type=int, default=grant_neighbors.DEFAULT_K, help="Neighbours per grant")
+    parser.add_argument("--block-size", type=int, default=grant_neighbors.BLOCK_SIZE, help="Rows per similarity tile")
+    args = parser.parse_args()
+
+    if not os.path.exists(CACHE_FILE):
+        print(f"✗ No grant embeddings at {CACHE_FILE}. Generate embeddings first.")
+        sys.exit(1)
+    matrix = np.load(CACHE_FILE)
+
+    start = time.perf_counter()
+    indices, scores = grant_neighbors.build_knn(matrix, k=args.k, block_size=args.block_size)
+    tmp_path = f"{grant_neighbors.NEIGHBORS_FILE}.tmp"
+    grant_neighbors.save_graph(tmp_path, indices, scores)
+    os.replace(tmp_path, grant_neighbors.NEIGHBORS_FILE)
+    print(f"✅ {len(indices)} grants x {indices.shape[1]} neighbours -> {grant_neighbors.NEIGHBORS_FILE} "
+          f"({time.perf_counter() - start:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
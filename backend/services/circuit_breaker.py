@@ -0,0 +1,85 @@
+"""
+Circuit Breaker
+Stops calling a failing dependency for a while instead of making every
+request wait on it:
+
+    closed     calls go through; FAILURE_THRESHOLD failures in a row open it
+    open       calls are refused until RESET_TIMEOUT seconds have passed
+    half_open  one trial call goes through; success closes, failure re-opens
+
+Callers record every call they were allowed: success, failure, or release()
+when it ended without an outcome (e.g. a cancelled request), so the trial
+slot is never held forever.
+"""
+
+import os
+import threading
+import time
+
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    def __init__(self, name, failure_threshold=FAILURE_THRESHOLD, reset_timeout=RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """True if a call may go through now"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self.state = HALF_OPEN
+                self._trial_running = False
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            if self.state != CLOSED:
+                print(f"✅ {self.name} recovered, closing circuit")
+            self.state = CLOSED
+            self.failures = 0
+            self._trial_running = False
+
+    def release(self):
+        """Free the half-open trial slot of a call that ended without success or failure"""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != OPEN:
+                    print(f"⚠️ {self.name} failing ({self.failures} in a row), opening circuit for {self.reset_timeout:.0f}s")
+                self.state = OPEN
+                self.opened_at = time.monotonic()
+                self._trial_running = False
+
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name):
+    """The shared breaker for a named dependency"""
+    with _breakers_lock:
+        if name not in _breakers:
+            _breakers[name] = CircuitBreaker(name)
+        return _breakers[name]
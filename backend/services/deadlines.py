@@ -0,0 +1,131 @@
+"""
+Deadline Parsing
+Turns the free-text deadlines the scrapers collect ("Ongoing", "Submit your
+application by October 28, 2025, 5:00 pm EST") into a typed date plus a kind:
+    "date"     - a closing date was found
+    "rolling"  - ongoing / continuous intake, never expires; wins over any
+                 dates in the text ("Rolling; next review September 30")
+    "unknown"  - blank or unparseable, treated as open
+Parsed once at ingest and stored alongside the original text.
+"""
+
+import re
+import calendar
+from datetime import date, datetime
+from functools import lru_cache
+
+import pandas as pd
+
+DATE = "date"
+ROLLING = "rolling"
+UNKNOWN = "unknown"
+
+_MONTHS = {
+    name: i + 1
+    for i, names in enumerate([
+        ("january", "jan"), ("february", "feb"), ("march", "mar"), ("april", "apr"),
+        ("may",), ("june", "jun"), ("july", "jul"), ("august", "aug"),
+        ("september", "sep", "sept"), ("october", "oct"), ("november", "nov"), ("december", "dec"),
+    ])
+    for name in names
+}
+_MONTH_RE = "|".join(sorted(_MONTHS, key=len, reverse=True))
+
+# "October 28, 2025" / "Oct. 28 , 2025" / "28 October 2025" / "2025-10-28"
+_MONTH_FIRST = re.compile(rf"\b({_MONTH_RE})\.?\s+(\d{{1,2}})(?:st|nd|rd|th)?\s*,?\s*(\d{{4}})\b", re.IGNORECASE)
+_DAY_FIRST = re.compile(rf"\b(\d{{1,2}})(?:st|nd|rd|th)?\s+({_MONTH_RE})\.?,?\s+(\d{{4}})\b", re.IGNORECASE)
+_ISO = re.compile(r"\b(\d{4})[-/](\d{2})[-/](\d{2})\b")
+# "15/04/2026" / "04-15-2026" / "15.04.2026": day-first or month-first
+_NUMERIC = re.compile(r"\b(\d{1,2})([/.-])(\d{1,2})\2(\d{4})\b")
+# "March 2026" (closes at the end of the month); matched after full dates are removed
+_MONTH_YEAR = re.compile(rf"\b({_MONTH_RE})\.?,?\s+(\d{{4}})\b", re.IGNORECASE)
+
+_ROLLING = re.compile(
+    rf"ongoing|rolling|continuous|any ?time|year[- ]round|no (?:funding )?deadline"
+    rf"|open until (?!\d|(?:{_MONTH_RE})\b)",
+    re.IGNORECASE,
+)
+
+
+def _safe_date(year, month, day):
+    try:
+        return date(int(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def parse_deadline(text):
+    """
+    Parse a free-text deadline.
+
+    Returns:
+        (date or None, kind) - rolling wording means (None, "rolling") even
+        when dates are mentioned; otherwise if several dates are mentioned
+        the latest wins, so a grant is never dropped earlier than its text
+        allows (ambiguous numeric dates and month-only dates likewise take
+        their latest reading)
+    """
+    if text is None or (isinstance(text, float) and pd.isna(text)):
+        return None, UNKNOWN
+    text = str(text).strip()
+    if not text:
+        return None, UNKNOWN
+    if _ROLLING.search(text):
+        return None, ROLLING
+
+    found = []
+    for month, day, year in _MONTH_FIRST.findall(text):
+        found.append(_safe_date(year, _MONTHS[month.lower()], day))
+    for day, month, year in _DAY_FIRST.findall(text):
+        found.append(_safe_date(year, _MONTHS[month.lower()], day))
+    for year, month, day in _ISO.findall(text):
+        found.append(_safe_date(year, month, day))
+    for first, _, second, year in _NUMERIC.findall(text):
+        found.append(_safe_date(year, second, first))
+        found.append(_safe_date(year, first, second))
+    rest = _DAY_FIRST.sub(" ", _MONTH_FIRST.sub(" ", text))
+    for month, year in _MONTH_YEAR.findall(rest):
+        month = _MONTHS[month.lower()]
+        found.append(_safe_date(year, month, calendar.monthrange(int(year), month)[1]))
+    found = [d for d in found if d is not None]
+
+    if found:
+        return max(found), DATE
+    return None, UNKNOWN
+
+
+def is_rolling(text):
+    """True if a deadline text has rolling / ongoing wording"""
+    return bool(text) and bool(_ROLLING.search(str(text)))
+
+
+def parse_deadline_column(series):
+    """
+    Parse a column of deadline strings.
+
+    Deadline text repeats heavily ("Ongoing"), so each distinct value is
+    parsed once and mapped back onto the column.
+
+    Returns:
+        (deadline_date Series of date/None, deadline_kind Series of str)
+    """
+    values = series.astype(object).where(series.notna(), None)
+    parsed = {value: parse_deadline(value) for value in pd.unique(values)}
+    dates = values.map(lambda v: parsed[v][0])
+    kinds = values.map(lambda v: parsed[v][1])
+    return dates, kinds
+
+
+def to_date(value):
+    """Coerce a warehouse/Parquet value (date, datetime, ISO string) to a date"""
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
@@ -0,0 +1,213 @@
+"""
+Eligibility Criteria Extraction
+Derives structured criteria from a grant's eligibility labels / free text
+(and description) once at ingest, so the API can filter on typed columns
+instead of substring-testing the raw text on every request:
+
+    age_min, age_max   explicit age bounds ("ages 15 to 29", "18 or older")
+    student_only       "must be enrolled" / "students only" programs (eligibility text)
+    newcomer           targets newcomers or immigrants
+    indigenous         targets Indigenous people or communities
+    veteran            targets veterans / military families
+    income_max         explicit income cap ("household income below $50,000")
+    org_types          eligible applicant types, ";"-joined (see ORG_TYPES)
+    region             "ontario" or a narrower region (see REGIONS; eligibility text)
+"""
+
+import re
+
+import pandas as pd
+
+CRITERIA_COLUMNS = [
+    "age_min",
+    "age_max",
+    "student_only",
+    "newcomer",
+    "indigenous",
+    "veteran",
+    "income_max",
+    "org_types",
+    "region",
+]
+
+DEFAULT_REGION = "ontario"
+
+# Applicant types, matched against the eligibility text only
+ORG_TYPES = {
+    "individual": re.compile(r"\bindividuals?\b"),
+    "nonprofit": re.compile(r"non-?profit|not-for-profit|charit"),
+    "business": re.compile(r"small business|for[- ]profit|\bbusiness(?:es)?\b|corporations|employers|manufacturers"),
+    "municipality": re.compile(r"municipal|local government|county|local services board"),
+    "indigenous_org": re.compile(r"indigenous (?:communit|organi)|first nations? (?:communit|police)|tribal"),
+    "institution": re.compile(r"institutions? of higher education|universit|school board|independent schools|librar"),
+}
+
+# Regions narrower than the whole province: how a grant's eligibility text
+# restricts applicants to it, and place names that put a user's residency
+# inside it. Region and student-only become hard filters, so they only match
+# the eligibility text, and only phrases that state a requirement - a grant
+# merely describing work in the north is not restricted to it.
+REGIONS = {
+    "northern_ontario": {
+        "grant": re.compile(
+            r"(?:located|based|resident|residing|operating) in (?:northern ontario|the far north)|"
+            r"residents? of (?:northern ontario|the far north)|"
+            r"northern ontario (?:residents|businesses|applicants) only|"
+            r"(?:only|exclusively) (?:available |open )?(?:to|in) (?:northern ontario|the far north)"
+        ),
+        "residency": [
+            "northern ontario", "sudbury", "thunder bay", "sault ste", "timmins", "north bay",
+            "kenora", "kapuskasing", "kirkland lake", "elliot lake", "cochrane", "moosonee",
+            "dryden", "fort frances", "hearst", "sioux lookout",
+        ],
+    },
+}
+
+# Same terms as the demographic boosts these flags replaced
+_NEWCOMER = re.compile(r"immigrant|newcomer")
+_INDIGENOUS = re.compile(r"indigenous|first nation|aboriginal")
+_VETERAN = re.compile(r"veteran|military")
+# Not category labels like "College Scholarship" - those are on non-student grants too
+_STUDENT_ONLY = re.compile(
+    r"(?:full[- ]time |part[- ]time )?students only|only open to (?:full[- ]time )?students|"
+    r"must be (?:a |an )?(?:current |currently |full[- ]time |part[- ]time )*(?:student|enrolled)"
+)
+
+_AGE = r"(\d{1,3})"
+_AGE_RANGE = re.compile(rf"\b(?:aged?|ages)\s+(?:of\s+|between\s+)?{_AGE}\s*(?:-|–|to|and)\s*{_AGE}\b|"
+                        rf"\b{_AGE}\s*(?:-|–|to)\s*{_AGE}\s+years?(?:\s+of\s+age|\s+old)")
+_AGE_MIN = re.compile(rf"\b{_AGE}\s+(?:years\s+(?:of\s+age|old)\s+)?(?:or|and)\s+(?:older|over|up)\b")
+_AGE_OVER = re.compile(rf"\b(?:over|older than)\s+(?:the\s+)?age\s+(?:of\s+)?{_AGE}\b")
+_AGE_MAX = re.compile(rf"\b{_AGE}\s+(?:years\s+(?:of\s+age|old)\s+)?(?:or|and)\s+(?:younger|under)\b")
+_AGE_UNDER = re.compile(rf"\b(?:under|younger than)\s+(?:the\s+)?age\s+(?:of\s+)?{_AGE}\b")
+_INCOME_MAX = re.compile(
+    r"income[^.$]{0,40}?(?:below|under|less than|not exceed(?:ing)?|up to|of no more than|maximum of)\s*\$\s*([\d,]+)"
+)
+
+
+STRING_DTYPE = "string[pyarrow]"      # Arrow strings: contains() runs on RE2, not row by row
+
+
+def _lower(values, index):
+    return pd.Series(values, index=index, dtype=object).astype(STRING_DTYPE).fillna("").str.lower()
+
+
+def _uncaptured(pattern):
+    """Pattern source with capture groups made non-capturing (for contains())"""
+    return re.sub(r"\((?!\?)", "(?:", pattern.pattern)
+
+
+def _contains(text, pattern):
+    return text.str.contains(_uncaptured(pattern), regex=True).to_numpy(bool)
+
+
+def _extract(text, pattern, rows):
+    """First match's groups for `rows` only (found with _contains); other rows NaN"""
+    groups = pd.DataFrame(index=text.index, columns=range(pattern.groups), dtype=object)
+    if rows.any():
+        found = text[rows].astype(object).str.extract(pattern, expand=True)
+        groups.loc[rows] = found.to_numpy()
+    return groups
+
+
+def _ages(text, pattern, rows, offset=0):
+    """First age `pattern` captures in each row (+ offset), NaN if none or implausible"""
+    groups = _extract(text, pattern, rows)
+    age = pd.to_numeric(groups.bfill(axis=1).iloc[:, 0], errors="coerce").astype(float)
+    return age.where((age > 0) & (age <= 120)) + offset
+
+
+_AGE_PATTERNS = [_AGE_RANGE, _AGE_MIN, _AGE_OVER, _AGE_MAX, _AGE_UNDER]
+_ANY_AGE = re.compile("|".join(f"(?:{p.pattern})" for p in _AGE_PATTERNS))
+
+
+def extract_criteria_columns(eligibility, description):
+    """
+    CRITERIA_COLUMNS for whole columns of eligibility / description text.
+    Flags are one RE2 contains() pass per criterion; ages and income are
+    extracted only from the rows a contains() pass found them in.
+    """
+    index = eligibility.index
+    elig = _lower(eligibility, index)
+    text = elig + " " + _lower(description, index)
+
+    # Explicit range first; otherwise separate lower / upper bounds
+    has_age = _contains(text, _ANY_AGE)
+    bounds = _extract(text, _AGE_RANGE, has_age)
+    low = pd.to_numeric(bounds[0].fillna(bounds[2]), errors="coerce").astype(float)
+    high = pd.to_numeric(bounds[1].fillna(bounds[3]), errors="coerce").astype(float)
+    plausible = (low > 0) & (low <= 120) & (high > 0) & (high <= 120) & (low <= high)
+    age_min = (low.where(plausible)
+               .fillna(_ages(text, _AGE_MIN, has_age))
+               .fillna(_ages(text, _AGE_OVER, has_age, offset=1)))
+    age_max = (high.where(plausible)
+               .fillna(_ages(text, _AGE_MAX, has_age))
+               .fillna(_ages(text, _AGE_UNDER, has_age, offset=-1)))
+
+    amounts = _extract(text, _INCOME_MAX, _contains(text, _INCOME_MAX))[0]
+    income_max = pd.to_numeric(amounts.str.replace(",", "", regex=False), errors="coerce").astype(float)
+    income_max = income_max.where(income_max != 0)
+
+    region = pd.Series(DEFAULT_REGION, index=index, dtype=object)
+    for name, spec in reversed(list(REGIONS.items())):       # first listed region wins
+        region = region.mask(_contains(elig, spec["grant"]), name)
+
+    org_types = pd.Series("", index=index, dtype=object)
+    for name, pattern in ORG_TYPES.items():
+        hit = _contains(elig, pattern)
+        org_types = org_types.mask(hit, org_types + name + ";")
+
+    frame = pd.DataFrame({
+        "age_min": age_min,
+        "age_max": age_max,
+        "student_only": _contains(elig, _STUDENT_ONLY),
+        "newcomer": _contains(text, _NEWCOMER),
+        "indigenous": _contains(text, _INDIGENOUS),
+        "veteran": _contains(text, _VETERAN),
+        "income_max": income_max,
+        "org_types": org_types.str.rstrip(";"),
+        "region": region,
+    }, index=index)[CRITERIA_COLUMNS]
+    return frame.astype(object).where(frame.notna(), None)
+
+
+def extract_criteria(eligibility, description=None):
+    """Structured criteria (CRITERIA_COLUMNS) for one grant"""
+    frame = extract_criteria_columns(pd.Series([eligibility]), pd.Series([description]))
+    return frame.iloc[0].to_dict()
+
+
+# ----------------------------------------------------------------------
+#  USER PROFILE HELPERS
+# ----------------------------------------------------------------------
+def income_floor(income):
+    """Lowest income a profile's income range allows ("< $25,000" -> 0)"""
+    if income is None:
+        return None
+    text = str(income).strip()
+    if not text:
+        return None
+    if text.startswith("<"):
+        return 0.0
+    match = re.search(r"[\d,]+", text)
+    if not match or not match.group().replace(",", ""):
+        return None
+    return float(match.group().replace(",", ""))
+
+
+def residency_regions(residency):
+    """Regions a residency string falls in (always includes the province)"""
+    text = str(residency or "").lower()
+    regions = {DEFAULT_REGION}
+    for name, spec in REGIONS.items():
+        if any(place in text for place in spec["residency"]):
+            regions.add(name)
+    return regions
+
+
+def is_student(student_status):
+    if student_status is None:
+        return None
+    if isinstance(student_status, bool):
+        return student_status
+    return str(student_status).strip().lower() not in ("", "none", "no", "false")
@@ -0,0 +1,145 @@
+"""
+Embedders
+Text -> vector providers behind one interface, selected with the EMBEDDER
+environment variable:
+
+    gemini    Gemini text-embedding-004 over the API (default)
+    hashing   local, deterministic feature hashing of words and word pairs -
+              no network or API key, for offline runs, CI and load tests
+
+Every embedder returns L2-normalized float32 vectors of OUTPUT_DIM (blank
+texts get zero vectors) and has a `model_id`, which is recorded with the
+embeddings it produced so vectors from different models are never mixed.
+"""
+
+import asyncio
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+from dotenv import load_dotenv
+
+load_dotenv()
+
+EMBEDDER = os.getenv("EMBEDDER", "gemini")
+OUTPUT_DIM = 768
+EMBED_MODEL = "models/text-embedding-004"
+
+
+def normalize_rows(vectors):
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms != 0)
+
+
+class Embedder:
+    """Base class: implement embed(); embed_async() defaults to a worker thread"""
+    model_id = None
+    dim = OUTPUT_DIM
+    remote = False            # calls a rate-limited API
+
+    def embed(self, texts):
+        """(len(texts), dim) normalized vectors"""
+        raise NotImplementedError
+
+    async def embed_async(self, texts, timeout):
+        """embed() without blocking the event loop (raises asyncio.TimeoutError)"""
+        return await asyncio.wait_for(asyncio.to_thread(self.embed, texts), timeout=timeout)
+
+
+class GeminiEmbedder(Embedder):
+    model_id = f"gemini/{EMBED_MODEL.split('/')[-1]}"
+    remote = True
+
+    def __init__(self):
+        from google import genai
+        self._genai = genai
+        self.client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+    def _config(self):
+        return self._genai.types.EmbedContentConfig(
+            task_type="SEMANTIC_SIMILARITY",
+            output_dimensionality=self.dim
+        )
+
+    def _fill(self, texts, result, indices):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for i, emb in zip(indices, result.embeddings):
+            vectors[i] = np.array(emb.values, dtype=np.float32)
+        return normalize_rows(vectors)
+
+    def embed(self, texts):
+        indices = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not indices:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+        result = self.client.models.embed_content(
+            model=EMBED_MODEL,
+            contents=[texts[i] for i in indices],
+            config=self._config()
+        )
+        return self._fill(texts, result, indices)
+
+    async def embed_async(self, texts, timeout):
+        indices = [i for i, t in enumerate(texts) if t and t.strip()]
+        if not indices:
+            return np.zeros((len(texts), self.dim), dtype=np.float32)
+        result = await asyncio.wait_for(
+            self.client.aio.models.embed_content(
+                model=EMBED_MODEL,
+                contents=[texts[i] for i in indices],
+                config=self._config()
+            ),
+            timeout=timeout,
+        )
+        return self._fill(texts, result, indices)
+
+
+class HashingEmbedder(Embedder):
+    """
+    Signed feature hashing of lowercased words and adjacent word pairs,
+    with sublinear (1 + log) term weights. Deterministic across runs and
+    machines; texts sharing vocabulary land close together.
+    """
+    model_id = f"hashing-v1/{OUTPUT_DIM}"
+
+    _WORD = re.compile(r"[a-z0-9]+")
+
+    def _features(self, text):
+        words = self._WORD.findall(text.lower())
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+    def embed(self, texts):
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            counts = {}
+            for feature in self._features(text):
+                counts[feature] = counts.get(feature, 0) + 1
+            for feature, count in counts.items():
+                h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+                sign = 1.0 if h & 1 else -1.0
+                vectors[row, (h >> 1) % self.dim] += sign * (1.0 + np.log(count))
+        return normalize_rows(vectors)
+
+
+EMBEDDERS = {
+    "gemini": GeminiEmbedder,
+    "hashing": HashingEmbedder,
+}
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """The configured embedder (EMBEDDER), created on first use"""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            if EMBEDDER not in EMBEDDERS:
+                raise ValueError(f"Unknown EMBEDDER '{EMBEDDER}' (expected one of {sorted(EMBEDDERS)})")
+            _embedder = EMBEDDERS[EMBEDDER]()
+            print(f"🧠 Embedder: {_embedder.model_id}")
+        return _embedder
@@ -0,0 +1,96 @@
+"""
+Embedding Micro-Batcher
+Coalesces concurrent user-embedding requests: texts requested within
+BATCH_WINDOW_MS of each other go to Gemini as one multi-content embed call
+(at most MAX_BATCH texts), and each caller gets its own vector back.
+
+Identical texts are embedded once - a caller asking for a text that is
+already queued or in flight waits on the same result.
+"""
+
+import asyncio
+import os
+import weakref
+
+import numpy as np
+
+from services import gemini_service
+
+BATCH_WINDOW_MS = float(os.getenv("EMBED_BATCH_WINDOW_MS", "5"))
+MAX_BATCH = 100           # texts per embed call (Gemini batch limit)
+
+
+class EmbeddingBatcher:
+    def __init__(self, embed_many=None, window_ms=BATCH_WINDOW_MS, max_batch=MAX_BATCH):
+        self.embed_many = embed_many or gemini_service.get_embeddings_async
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queued = {}          # text -> future, waiting for the next flush
+        self._in_flight = {}       # text -> future, part of a batch being embedded
+        self._flush_handle = None
+        self.calls = 0             # embed calls made (for monitoring / benchmarks)
+        self.requests = 0          # embed() calls served
+
+    async def embed(self, text, timeout=gemini_service.EMBED_TIMEOUT):
+        """Embedding for one text, batched with concurrent requests"""
+        self.requests += 1
+        if not text or not text.strip():
+            return np.zeros(gemini_service.OUTPUT_DIM, dtype=np.float32)
+
+        future = self._in_flight.get(text) or self._queued.get(text)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._queued[text] = future
+            if len(self._queued) >= self.max_batch:
+                self._flush()
+            elif self._flush_handle is None:
+                self._flush_handle = asyncio.get_running_loop().call_later(self.window, self._flush)
+        # shield: one caller timing out must not cancel the shared result
+        return await asyncio.wait_for(asyncio.shield(future), timeout=timeout)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if not self._queued:
+            return
+        batch, self._queued = self._queued, {}
+        self._in_flight.update(batch)
+        asyncio.ensure_future(self._embed_batch(batch))
+
+    async def _embed_batch(self, batch):
+        texts = list(batch)
+        self.calls += 1
+        try:
+            vectors = await self.embed_many(texts)
+        except Exception as e:
+            for future in batch.values():
+                if not future.done():
+                    future.set_exception(e)
+                # Mark the exception retrieved so callers that timed out don't log it
+                future.exception()
+        else:
+            for text, vector in zip(texts, vectors):
+                if not batch[text].done():
+                    batch[text].set_result(vector)
+        finally:
+            for text in texts:
+                if self._in_flight.get(text) is batch[text]:
+                    del self._in_flight[text]
+
+
+_batchers = weakref.WeakKeyDictionary()
+
+
+def get_batcher():
+    """The batcher for the running event loop"""
+    loop = asyncio.get_running_loop()
+    batcher = _batchers.get(loop)
+    if batcher is None:
+        batcher = _batchers[loop] = EmbeddingBatcher()
+    return batcher
+
+
+async def embed(text, timeout=gemini_service.EMBED_TIMEOUT):
+    """Embed one text through the shared micro-batcher"""
+    return await get_batcher().embed(text, timeout=timeout)
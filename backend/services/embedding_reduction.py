@@ -0,0 +1,88 @@
+"""
+Embedding Dimensionality Reduction
+Optional projection fitted on the grant matrix. Grant vectors are projected
+once when the index is built; user vectors get the same projection at match
+time, so both are scored in the reduced space (e.g. 768 -> 256 cuts scoring
+FLOPs and vector memory by 3x).
+
+The projection is a truncated SVD of the raw (uncentered) grant vectors:
+the subspace that best preserves their inner products, which is what the
+matcher ranks by. Mean-centered PCA (centered=True) keeps the directions of
+most variance around the mean instead; on held-out queries the two keep
+about the same top-k, so the default stays uncentered
+(scripts/benchmark_reduction.py --centered compares them).
+
+A projection is saved as an .npz (components) next to the published
+embeddings. Rows that were zero (blank text) stay zero after projection.
+"""
+
+import numpy as np
+
+
+class Projection:
+    def __init__(self, components):
+        self.components = np.asarray(components, dtype=np.float32)      # (dim, input_dim)
+
+    @property
+    def dim(self):
+        return self.components.shape[0]
+
+    @property
+    def input_dim(self):
+        return self.components.shape[1]
+
+    @property
+    def id(self):
+        return f"svd-{self.input_dim}-{self.dim}"
+
+    def apply(self, vectors):
+        """Project (n, input_dim) or (input_dim,) vectors and re-normalize"""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        single = vectors.ndim == 1
+        matrix = vectors[None, :] if single else vectors
+        reduced = matrix @ self.components.T
+        norms = np.linalg.norm(reduced, axis=1, keepdims=True)
+        reduced = np.divide(reduced, norms, out=np.zeros_like(reduced), where=norms != 0)
+        return reduced[0] if single else reduced
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            np.savez(f, components=self.components)
+
+
+def fit_projection(matrix, dim, centered=False):
+    """
+    Projection to `dim` dimensions, fitted on the non-blank rows of `matrix`.
+    centered=True fits the components on mean-centered rows (PCA); vectors
+    are still projected as-is.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    rows = matrix[np.any(matrix, axis=1)]
+    if dim >= matrix.shape[1]:
+        raise ValueError(f"Reduced dimension {dim} must be below {matrix.shape[1]}")
+    if len(rows) < 2:
+        raise ValueError("Need at least two non-blank vectors to fit a projection")
+    rows = rows.astype(np.float64)
+    if centered:
+        rows = rows - rows.mean(axis=0)
+    # Top right singular vectors best preserve the rows' inner products
+    _, _, vt = np.linalg.svd(rows, full_matrices=False)
+    components = np.zeros((dim, matrix.shape[1]), dtype=np.float32)
+    components[: min(dim, len(vt))] = vt[:dim]
+    return Projection(components)
+
+
+def load_projection(path):
+    with np.load(path) as data:
+        return Projection(data["components"])
+
+
+def top_k_overlap(full_scores, reduced_scores, k=20):
+    """
+    Per query (row): fraction of the top-k grants by full-dimension score
+    that are also in the top-k by reduced score.
+    """
+    k = min(k, full_scores.shape[1])
+    full_top = np.argpartition(-full_scores, k - 1, axis=1)[:, :k]
+    reduced_top = np.argpartition(-reduced_scores, k - 1, axis=1)[:, :k]
+    return np.array([len(set(a) & set(b)) / k for a, b in zip(full_top, reduced_top)])
@@ -1,42 +1,48 @@
 """
 Gemini Embedding Service
+Embedding helpers used across the backend. Calls go to the configured
+embedder (EMBEDDER, see embedders.py) - Gemini by default.
 """
 
+import json
 import os
 import numpy as np
-from dotenv import load_dotenv
-from google import genai
+from services import embedders
 
-load_dotenv()
-
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
-
-OUTPUT_DIM = 768
+OUTPUT_DIM = embedders.OUTPUT_DIM
+EMBED_MODEL = embedders.EMBED_MODEL
 CACHE_FILE = "grant_embeddings.npy"
 META_FILE = "grant_metadata.json"
+PROJECTION_FILE = "grant_projection.npz"           # optional SVD projection (see embedding_reduction.py)
+EMBED_TIMEOUT = float(os.getenv("GEMINI_EMBED_TIMEOUT", "10"))   # seconds per async embedding call
+
+# Embeddings published before model ids were recorded came from Gemini
+LEGACY_MODEL_ID = embedders.GeminiEmbedder.model_id
 
 
-def _normalize(v: np.ndarray) -> np.ndarray:
-    norm = np.linalg.norm(v)
-    return v / norm if norm != 0 else v
+def model_id() -> str:
+    """Model id of the configured embedder"""
+    return embedders.get_embedder().model_id
 
 
 def get_embedding(text: str) -> np.ndarray:
     """Get single embedding (for user profile only)"""
-    if not text or not text.strip():
-        return np.zeros(OUTPUT_DIM, dtype=np.float32)
-    
-    result = client.models.embed_content(
-        model="models/text-embedding-004",
-        contents=text,  # CHANGED: content -> contents
-        config=genai.types.EmbedContentConfig(
-            task_type="SEMANTIC_SIMILARITY",
-            output_dimensionality=OUTPUT_DIM
-        )
-    )
-    
-    embedding = np.array(result.embeddings[0].values, dtype=np.float32)
-    return _normalize(embedding)
+    return get_embeddings([text])[0]
+
+
+async def get_embedding_async(text: str, timeout: float = EMBED_TIMEOUT) -> np.ndarray:
+    """get_embedding without blocking the event loop (raises asyncio.TimeoutError)"""
+    return (await get_embeddings_async([text], timeout=timeout))[0]
+
+
+async def get_embeddings_async(texts: list[str], timeout: float = EMBED_TIMEOUT) -> np.ndarray:
+    """get_embeddings without blocking the event loop (raises asyncio.TimeoutError)"""
+    return await embedders.get_embedder().embed_async(texts, timeout)
+
+
+def get_embeddings(texts: list[str]) -> np.ndarray:
+    """Embed several texts in one call (blank texts get zero vectors)"""
+    return embedders.get_embedder().embed(texts)
 
 
 def cosine_similarity(a: np.ndarray, b: np.ndarray) -> float:
@@ -51,4 +57,15 @@ def load_cached_embeddings():
             f"Grant embeddings not found at {CACHE_FILE}! "
             "Run 'python scripts/generate_embeddings_with_ratelimit.py' first."
         )
-    return np.load(CACHE_FILE)
\ No newline at end of file
+    return np.load(CACHE_FILE)
+
+
+def load_cached_model_id():
+    """Model id recorded with the cached grant embeddings"""
+    if not os.path.exists(META_FILE):
+        return LEGACY_MODEL_ID
+    with open(META_FILE, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    if metadata and isinstance(metadata, list) and metadata[0].get("model"):
+        return metadata[0]["model"]
+    return LEGACY_MODEL_ID
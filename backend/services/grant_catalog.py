@@ -0,0 +1,406 @@
+"""
+In-Memory Grant Catalog
+The grants the matcher scores, loaded once from Snowflake (same order as the
+embedding rows) and kept in memory with a sorted deadline index, so expired
+grants can be dropped - and grants closing soon found - with a binary search
+instead of re-querying the warehouse on every request.
+
+Eligibility criteria are precomputed into boolean masks (one bit per grant)
+so hard eligibility filters are mask intersections, not text scans.
+
+Reloaded when the published catalog version or the embeddings file changes,
+or after CATALOG_TTL seconds.
+
+Every grant gets a stable `id` (a hash of its source, url and name), so
+clients can refer to a grant across catalog reloads.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+
+from services import deadlines, eligibility_criteria, embedding_reduction, gemini_service, grant_neighbors, match_cache, snowflake_service
+
+CATALOG_TTL = 300                          # seconds before re-reading Snowflake
+CATALOG_VERSION_FILE = "catalog_version.json"
+
+CLOSING_SOON_DAYS = 14                     # default window for closing_soon()
+MAX_TAG_MASKS = 1024                       # cached tag masks per catalog (least recently used dropped)
+
+# Sort key for grants that never expire (rolling / unknown deadline)
+NO_DEADLINE = date.max.toordinal()
+
+# Words for lexical similarity (embedding fallback)
+_WORD = re.compile(r"[a-z][a-z0-9']{2,}")
+_STOPWORDS = {
+    "the", "and", "for", "are", "with", "that", "this", "from", "will", "your", "you",
+    "can", "may", "must", "our", "their", "who", "which", "have", "has", "not", "all",
+    "any", "other", "such", "been", "also", "into", "its", "per", "more", "than",
+}
+
+GRANT_FIELDS = [
+    "program_name", "description", "eligibility", "funding_low", "funding_high",
+    "deadline", "deadline_date", "deadline_kind", "source", "url",
+] + eligibility_criteria.CRITERIA_COLUMNS
+
+# Added to GRANTS by the uploader's ALTER TABLE; a warehouse the pipeline
+# hasn't uploaded to since has none of them, and _row_to_grant derives them
+DERIVED_FIELDS = ["deadline_date", "deadline_kind"] + eligibility_criteria.CRITERIA_COLUMNS
+
+GRANTS_SQL = """
+    SELECT
+        {columns}
+    FROM FUND_DB.PUBLIC.GRANTS
+    WHERE description IS NOT NULL
+    ORDER BY scraped_at DESC
+"""
+GRANT_COLUMNS_SQL = """
+    SELECT LOWER(column_name)
+    FROM FUND_DB.INFORMATION_SCHEMA.COLUMNS
+    WHERE table_schema = 'PUBLIC' AND table_name = 'GRANTS'
+"""
+
+
+class GrantCatalog:
+    def __init__(self, grants, vectors=None, version=None, embedding_model=None, projection=None, neighbors=None):
+        self.grants = grants
+        self.vectors = vectors
+        self.version = version
+        self.embedding_model = embedding_model
+        self.projection = projection              # applied to user vectors when grants are reduced
+        self.neighbors = neighbors                # (indices, scores) similar-grants graph, if published
+        self.loaded_at = time.time()
+        self.ids = [g.get("id") or grant_id(g) for g in grants]
+        self.positions = {}
+        for i, gid in enumerate(self.ids):
+            self.positions.setdefault(gid, i)
+        # Lowercased description + eligibility, shared by every request's text rules
+        self.texts = [f"{g['description'] or ''} {g['eligibility'] or ''}".lower() for g in grants]
+        self.named = np.array([bool(g["program_name"]) for g in grants], dtype=bool)
+        self.funding_low = np.array([_parse_amount(g["funding_low"]) for g in grants], dtype=np.float64)
+        self.funding_high = np.array([_parse_amount(g["funding_high"]) for g in grants], dtype=np.float64)
+        self.norms = np.linalg.norm(vectors, axis=1) if vectors is not None else None
+
+        days = np.full(len(grants), NO_DEADLINE, dtype=np.int64)
+        for i, g in enumerate(grants):
+            if g["deadline_date"] is not None:
+                days[i] = g["deadline_date"].toordinal()
+        # Sorted deadline index: positions ordered by closing date
+        self.deadline_order = np.argsort(days, kind="stable")
+        self.sorted_deadlines = days[self.deadline_order]
+
+        # Eligibility masks and bounds (NaN = no limit)
+        def bounds(col):
+            return np.array([np.nan if g[col] is None else float(g[col]) for g in grants], dtype=np.float64)
+
+        def flags(col):
+            return np.array([bool(g[col]) for g in grants], dtype=bool)
+
+        self.age_min = bounds("age_min")
+        self.age_max = bounds("age_max")
+        self.income_max = bounds("income_max")
+        self.student_only = flags("student_only")
+        self.newcomer = flags("newcomer")
+        self.indigenous = flags("indigenous")
+        self.veteran = flags("veteran")
+        regions = [g["region"] or eligibility_criteria.DEFAULT_REGION for g in grants]
+        self.region_masks = {
+            name: np.array([r == name for r in regions], dtype=bool)
+            for name in set(regions) | {eligibility_criteria.DEFAULT_REGION}
+        }
+        org_types = [set((g["org_types"] or "").split(";")) - {""} for g in grants]
+        self.unknown_org = np.array([not types for types in org_types], dtype=bool)
+        self.org_masks = {
+            name: np.array([name in types for types in org_types], dtype=bool)
+            for name in eligibility_criteria.ORG_TYPES
+        }
+        self._text_masks = {}
+        self._tag_masks = OrderedDict()
+        self._tag_masks_lock = threading.Lock()
+        self._word_sets = None
+        self._content_hash = None
+
+    def __len__(self):
+        return len(self.grants)
+
+    @property
+    def cache_version(self):
+        """
+        Version that cached rankings are keyed on: the published version, or
+        for an unpublished catalog a hash of its grants and vectors - stable
+        across reloads until the content actually changes.
+        """
+        if self.version:
+            return self.version
+        if self._content_hash is None:
+            digest = hashlib.sha1()
+            digest.update(json.dumps(self.grants, sort_keys=True, default=str).encode("utf-8"))
+            if self.vectors is not None:
+                digest.update(np.ascontiguousarray(self.vectors).tobytes())
+            digest.update(f"{self.embedding_model}|{self.projection.id if self.projection is not None else ''}".encode())
+            self._content_hash = digest.hexdigest()[:16]
+        return f"unpublished-{self._content_hash}"
+
+    def subset(self, positions):
+        """A catalog of just the grants at `positions` (their masks and vectors only)"""
+        positions = np.asarray(positions, dtype=np.int64)
+        return GrantCatalog(
+            [self.grants[i] for i in positions],
+            self.vectors[positions] if self.vectors is not None else None,
+            version=self.version,
+            embedding_model=self.embedding_model,
+            projection=self.projection,
+        )
+
+    def expired(self, today=None):
+        """Positions of grants whose deadline is before `today`"""
+        today = (today or date.today()).toordinal()
+        return self.deadline_order[: np.searchsorted(self.sorted_deadlines, today, side="left")]
+
+    def open_mask(self, today=None):
+        """True for grants still open today"""
+        mask = np.ones(len(self.grants), dtype=bool)
+        mask[self.expired(today)] = False
+        return mask
+
+    def open_indices(self, today=None):
+        """Positions of grants still open today, in catalog order"""
+        return np.flatnonzero(self.open_mask(today))
+
+    def eligible_mask(self, age=None, student=None, income=None, residency=None, org_type=None):
+        """
+        Hard eligibility filter: False where a grant's criteria rule the
+        applicant out. Unknown profile values never exclude a grant.
+        """
+        mask = np.ones(len(self.grants), dtype=bool)
+        if age is not None:
+            mask &= ~(self.age_min > age) & ~(self.age_max < age)
+        if student is False:
+            mask &= ~self.student_only
+        if income is not None:
+            mask &= ~(self.income_max <= income)
+        if residency is not None:
+            allowed = np.zeros(len(self.grants), dtype=bool)
+            for region in eligibility_criteria.residency_regions(residency):
+                if region in self.region_masks:
+                    allowed |= self.region_masks[region]
+            mask &= allowed
+        if org_type is not None and org_type in self.org_masks:
+            mask &= self.org_masks[org_type] | self.unknown_org
+        return mask
+
+    def similarities(self, user_vec, indices):
+        """Cosine similarity of the user vector to the grants at `indices`"""
+        user_norm = np.linalg.norm(user_vec)
+        norms = self.norms[indices]
+        if user_norm == 0:
+            return np.zeros(len(indices))
+        dots = self.vectors[indices] @ user_vec
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(norms > 0, dots / (norms * user_norm), 0.0)
+
+    def lexical_similarities(self, text, indices):
+        """
+        Word-overlap cosine (0-1) of `text` to the grants at `indices` -
+        the fallback when no embedding is available for the user.
+        """
+        if self._word_sets is None:
+            self._word_sets = [_words(t) for t in self.texts]
+        query = _words(text)
+        if not query:
+            return np.zeros(len(indices))
+        scores = np.zeros(len(indices))
+        for j, i in enumerate(indices):
+            words = self._word_sets[i]
+            if words:
+                scores[j] = len(query & words) / np.sqrt(len(query) * len(words))
+        return scores
+
+    def funding_overlap(self, goal_low, goal_high):
+        """False where a grant's funding range misses the user's goal range"""
+        if not (goal_low and goal_high):
+            return np.ones(len(self.grants), dtype=bool)
+        known = ~np.isnan(self.funding_low) & ~np.isnan(self.funding_high)
+        overlaps = (self.funding_low <= goal_high) & (self.funding_high >= goal_low)
+        return ~known | overlaps
+
+    def text_mask(self, keyword):
+        """True for grants mentioning `keyword` (computed once per catalog)"""
+        keyword = keyword.lower()
+        if keyword not in self._text_masks:
+            self._text_masks[keyword] = np.array([
+                keyword in f"{g['program_name'] or ''} {g['description'] or ''} {g['eligibility'] or ''}".lower()
+                for g in self.grants
+            ], dtype=bool)
+        return self._text_masks[keyword]
+
+    def tag_mask(self, tag):
+        """
+        True for grants whose description / eligibility mention lowercase
+        `tag`. Tags are free-form user input, so at most MAX_TAG_MASKS of
+        them are kept, least recently used dropped first.
+        """
+        with self._tag_masks_lock:
+            mask = self._tag_masks.get(tag)
+            if mask is not None:
+                self._tag_masks.move_to_end(tag)
+                return mask
+        mask = np.fromiter((tag in text for text in self.texts), dtype=bool, count=len(self.texts))
+        with self._tag_masks_lock:
+            self._tag_masks[tag] = mask
+            while len(self._tag_masks) > MAX_TAG_MASKS:
+                self._tag_masks.popitem(last=False)
+        return mask
+
+    def similar(self, position, limit=grant_neighbors.DEFAULT_K, today=None):
+        """(position, score) of the open grants most similar to the one at `position`"""
+        if self.neighbors is None:
+            return []
+        indices, scores = self.neighbors
+        open_mask = self.open_mask(today)
+        return [
+            (int(i), float(score)) for i, score in zip(indices[position], scores[position])
+            if i >= 0 and open_mask[i]
+        ][:limit]
+
+    def closing_soon(self, days=CLOSING_SOON_DAYS, today=None):
+        """Positions of open grants closing within `days` days"""
+        today = (today or date.today()).toordinal()
+        lo = np.searchsorted(self.sorted_deadlines, today, side="left")
+        hi = np.searchsorted(self.sorted_deadlines, today + days, side="right")
+        return self.deadline_order[lo:hi]
+
+
+def _words(text):
+    return set(_WORD.findall(str(text or "").lower())) - _STOPWORDS
+
+
+def grant_id(grant):
+    """Stable id for a grant: survives reloads and reordering of the catalog"""
+    key = "|".join(str(grant.get(f) or "").strip().lower() for f in ("source", "url", "program_name"))
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+
+
+def _parse_amount(value):
+    text = str(value or "").replace("$", "").replace(",", "").strip()
+    try:
+        return float(text) if text else np.nan
+    except ValueError:
+        return np.nan
+
+
+def _row_to_grant(row):
+    grant = dict(zip(GRANT_FIELDS, row))
+    grant["deadline_date"] = deadlines.to_date(grant["deadline_date"])
+    if not grant["deadline_kind"] or (grant["deadline_kind"] == deadlines.DATE
+                                      and deadlines.is_rolling(grant["deadline"])):
+        # Rows ingested before deadlines were parsed at upload time, or
+        # before rolling wording took precedence over mentioned dates
+        grant["deadline_date"], grant["deadline_kind"] = deadlines.parse_deadline(grant["deadline"])
+    if not grant["region"]:
+        # Rows ingested before eligibility criteria were extracted
+        grant.update(eligibility_criteria.extract_criteria(grant["eligibility"], grant["description"]))
+    grant["id"] = grant_id(grant)
+    return grant
+
+
+def _published_version():
+    if not os.path.exists(CATALOG_VERSION_FILE):
+        return None
+    with open(CATALOG_VERSION_FILE, "r", encoding="utf-8") as f:
+        return json.load(f).get("version")
+
+
+def _embeddings_mtime():
+    path = gemini_service.CACHE_FILE
+    return os.path.getmtime(path) if os.path.exists(path) else None
+
+
+_schema_complete = False
+
+
+def _grants_sql(cur):
+    """GRANTS_SQL selecting NULL for derived columns the table doesn't have yet"""
+    global _schema_complete
+    if _schema_complete:
+        missing = set()
+    else:
+        cur.execute(GRANT_COLUMNS_SQL)
+        present = {row[0] for row in cur.fetchall()}
+        missing = set(DERIVED_FIELDS) - present
+        if missing:
+            print(f"⚠️ GRANTS has no {', '.join(sorted(missing))} column(s) yet; deriving them from the grant text")
+        else:
+            _schema_complete = True
+    columns = [f"NULL AS {field}" if field in missing else field for field in GRANT_FIELDS]
+    return GRANTS_SQL.format(columns=",\n        ".join(columns))
+
+
+def load_catalog():
+    """Read the grants from Snowflake and the cached embeddings from disk"""
+    conn = snowflake_service.get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(_grants_sql(cur))
+        grants = [_row_to_grant(row) for row in cur.fetchall()]
+    finally:
+        cur.close()
+        conn.close()
+
+    try:
+        vectors = gemini_service.load_cached_embeddings()
+    except FileNotFoundError as e:
+        print(str(e))
+        vectors = None
+    projection = None
+    if vectors is not None and os.path.exists(gemini_service.PROJECTION_FILE):
+        projection = embedding_reduction.load_projection(gemini_service.PROJECTION_FILE)
+    expected_dim = projection.dim if projection is not None else gemini_service.OUTPUT_DIM
+    if vectors is not None and vectors.ndim == 2 and len(vectors) and vectors.shape[1] != expected_dim:
+        print(f"⚠️ Grant embeddings have {vectors.shape[1]} dims, expected {expected_dim}; ignoring them")
+        vectors, projection = None, None
+    model = gemini_service.load_cached_model_id() if vectors is not None else None
+
+    neighbors = None
+    if vectors is not None and os.path.exists(grant_neighbors.NEIGHBORS_FILE):
+        neighbors = grant_neighbors.load_graph(grant_neighbors.NEIGHBORS_FILE)
+        if len(neighbors[0]) != len(vectors):
+            print(f"⚠️ Neighbour graph covers {len(neighbors[0])} grants, embeddings {len(vectors)}; ignoring it")
+            neighbors = None
+    return GrantCatalog(grants, vectors, version=_published_version(), embedding_model=model,
+                        projection=projection, neighbors=neighbors)
+
+
+_catalog = None
+_catalog_key = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog(force=False):
+    """Return the shared catalog, reloading it when stale"""
+    global _catalog, _catalog_key
+    key = (_published_version(), _embeddings_mtime())
+    with _catalog_lock:
+        stale = (
+            _catalog is None
+            or key != _catalog_key
+            or time.time() - _catalog.loaded_at > CATALOG_TTL
+        )
+        if force or stale:
+            previous = _catalog
+            _catalog = load_catalog()
+            _catalog_key = key
+            print(f"📚 Loaded grant catalog: {len(_catalog)} grants, {len(_catalog.expired())} expired")
+            if previous is None or previous.cache_version != _catalog.cache_version:
+                # Rankings cached for any other catalog can never be served again
+                purged = match_cache.get_cache().purge_versions(_catalog.cache_version)
+                if purged:
+                    print(f"🧹 Purged {purged} cached match results for older catalogs")
+        return _catalog
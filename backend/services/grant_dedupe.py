@@ -0,0 +1,126 @@
+"""
+Near-Duplicate Grant Consolidation
+The same program is often listed by several sources (The Grant Portal,
+ontario.ca, OTF) under slightly different names and text. Grants are
+clustered with MinHash signatures over description + eligibility shingles
+and LSH banding, so only grants sharing a band bucket are ever compared -
+near-linear in the number of grants instead of all pairs. Each cluster
+collapses to one canonical grant with the missing fields filled in from
+the other copies.
+"""
+
+import re
+import zlib
+from collections import defaultdict
+
+import numpy as np
+
+from services.scrape_sources import STANDARD_COLUMNS
+
+NUM_PERM = 128               # MinHash signature length
+BANDS = 32                   # LSH bands (BANDS * ROWS == NUM_PERM)
+ROWS = NUM_PERM // BANDS
+SIMILARITY_THRESHOLD = 0.6   # estimated Jaccard needed to merge two grants
+SHINGLE_SIZE = 3             # words per shingle
+
+_PRIME = (1 << 31) - 1       # Mersenne prime; keeps a * x + b inside int64
+_rng = np.random.RandomState(1)
+_A = _rng.randint(1, _PRIME, size=NUM_PERM).astype(np.int64)
+_B = _rng.randint(0, _PRIME, size=NUM_PERM).astype(np.int64)
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def grant_text(grant):
+    return f"{grant.get('description') or ''} {grant.get('eligibility') or ''}".lower()
+
+
+def shingles(text, size=SHINGLE_SIZE):
+    """Hashed word n-grams of a text (the whole word set if it's shorter)"""
+    words = _WORD_RE.findall(text)
+    if len(words) < size:
+        grams = set(words)
+    else:
+        grams = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) % _PRIME for g in grams), dtype=np.int64, count=len(grams))
+
+
+def minhash(shingle_hashes):
+    """MinHash signature: min over shingles of each random hash permutation"""
+    if len(shingle_hashes) == 0:
+        return None
+    return ((np.outer(shingle_hashes, _A) + _B) % _PRIME).min(axis=0)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_grants(grants, threshold=SIMILARITY_THRESHOLD):
+    """
+    Group near-duplicate grants.
+
+    Returns:
+        List of clusters, each a list of indices into `grants`
+    """
+    signatures = [minhash(shingles(grant_text(g))) for g in grants]
+
+    # LSH banding: grants agreeing on every row of some band share a bucket
+    buckets = defaultdict(list)
+    for i, sig in enumerate(signatures):
+        if sig is None:
+            continue
+        for band in range(BANDS):
+            buckets[(band, sig[band * ROWS:(band + 1) * ROWS].tobytes())].append(i)
+
+    parent = list(range(len(grants)))
+    checked = set()
+    for members in buckets.values():
+        for j in members[1:]:
+            i = members[0]
+            pair = (i, j)
+            if pair in checked:
+                continue
+            checked.add(pair)
+            if np.mean(signatures[i] == signatures[j]) >= threshold:
+                parent[_find(parent, j)] = _find(parent, i)
+
+    clusters = defaultdict(list)
+    for i in range(len(grants)):
+        clusters[_find(parent, i)].append(i)
+    return list(clusters.values())
+
+
+def _completeness(grant):
+    filled = sum(1 for col in STANDARD_COLUMNS if grant.get(col))
+    return filled, len(grant.get("description") or "")
+
+
+def merge_cluster(members):
+    """Canonical grant for a cluster: the most complete copy, gaps filled from the rest"""
+    ordered = sorted(members, key=_completeness, reverse=True)
+    merged = dict(ordered[0])
+    for other in ordered[1:]:
+        for col in STANDARD_COLUMNS:
+            if not merged.get(col) and other.get(col):
+                merged[col] = other[col]
+    return merged
+
+
+def consolidate_grants(grants, threshold=SIMILARITY_THRESHOLD):
+    """
+    Collapse near-duplicate grants into canonical records.
+
+    Returns:
+        (canonical grants in first-seen order, number of duplicates merged)
+    """
+    clusters = cluster_grants(grants, threshold)
+    clusters.sort(key=min)
+    merged = [merge_cluster([grants[i] for i in cluster]) for cluster in clusters]
+    duplicates = len(grants) - len(merged)
+    if duplicates:
+        print(f"✓ Merged {duplicates} near-duplicate grants into {sum(1 for c in clusters if len(c) > 1)} canonical grants")
+    return merged, duplicates
@@ -0,0 +1,59 @@
+"""
+Similar-Grants Neighbour Graph
+k nearest neighbours of every grant by embedding cosine similarity, built
+offline next to the published embeddings so "similar grants" is a lookup.
+
+The graph is built in row blocks (BLOCK_SIZE x N similarity tiles), so the
+full N x N matrix is never materialized. Stored as an .npz of neighbour
+positions and scores, row-aligned with grant_embeddings.npy.
+"""
+
+import numpy as np
+
+NEIGHBORS_FILE = "grant_neighbors.npz"
+DEFAULT_K = 10
+BLOCK_SIZE = 1024
+
+
+def build_knn(matrix, k=DEFAULT_K, block_size=BLOCK_SIZE):
+    """
+    (indices, scores): each row's k most similar other rows, best first.
+    Blank (zero) rows have no neighbours and are never a neighbour;
+    missing slots are -1 / -inf.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    n = len(matrix)
+    norms = np.linalg.norm(matrix, axis=1)
+    blank = norms == 0
+    unit = np.divide(matrix, norms[:, None], out=np.zeros_like(matrix), where=~blank[:, None])
+
+    k = max(0, min(k, n - 1))
+    indices = np.full((n, k), -1, dtype=np.int32)
+    scores = np.full((n, k), -np.inf, dtype=np.float32)
+    if k == 0:
+        return indices, scores
+
+    for start in range(0, n, block_size):
+        stop = min(start + block_size, n)
+        tile = unit[start:stop] @ unit.T                      # (block, n)
+        tile[:, blank] = -np.inf
+        tile[np.arange(stop - start), np.arange(start, stop)] = -np.inf
+        top = np.argpartition(-tile, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(tile, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        valid = np.isfinite(top_scores) & ~blank[start:stop, None]
+        indices[start:stop] = np.where(valid, top, -1)
+        scores[start:stop] = np.where(valid, top_scores, -np.inf)
+    return indices, scores
+
+
+def save_graph(path, indices, scores):
+    with open(path, "wb") as f:
+        np.savez(f, indices=indices, scores=scores)
+
+
+def load_graph(path):
+    with np.load(path) as data:
+        return data["indices"], data["scores"]
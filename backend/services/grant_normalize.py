@@ -0,0 +1,150 @@
+"""
+Grant Normalization
+Vectorized cleaning of standardized grants into GRANTS table columns.
+Every column is converted to an Arrow-backed string column once and cleaned
+with pandas string kernels, and the time spent in each stage is reported.
+The only per-value Python work is parsing each distinct deadline string once
+and extracting ages / income amounts from the few rows whose eligibility
+criteria regexes matched (see eligibility_criteria.extract_criteria_columns).
+"""
+
+import time
+
+import pandas as pd
+
+from services.deadlines import parse_deadline_column
+from services.eligibility_criteria import CRITERIA_COLUMNS, extract_criteria_columns
+
+SNOWFLAKE_COLUMNS = [
+    "source",
+    "grant_id",
+    "program_name",
+    "description",
+    "summary",
+    "deadline",
+    "deadline_date",
+    "deadline_kind",
+    "funding_low",
+    "funding_high",
+    "eligibility",
+    "interests",
+    "application_process",
+    "contact",
+    "url",
+    "scraped_at",
+] + CRITERIA_COLUMNS
+
+TEXT_COLUMNS = [
+    "source",
+    "program_name",
+    "description",
+    "eligibility",
+    "interests",
+    "application_process",
+    "url",
+]
+FUNDING_COLUMNS = ["funding_low", "funding_high"]
+DATE_COLUMNS = ["deadline", "scraped_at"]
+
+# Columns the scrapers don't produce; left NULL in the warehouse
+OPTIONAL_COLUMNS = ["grant_id", "summary", "contact"]
+
+# String spellings of "missing" that show up after CSV round-trips
+MISSING_STRINGS = ["nan", "NaN", "NaT", "nat", "None"]
+
+STRING_DTYPE = "string[pyarrow]"
+
+
+def _as_string(series):
+    """One conversion to an Arrow string column, with missing spellings as NA"""
+    s = series.astype(STRING_DTYPE)
+    return s.mask(s.isin(MISSING_STRINGS))
+
+
+def _to_python(series, missing):
+    """Arrow strings back to plain Python objects for the Snowflake connector"""
+    return series.astype(object).where(series.notna(), missing)
+
+
+def normalize_grants(df, timings=None, verbose=True):
+    """
+    Clean a frame of standardized grants into GRANTS table columns.
+
+    Text and date columns are stripped with missing values as "", funding
+    columns keep only digits and dots with missing values as None,
+    application_link is mapped to application_process, and the deadline
+    text is parsed into deadline_date (ISO string or None) and deadline_kind.
+    Structured eligibility criteria (CRITERIA_COLUMNS) are extracted from
+    the cleaned eligibility and description text.
+
+    Args:
+        df: Frame with STANDARD_COLUMNS (CSV or scraper records)
+        timings: Optional dict; per-stage milliseconds are added to it
+        verbose: Print a one-line timing summary
+
+    Returns:
+        New frame with SNOWFLAKE_COLUMNS, values str or None
+    """
+    timings = {} if timings is None else timings
+    total_start = time.perf_counter()
+    n = len(df)
+    out = {}
+
+    def timed(stage, fn):
+        start = time.perf_counter()
+        fn()
+        timings[stage] = timings.get(stage, 0.0) + (time.perf_counter() - start) * 1000
+
+    if "application_process" not in df.columns and "application_link" in df.columns:
+        df = df.rename(columns={"application_link": "application_process"})
+
+    def column(col):
+        if col in df.columns:
+            return _as_string(df[col])
+        return pd.Series(pd.NA, index=df.index, dtype=STRING_DTYPE)
+
+    def text():
+        for col in TEXT_COLUMNS:
+            out[col] = _to_python(column(col).str.strip(), "")
+
+    def funding():
+        for col in FUNDING_COLUMNS:
+            s = column(col).str.replace(r"[^\d.]", "", regex=True)
+            out[col] = _to_python(s.mask(s == ""), None)
+
+    def dates():
+        for col in DATE_COLUMNS:
+            out[col] = _to_python(column(col).str.strip(), "")
+
+    def deadline_fields():
+        dates, kinds = parse_deadline_column(out["deadline"])
+        out["deadline_date"] = pd.Series([d.isoformat() if d else None for d in dates], index=df.index, dtype=object)
+        out["deadline_kind"] = kinds.astype(object)
+
+    def criteria():
+        extracted = extract_criteria_columns(out["eligibility"], out["description"])
+        for col in CRITERIA_COLUMNS:
+            out[col] = extracted[col]
+
+    def optional():
+        for col in OPTIONAL_COLUMNS:
+            if col in df.columns:
+                out[col] = _to_python(column(col).str.strip(), None)
+            else:
+                out[col] = pd.Series([None] * n, index=df.index, dtype=object)
+
+    timed("text", text)
+    timed("funding", funding)
+    timed("dates", dates)
+    timed("deadlines", deadline_fields)
+    timed("criteria", criteria)
+    timed("optional", optional)
+
+    result = pd.DataFrame(out, index=df.index)[SNOWFLAKE_COLUMNS].reset_index(drop=True)
+    elapsed = (time.perf_counter() - total_start) * 1000
+    timings["total"] = timings.get("total", 0.0) + elapsed
+
+    if verbose:
+        stages = ", ".join(f"{k} {v:.1f} ms" for k, v in timings.items() if k != "total")
+        print(f"✓ Normalized {n} grants in {elapsed:.1f} ms ({stages})")
+    return result
@@ -0,0 +1,204 @@
+"""
+Streaming Scrape-to-Warehouse Pipeline
+Grants flow straight from the crawl scheduler into bounded micro-batches.
+Each batch is cleaned once, written as a typed Parquet part file and
+uploaded to Snowflake while the crawl keeps running in the background, so
+memory stays flat no matter how many grants are scraped and no CSV
+round-trip loses dtypes along the way.
+
+Run: python services/grant_stream.py
+"""
+
+import os
+import sys
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import consolidated_scraper, deadlines, scrape_state, snowflake_uploader
+from services.grant_normalize import normalize_grants
+from services.scrape_sources import STANDARD_COLUMNS
+
+BATCH_SIZE = 50
+OUTPUT_DIR = "grant_batches"
+
+# Typed schema for Parquet parts (GRANTS table columns, real dtypes)
+GRANT_SCHEMA = pa.schema([
+    ("source", pa.string()),
+    ("grant_id", pa.string()),
+    ("program_name", pa.string()),
+    ("description", pa.string()),
+    ("summary", pa.string()),
+    ("deadline", pa.string()),
+    ("deadline_date", pa.date32()),
+    ("deadline_kind", pa.string()),
+    ("funding_low", pa.float64()),
+    ("funding_high", pa.float64()),
+    ("eligibility", pa.string()),
+    ("interests", pa.string()),
+    ("application_process", pa.string()),
+    ("contact", pa.string()),
+    ("url", pa.string()),
+    ("scraped_at", pa.timestamp("us")),
+    ("age_min", pa.float64()),
+    ("age_max", pa.float64()),
+    ("student_only", pa.bool_()),
+    ("newcomer", pa.bool_()),
+    ("indigenous", pa.bool_()),
+    ("veteran", pa.bool_()),
+    ("income_max", pa.float64()),
+    ("org_types", pa.string()),
+    ("region", pa.string()),
+])
+NUMERIC_COLUMNS = ["funding_low", "funding_high", "age_min", "age_max", "income_max"]
+
+
+def micro_batches(records, batch_size=BATCH_SIZE):
+    """Group an iterable of records into lists of at most `batch_size`"""
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def normalize_batch(records, timings=None):
+    """Clean a batch of standardized grants into GRANTS table columns"""
+    frame = pd.DataFrame(records, columns=STANDARD_COLUMNS)
+    return normalize_grants(frame, timings=timings, verbose=False)
+
+
+def _parse_timestamps(series):
+    """
+    ISO 8601 strings, with or without fractional seconds or an offset, to
+    naive UTC timestamps. Raises on anything else rather than writing NaT.
+    """
+    parsed = pd.to_datetime(series, format="ISO8601", errors="coerce", utc=True)
+    bad = series.notna() & parsed.isna()
+    if bad.any():
+        raise ValueError(f"{int(bad.sum())} unparseable scraped_at values, e.g. {series[bad].iloc[0]!r}")
+    return parsed.dt.tz_convert(None)
+
+
+def to_typed_frame(df):
+    """Cast a cleaned (all-string) batch to the Parquet schema's dtypes"""
+    typed = df.replace({"": None})
+    for col in NUMERIC_COLUMNS:
+        typed[col] = pd.to_numeric(typed[col], errors="coerce")
+    typed["scraped_at"] = _parse_timestamps(typed["scraped_at"])
+    typed["deadline_date"] = typed["deadline_date"].map(deadlines.to_date)
+    return typed
+
+
+def _format_amount(value):
+    if pd.isna(value):
+        return None
+    return str(int(value)) if float(value).is_integer() else str(value)
+
+
+def _format_date(value):
+    value = deadlines.to_date(value)
+    return value.isoformat() if value else None
+
+
+def to_warehouse_frame(typed):
+    """Turn a typed Parquet batch back into GRANTS table strings for insert"""
+    df = typed.astype(object).where(typed.notna(), None)
+    for col in NUMERIC_COLUMNS:
+        df[col] = typed[col].map(_format_amount)
+    df["scraped_at"] = typed["scraped_at"].map(lambda ts: None if pd.isna(ts) else ts.isoformat())
+    df["deadline_date"] = typed["deadline_date"].map(_format_date)
+    return df.astype(object).where(df.notna(), None)
+
+
+def write_parquet_batch(df, output_dir, batch_num):
+    """Write one cleaned batch as a typed Parquet part file"""
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"part-{batch_num:05d}.parquet")
+    table = pa.Table.from_pandas(to_typed_frame(df), schema=GRANT_SCHEMA, preserve_index=False)
+    pq.write_table(table, path)
+    return path
+
+
+def read_parquet_batches(output_dir):
+    """Yield each Parquet part in a batch directory as a DataFrame"""
+    for name in sorted(os.listdir(output_dir)):
+        if name.endswith(".parquet"):
+            yield pq.read_table(os.path.join(output_dir, name)).to_pandas()
+
+
+def run_streaming_pipeline(grant_portal_pages=5, headless=True, incremental=True,
+                           batch_size=BATCH_SIZE, output_dir=None, upload=True):
+    """
+    Scrape every source and stream the grants to Parquet and Snowflake.
+
+    Args:
+        grant_portal_pages: Number of pages to scrape from Grant Portal
+        headless: Run browser in headless mode
+        incremental: Only new or changed grants are streamed; the scrape
+            state is saved only after every batch has been uploaded
+        batch_size: Grants per micro-batch
+        output_dir: Directory for Parquet parts (default: timestamped run dir)
+        upload: Upload each batch to Snowflake as it completes
+
+    Returns:
+        Dict with scraped/changed/uploaded counts and the Parquet directory
+    """
+    output_dir = output_dir or os.path.join(OUTPUT_DIR, datetime.now().strftime("%Y%m%d_%H%M%S"))
+    print("\n" + "=" * 70)
+    print("STREAMING GRANT PIPELINE")
+    print("=" * 70)
+    print(f"Batch size: {batch_size}  |  Parquet: {output_dir}  |  Upload: {upload}")
+
+    conn = cur = None
+    if upload:
+        conn = snowflake_uploader.get_connection()
+        cur = conn.cursor()
+        snowflake_uploader.create_grants_table(cur)
+
+    stats = {}
+    timings = {}
+    uploaded = 0
+    try:
+        # The crawl runs in background threads with a bounded buffer, so it
+        # keeps scraping while this loop normalizes and uploads a batch
+        state = consolidated_scraper.pending_state(incremental)
+        records = consolidated_scraper.stream_all_sources(grant_portal_pages, headless, incremental, stats=stats,
+                                                          state=state)
+        for batch_num, batch in enumerate(micro_batches(records, batch_size)):
+            df = normalize_batch(batch, timings=timings)
+            path = write_parquet_batch(df, output_dir, batch_num)
+            if upload:
+                uploaded += snowflake_uploader.insert_grants(cur, df)
+                conn.commit()
+            print(f"  Batch {batch_num + 1}: {len(df)} grants -> {path}")
+    except Exception:
+        if conn is not None:
+            conn.rollback()
+        raise
+    finally:
+        if conn is not None:
+            cur.close()
+            conn.close()
+
+    if upload:
+        # Every batch is in Snowflake; without an upload the grants are offered again next run
+        scrape_state.save_state(state)
+    print(f"\n✓ Scraped {stats.get('scraped', 0)} grants, {stats.get('changed', 0)} new or changed")
+    if timings:
+        stages = ", ".join(f"{k} {v:.1f} ms" for k, v in timings.items())
+        print(f"✓ Normalization: {stages}")
+    if upload:
+        print(f"✓ Uploaded {uploaded} grants to Snowflake")
+    return {**stats, "uploaded": uploaded, "output_dir": output_dir}
+
+
+if __name__ == "__main__":
+    run_streaming_pipeline()
@@ -0,0 +1,270 @@
+"""
+Match Result Cache
+A user's ranked matches are cached under
+
+    (user_id, profile hash, catalog version, scoring-rules version, request options)
+
+so opening the app again with an unchanged profile and catalog skips the
+warehouse, the embedding call and the scoring. Entries live in memory, backed
+by an optional local persistent store (MATCH_CACHE_BACKEND: "sqlite" or
+"memory") so they survive restarts.
+
+The profile hash a user is looked up under is remembered per user in the
+backend, so every worker process sees the same one: POST /user/ replaces it
+(dropping the user's old entries). Loading a catalog with a different
+version (publishing, or a changed unpublished catalog) purges entries for
+every other version.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MATCH_CACHE_BACKEND = os.getenv("MATCH_CACHE_BACKEND", "sqlite")
+MATCH_CACHE_FILE = os.getenv("MATCH_CACHE_FILE", "match_cache.sqlite3")
+MAX_MEMORY_ENTRIES = 5000
+
+# Profile fields the matcher reads; anything else (name, funding purpose)
+# can change without invalidating cached matches
+PROFILE_FIELDS = [
+    "project_summary",
+    "funding_goal_low",
+    "funding_goal_high",
+    "eligibility_tags",
+    "age",
+    "residency",
+    "income",
+    "race",
+    "gender",
+    "studentStatus",
+    "immigrantStatus",
+    "indigenousStatus",
+    "veteranStatus",
+]
+
+
+def parse_tags(tags_raw):
+    """Eligibility tags as a list, from a JSON array string, CSV string or list"""
+    if not tags_raw:
+        return []
+    if isinstance(tags_raw, str):
+        try:
+            tags = json.loads(tags_raw)
+        except ValueError:
+            return [t.strip().lower() for t in tags_raw.split(",")]
+        return [str(t) for t in tags] if isinstance(tags, list) else [str(tags)]
+    if isinstance(tags_raw, list):
+        return [str(t).lower() for t in tags_raw]
+    return []
+
+
+def _amount(value):
+    try:
+        return float(value) if value else 0.0
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def profile_hash(profile):
+    """Stable hash of the profile fields that affect matching"""
+    normalized = {}
+    for field in PROFILE_FIELDS:
+        value = profile.get(field)
+        if field == "eligibility_tags":
+            value = [t.strip().lower() for t in parse_tags(value)]
+        elif field in ("funding_goal_low", "funding_goal_high"):
+            value = _amount(value)
+        else:
+            value = "" if value is None else str(value).strip()
+        normalized[field] = value
+    raw = json.dumps(normalized, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:20]
+
+
+# ----------------------------------------------------------------------
+#  PERSISTENT BACKENDS
+# ----------------------------------------------------------------------
+class SqliteBackend:
+    """Cache entries in a local SQLite file"""
+
+    def __init__(self, path=MATCH_CACHE_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS match_cache (
+                    key TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    catalog_version TEXT,
+                    value TEXT NOT NULL,
+                    created_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS match_cache_user ON match_cache (user_id)")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS match_profiles (
+                    user_id TEXT PRIMARY KEY,
+                    profile_hash TEXT NOT NULL
+                )
+            """)
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM match_cache WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, user_id, catalog_version, value):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO match_cache (key, user_id, catalog_version, value, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, user_id, catalog_version, json.dumps(value), time.time()),
+            )
+
+    def get_profile_hash(self, user_id):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT profile_hash FROM match_profiles WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_profile_hash(self, user_id, phash):
+        """Remember the user's profile hash (None forgets it)"""
+        with self._lock, self._conn:
+            if phash is None:
+                self._conn.execute("DELETE FROM match_profiles WHERE user_id = ?", (user_id,))
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO match_profiles (user_id, profile_hash) VALUES (?, ?)",
+                    (user_id, phash),
+                )
+
+    def delete_user(self, user_id):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM match_cache WHERE user_id = ?", (user_id,))
+
+    def purge_versions(self, keep_version):
+        """Drop entries computed against any other catalog version"""
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                "DELETE FROM match_cache WHERE catalog_version IS NOT ?", (keep_version,)
+            )
+            return cur.rowcount
+
+
+BACKENDS = {
+    "sqlite": SqliteBackend,
+    "memory": None,
+}
+
+
+# ----------------------------------------------------------------------
+#  CACHE
+# ----------------------------------------------------------------------
+class MatchCache:
+    def __init__(self, backend=None):
+        self.backend = backend
+        self._memory = OrderedDict()
+        self._profile_hashes = {}
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _key(self, user_id, phash, catalog_version, rules_version, options):
+        return json.dumps([user_id, phash, catalog_version, rules_version, options], separators=(",", ":"))
+
+    def known_profile_hash(self, user_id):
+        """The user's current profile hash (from the backend when there is one)"""
+        if self.backend is not None:
+            # Another worker may have saved the profile since; never trust a local copy
+            return self.backend.get_profile_hash(user_id)
+        with self._lock:
+            return self._profile_hashes.get(user_id)
+
+    def remember_profile(self, user_id, phash):
+        if self.backend is not None:
+            self.backend.set_profile_hash(user_id, phash)
+            return
+        with self._lock:
+            self._profile_hashes[user_id] = phash
+
+    def get(self, user_id, phash, catalog_version, rules_version, options=None):
+        """Cached [(grant id, score), ...] ranking, or None"""
+        key = self._key(user_id, phash, catalog_version, rules_version, options)
+        with self._lock:
+            if catalog_version != self._version:
+                # New catalog: every in-memory entry is for an older version
+                self._memory.clear()
+                self._version = catalog_version
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                return value
+        if self.backend is None:
+            return None
+        value = self.backend.get(key)
+        if value is not None:
+            self._store(key, value)
+        return value
+
+    def put(self, user_id, phash, catalog_version, rules_version, value, options=None):
+        key = self._key(user_id, phash, catalog_version, rules_version, options)
+        self._store(key, value)
+        if self.backend is not None:
+            self.backend.put(key, user_id, catalog_version, value)
+
+    def _store(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > MAX_MEMORY_ENTRIES:
+                self._memory.popitem(last=False)
+
+    def invalidate_user(self, user_id, profile=None):
+        """Drop a user's cached matches; with `profile`, look them up under its hash from now on"""
+        prefix = json.dumps([user_id])[:-1] + ","
+        phash = profile_hash(profile) if profile is not None else None
+        with self._lock:
+            for key in [k for k in self._memory if k.startswith(prefix)]:
+                del self._memory[key]
+            if self.backend is None:
+                if phash is not None:
+                    self._profile_hashes[user_id] = phash
+                else:
+                    self._profile_hashes.pop(user_id, None)
+        if self.backend is not None:
+            self.backend.delete_user(user_id)
+            self.backend.set_profile_hash(user_id, phash)
+
+    def purge_versions(self, keep_version):
+        """Drop entries for catalog versions other than `keep_version`"""
+        with self._lock:
+            self._memory.clear()
+            self._version = keep_version
+        if self.backend is None:
+            return 0
+        return self.backend.purge_versions(keep_version)
+
+
+def open_backend(name=MATCH_CACHE_BACKEND):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown MATCH_CACHE_BACKEND '{name}' (expected one of {sorted(BACKENDS)})")
+    backend_cls = BACKENDS[name]
+    return backend_cls() if backend_cls else None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    """The process-wide match cache"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = MatchCache(open_backend())
+        return _cache
@@ -0,0 +1,112 @@
+"""
+Cursor Pagination
+A ranked list (catalog positions + scores) is computed once for the first
+page and kept in memory; follow-up pages are slices of that ranking, found
+through an opaque continuation token:
+
+    base64url({"r": ranking id, "o": offset, "v": catalog version})
+
+Tokens stop working when the ranking is evicted (RANKING_TTL / MAX_RANKINGS)
+or the published catalog version changes - the client starts again from the
+first page.
+"""
+
+import base64
+import binascii
+import json
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+RANKING_TTL = 1800        # seconds a ranking stays pageable
+MAX_RANKINGS = 1000       # rankings kept in memory (least recently used evicted)
+
+
+class InvalidCursor(ValueError):
+    """The cursor is malformed, expired, or from an older catalog"""
+
+
+class Ranking:
+    def __init__(self, catalog, indices, scores=None, owner=None, degraded=False):
+        self.id = uuid.uuid4().hex
+        self.owner = owner
+        self.degraded = degraded
+        self.catalog = catalog
+        self.indices = list(indices)
+        self.scores = list(scores) if scores is not None else None
+        self.created = time.time()
+
+    def __len__(self):
+        return len(self.indices)
+
+    def page(self, offset, page_size):
+        """(position, score) pairs for one page; score is None for unscored rankings"""
+        end = offset + page_size
+        scores = self.scores[offset:end] if self.scores is not None else [None] * len(self.indices[offset:end])
+        return list(zip(self.indices[offset:end], scores))
+
+
+_rankings = OrderedDict()
+_rankings_lock = threading.Lock()
+
+
+def store_ranking(catalog, indices, scores=None, owner=None, degraded=False):
+    """Keep a ranked list in memory so later pages can slice it (`owner` scopes its cursors)"""
+    ranking = Ranking(catalog, indices, scores, owner, degraded)
+    now = time.time()
+    with _rankings_lock:
+        _rankings[ranking.id] = ranking
+        while _rankings:
+            oldest = next(iter(_rankings.values()))
+            if len(_rankings) <= MAX_RANKINGS and now - oldest.created <= RANKING_TTL:
+                break
+            _rankings.popitem(last=False)
+    return ranking
+
+
+def encode_cursor(ranking, offset):
+    payload = json.dumps({"r": ranking.id, "o": offset, "v": ranking.catalog.version}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor):
+    """(ranking id, offset, catalog version) from a continuation token"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return str(payload["r"]), int(payload["o"]), payload.get("v")
+    except (binascii.Error, UnicodeError, ValueError, KeyError, TypeError):
+        raise InvalidCursor("Malformed cursor")
+
+
+def resolve_cursor(cursor, catalog_version, owner=None):
+    """The cached ranking and offset a cursor points at"""
+    ranking_id, offset, version = decode_cursor(cursor)
+    if version != catalog_version:
+        raise InvalidCursor("The grant catalog has changed since this cursor was issued")
+    with _rankings_lock:
+        ranking = _rankings.get(ranking_id)
+        if ranking is not None and ranking.owner != owner:
+            raise InvalidCursor("Cursor belongs to a different listing")
+        if ranking is None or time.time() - ranking.created > RANKING_TTL:
+            _rankings.pop(ranking_id, None)
+            raise InvalidCursor("Cursor expired")
+        _rankings.move_to_end(ranking_id)
+    if offset < 0 or offset > len(ranking):
+        raise InvalidCursor("Cursor offset out of range")
+    return ranking, offset
+
+
+def clamp_page_size(page_size):
+    return max(1, min(int(page_size or DEFAULT_PAGE_SIZE), MAX_PAGE_SIZE))
+
+
+def paginate(ranking, offset, page_size):
+    """One page of `ranking` plus the cursor for the next one (None at the end)"""
+    page = ranking.page(offset, page_size)
+    end = offset + len(page)
+    next_cursor = encode_cursor(ranking, end) if end < len(ranking) else None
+    return page, next_cursor
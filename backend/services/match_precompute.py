@@ -0,0 +1,125 @@
+"""
+Match Precomputation
+In-process worker queue that ranks a user's matches right after their
+profile is saved, so the home screen's first /match is a match-cache read
+instead of a profile fetch, embedding and full scoring.
+
+At most PRECOMPUTE_WORKERS users are ranked at once. A user is queued at
+most once: saving again while queued just updates the job, and saving
+while it runs queues one more run afterwards (the profile changed under it).
+A /match arriving while the user's job is pending waits briefly for it
+rather than ranking the same profile twice.
+
+Per-user status: queued, running, then ready (cached), degraded (lexical
+scores, not cached), missing (no such user) or failed.
+"""
+
+import asyncio
+import os
+import weakref
+from collections import OrderedDict
+
+PRECOMPUTE_WORKERS = int(os.getenv("MATCH_PRECOMPUTE_WORKERS", "2"))
+PRECOMPUTE_WAIT = float(os.getenv("MATCH_PRECOMPUTE_WAIT", "5"))   # seconds /match waits for a pending job
+MAX_PENDING = 1000              # queued users; saves beyond this are ranked on first /match instead
+MAX_TRACKED = 10000             # users whose last status is remembered
+
+
+async def _precompute(user_id, summary):
+    from services import matching_service
+
+    # Store the summary embedding first; the ranking below reads it
+    await matching_service.store_user_embedding(user_id, summary)
+    catalog, _, degraded = await matching_service.cached_rank_user_grants(user_id)
+    if catalog is None:
+        return "missing"
+    return "degraded" if degraded else "ready"
+
+
+class MatchPrecomputer:
+    def __init__(self, compute=None, workers=PRECOMPUTE_WORKERS, max_pending=MAX_PENDING):
+        self.compute = compute or _precompute
+        self.workers = workers
+        self._queue = asyncio.Queue(maxsize=max_pending)
+        self._tasks = []
+        self._summaries = {}       # user_id -> latest summary for its job
+        self._pending = {}         # user_id -> event set when its job finishes
+        self._rerun = set()        # saved again while running
+        self._status = OrderedDict()
+        self.completed = 0         # jobs finished (for monitoring)
+
+    def enqueue(self, user_id, summary=None):
+        """Queue a precompute for a saved profile; returns the user's status"""
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        self._summaries[user_id] = summary
+        if user_id in self._pending:
+            if self._status.get(user_id) == "running":
+                self._rerun.add(user_id)
+            return self._status[user_id]
+        try:
+            self._queue.put_nowait(user_id)
+        except asyncio.QueueFull:
+            self._summaries.pop(user_id, None)
+            print(f"⚠️ Match precompute queue full, skipping {user_id}")
+            return self.status(user_id)
+        self._pending[user_id] = asyncio.Event()
+        self._set_status(user_id, "queued")
+        return "queued"
+
+    def status(self, user_id):
+        """queued, running, ready, degraded, missing, failed - or None if never queued"""
+        return self._status.get(user_id)
+
+    async def wait(self, user_id, timeout=PRECOMPUTE_WAIT):
+        """Wait up to `timeout` seconds for the user's pending job, if any"""
+        event = self._pending.get(user_id)
+        if event is None:
+            return
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    def _set_status(self, user_id, status):
+        self._status[user_id] = status
+        self._status.move_to_end(user_id)
+        while len(self._status) > MAX_TRACKED:
+            self._status.popitem(last=False)
+
+    async def _worker(self):
+        while True:
+            user_id = await self._queue.get()
+            self._set_status(user_id, "running")
+            try:
+                status = await self.compute(user_id, self._summaries.get(user_id))
+            except Exception as e:
+                print(f"⚠️ Match precompute failed for {user_id} ({type(e).__name__}: {e})")
+                status = "failed"
+            finally:
+                self._queue.task_done()
+
+            if user_id in self._rerun:
+                self._rerun.discard(user_id)
+                try:
+                    self._queue.put_nowait(user_id)
+                    self._set_status(user_id, "queued")
+                    continue
+                except asyncio.QueueFull:
+                    pass
+            self._set_status(user_id, status)
+            self._summaries.pop(user_id, None)
+            self._pending.pop(user_id).set()
+            self.completed += 1
+
+
+_precomputers = weakref.WeakKeyDictionary()
+
+
+def get_precomputer():
+    """The precompute queue for the running event loop"""
+    loop = asyncio.get_running_loop()
+    precomputer = _precomputers.get(loop)
+    if precomputer is None:
+        precomputer = _precomputers[loop] = MatchPrecomputer()
+    return precomputer
@@ -0,0 +1,63 @@
+"""
+Streaming Match Responses
+Encodes a ranking as a stream for the swipe deck, so the client hears back
+before the ranking is done and the first cards render while the rest are
+still being formatted and sent:
+
+    ndjson  one JSON object per line (application/x-ndjson)
+    sse     server-sent events (text/event-stream)
+
+Events, in order: `start` (user_id) as soon as the stream opens, one
+`meta` (user_id, total, degraded) once the ranking is known, the top
+FIRST_CARDS `match` events flushed one by one, the remaining `match`
+events in chunks of CHUNK_SIZE, then `done` (sent). If ranking fails
+after `start` went out, an `error` (detail) event ends the stream instead.
+NDJSON lines carry the event name as "type".
+"""
+
+import asyncio
+import json
+
+from services.matching_service import format_match
+
+FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "sse": "text/event-stream",
+}
+FIRST_CARDS = 5
+CHUNK_SIZE = 25
+
+
+def encode(event, data, fmt):
+    if fmt == "sse":
+        return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    return json.dumps({"type": event, **data}) + "\n"
+
+
+async def stream_matches(user_id, rank, fmt="ndjson", limit=None, first=FIRST_CARDS, chunk_size=CHUNK_SIZE):
+    """
+    Yield the encoded events for a user's ranking. `rank()` returns an
+    awaitable for (catalog, ranked [(catalog position, score), ...], degraded);
+    it is only called after `start` has been sent.
+    """
+    yield encode("start", {"user_id": user_id}, fmt)
+    try:
+        catalog, ranked, degraded = await rank()
+    except Exception as e:
+        # Headers are already sent, so the failure can only go in the stream
+        print(f"❌ Match stream for {user_id} failed: {e}")
+        yield encode("error", {"detail": "Ranking failed"}, fmt)
+        return
+    if limit is not None:
+        ranked = ranked[:max(0, limit)]
+    yield encode("meta", {"user_id": user_id, "total": len(ranked), "degraded": degraded}, fmt)
+    for i, score in ranked[:first]:
+        yield encode("match", format_match(catalog.grants[i], score), fmt)
+    for start in range(first, len(ranked), chunk_size):
+        # Let the server flush (and other requests run) between chunks
+        await asyncio.sleep(0)
+        yield "".join(
+            encode("match", format_match(catalog.grants[i], score), fmt)
+            for i, score in ranked[start:start + chunk_size]
+        )
+    yield encode("done", {"sent": len(ranked)}, fmt)
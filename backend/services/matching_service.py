@@ -1,255 +1,386 @@
-from services import snowflake_service, gemini_service
+from services import snowflake_service, gemini_service, grant_catalog, eligibility_criteria, tag_matcher, scoring_rules, match_cache, embedding_batcher, circuit_breaker, user_vectors
+import asyncio
 import numpy as np
-import json
 import os
 
+# Deadline for the user embedding on the match path; past it (or while the
+# circuit is open) matches fall back to lexical scoring, marked degraded
+MATCH_EMBED_DEADLINE = float(os.getenv("MATCH_EMBED_DEADLINE", "2.5"))
 
-def match_user_to_grants(user_id: str, limit=20):
+
+def _display_amount(value):
+    """Format a funding amount with thousands separators (raw value if unparseable)"""
+    if not value:
+        return value
+    text = str(value).replace("$", "").replace(",", "").strip()
+    if not text:
+        return value
+    try:
+        return f"{int(float(text)):,}"
+    except (ValueError, OverflowError):
+        return value
+
+
+def format_match(grant, score):
+    """Response dict for one matched grant"""
+    desc = grant["description"]
+    deadline_date = grant["deadline_date"]
+    return {
+        "id": grant["id"],
+        "program_name": grant["program_name"],
+        "url": grant["url"] or "",
+        "description": (desc[:200] + "...") if desc and len(desc) > 200 else (desc or "No description available"),
+        "funding_low": _display_amount(grant["funding_low"]),
+        "funding_high": _display_amount(grant["funding_high"]),
+        "deadline": grant["deadline"] or "Rolling deadline",
+        "deadline_date": deadline_date.isoformat() if deadline_date else None,
+        "source": grant["source"] or "Ontario",
+        "score": round(float(score), 3),
+    }
+
+
+def top_k(indices, scores, k):
+    """
+    The k best (index, score) pairs, highest displayed score first and
+    catalog order breaking ties - picked with argpartition, so only the k
+    winners are ever sorted.
+    """
+    n = len(indices)
+    if n == 0 or k <= 0:
+        return []
+    # One integer key: displayed (3-decimal) score, then earlier position wins
+    keys = np.round(scores * 1000).astype(np.int64) * (n + 1) + (n - np.arange(n))
+    if k < n:
+        part = np.argpartition(-keys, k - 1)[:k]
+    else:
+        part = np.arange(n)
+    ordered = part[np.argsort(-keys[part])]
+    return [(indices[j], scores[j]) for j in ordered]
+
+
+USER_PROFILE_SQL = """
+    SELECT 
+        project_summary, 
+        funding_goal_low, 
+        funding_goal_high, 
+        eligibility_tags,
+        name,
+        age,
+        residency,
+        income,
+        race,
+        gender,
+        studentStatus,
+        immigrantStatus,
+        indigenousStatus,
+        veteranStatus
+    FROM FUND_DB.PUBLIC.USERS
+    WHERE user_id = %s
+    LIMIT 1;
+"""
+USER_PROFILE_FIELDS = [
+    "project_summary", "funding_goal_low", "funding_goal_high", "eligibility_tags", "name",
+    "age", "residency", "income", "race", "gender",
+    "studentStatus", "immigrantStatus", "indigenousStatus", "veteranStatus",
+]
+
+
+def fetch_user_profile(user_id: str):
+    """The user's matching profile from Snowflake (None if there is no such user)"""
+    conn = snowflake_service.get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(USER_PROFILE_SQL, (user_id,))
+        user = cur.fetchone()
+    finally:
+        cur.close()
+        conn.close()
+    if not user:
+        return None
+    profile = dict(zip(USER_PROFILE_FIELDS, user))
+    profile["user_id"] = user_id
+    return profile
+
+
+def rank_user_grants(user_id: str, limit=None, boost_closing_soon=False):
     """
-    Match user to grants using precomputed embeddings.
+    Rank grants for a user using precomputed embeddings.
     Only 1 Gemini API call (for user embedding).
+    Grants past their deadline or ruled out by their eligibility criteria
+    (age, student-only, income cap, region) are dropped before scoring.
     
     Args:
         user_id: The user's unique identifier
-        limit: Maximum number of matches to return (default 20)
+        limit: Keep only the best `limit` grants (default: the whole ranking)
+        boost_closing_soon: Nudge up grants closing within the next two weeks
     
     Returns:
-        List of matched grants with scores, sorted by relevance
+        (catalog, [(catalog position, score), ...]) sorted by relevance;
+        catalog is None when the user or the embeddings are missing
     """
-    conn = snowflake_service.get_connection()
-    cur = conn.cursor()
+    profile = fetch_user_profile(user_id)
+    if profile is None:
+        print(f"❌ No user found with ID {user_id}")
+        return None, []
+    return rank_profile(profile, limit=limit, boost_closing_soon=boost_closing_soon)
+
+
+async def cached_rank_user_grants(user_id: str, boost_closing_soon=False):
+    """
+    rank_user_grants for the whole ranking, served from the match cache
+    while the user's profile, the catalog and the scoring rules are unchanged.
 
-    # Fetch user profile
-    cur.execute(
-        """
-        SELECT 
-            project_summary, 
-            funding_goal_low, 
-            funding_goal_high, 
-            eligibility_tags,
-            name,
-            age,
-            residency,
-            income,
-            race,
-            gender,
-            studentStatus,
-            immigrantStatus,
-            indigenousStatus,
-            veteranStatus
-        FROM FUND_DB.PUBLIC.USERS
-        WHERE user_id = %s
-        LIMIT 1;
-        """,
-        (user_id,),
+    Async: warehouse calls run on the bounded warehouse pool, and the profile
+    fetch runs alongside the catalog freshness check. The user embedding
+    has MATCH_EMBED_DEADLINE seconds behind a circuit breaker; without it
+    grants are scored lexically.
+
+    Returns:
+        (catalog, ranked, degraded) - degraded rankings are never cached
+    """
+    catalog_task = asyncio.ensure_future(snowflake_service.run_blocking(grant_catalog.get_catalog))
+    rules = scoring_rules.get_rules()
+    cache = match_cache.get_cache()
+    options = {"boost_closing_soon": bool(boost_closing_soon)}
+
+    def from_cache(catalog, phash):
+        version = catalog.cache_version
+        cached = cache.get(user_id, phash, version, rules.version, options)
+        if cached is None:
+            return None
+        return [(catalog.positions[gid], score) for gid, score in cached if gid in catalog.positions]
+
+    # Known profile hash: a hit needs no warehouse or embedding call at all
+    phash = cache.known_profile_hash(user_id)
+    if phash:
+        catalog = await catalog_task
+        ranked = from_cache(catalog, phash)
+        if ranked is not None:
+            return catalog, ranked, False
+
+    catalog, profile = await asyncio.gather(
+        catalog_task,
+        snowflake_service.run_blocking(fetch_user_profile, user_id),
     )
-    user = cur.fetchone()
-    if not user:
-        cur.close()
-        conn.close()
+    if profile is None:
         print(f"❌ No user found with ID {user_id}")
-        return []
+        return None, [], False
+    phash = match_cache.profile_hash(profile)
+    cache.remember_profile(user_id, phash)
+    ranked = from_cache(catalog, phash)
+    if ranked is not None:
+        return catalog, ranked, False
+
+    if catalog.embedding_model and catalog.embedding_model != gemini_service.model_id():
+        # User and grant vectors from different models are not comparable
+        print(f"⚠️ Grant embeddings are from {catalog.embedding_model}, embedder is {gemini_service.model_id()}; "
+              "using lexical scoring")
+        user_vec = None
+    else:
+        # Stored when the profile was saved; embedded (and stored) here only on a miss
+        summary = profile["project_summary"] or ""
+        store = user_vectors.get_store()
+        user_vec = store.get(user_id, summary, gemini_service.model_id())
+        if user_vec is None:
+            user_vec = await _user_embedding(summary)
+            if user_vec is not None:
+                store.put(user_id, summary, gemini_service.model_id(), user_vec)
+    degraded = user_vec is None
+    scored_catalog, ranked = await asyncio.to_thread(
+        rank_profile, profile, boost_closing_soon=boost_closing_soon,
+        catalog=catalog, rules=rules, user_vec=user_vec, lexical=degraded,
+    )
+    if scored_catalog is not None and not degraded:
+        version = catalog.cache_version
+        cache.put(user_id, phash, version, rules.version,
+                  [[catalog.ids[i], float(score)] for i, score in ranked], options)
+    return scored_catalog, ranked, degraded
+
+
+async def _user_embedding(summary):
+    """User embedding within MATCH_EMBED_DEADLINE, or None (timeout, error, open circuit)"""
+    breaker = circuit_breaker.get_breaker("gemini_embeddings")
+    if not breaker.allow():
+        print("⚠️ Embedding circuit open, using lexical scoring")
+        return None
+    try:
+        # Batched with concurrent requests; identical summaries share one embedding
+        user_vec = await embedding_batcher.embed(summary, timeout=MATCH_EMBED_DEADLINE)
+    except Exception as e:
+        breaker.record_failure()
+        print(f"⚠️ User embedding failed ({type(e).__name__}: {e}), using lexical scoring")
+        return None
+    except BaseException:
+        # Cancelled (e.g. the client disconnected): no outcome, but free the trial slot
+        breaker.release()
+        raise
+    breaker.record_success()
+    return user_vec
+
+
+async def store_user_embedding(user_id: str, summary):
+    """
+    Embed a saved profile's summary into the user vector store, so matching
+    and batch jobs read it instead of calling the embedder. Runs in the
+    match precompute job after POST /user/; failures only mean a later embed.
+    """
+    summary = summary or ""
+    model = gemini_service.model_id()
+    store = user_vectors.get_store()
+    if store.get(user_id, summary, model) is not None:
+        return
+    breaker = circuit_breaker.get_breaker("gemini_embeddings")
+    if not breaker.allow():
+        return
+    try:
+        user_vec = await embedding_batcher.embed(summary, timeout=gemini_service.EMBED_TIMEOUT)
+    except Exception as e:
+        breaker.record_failure()
+        print(f"⚠️ Could not embed profile summary for {user_id} ({type(e).__name__}: {e})")
+        return
+    except BaseException:
+        breaker.release()
+        raise
+    breaker.record_success()
+    store.put(user_id, summary, model, user_vec)
+    print(f"🧠 Stored summary embedding for {user_id}")
+
+
+def stored_user_embedding(profile):
+    """The profile's summary embedding from the vector store, embedded and stored on a miss"""
+    summary = profile["project_summary"] or ""
+    user_id = profile.get("user_id")
+    if user_id is None:
+        return gemini_service.get_embedding(summary)
+    model = gemini_service.model_id()
+    store = user_vectors.get_store()
+    user_vec = store.get(user_id, summary, model)
+    if user_vec is None:
+        user_vec = gemini_service.get_embedding(summary)
+        store.put(user_id, summary, model, user_vec)
+    return user_vec
+
+
+def rank_profile(profile, limit=None, boost_closing_soon=False, catalog=None, rules=None, user_vec=None,
+                 lexical=False, verbose=True):
+    """
+    Rank grants for a profile from fetch_user_profile (see rank_user_grants).
+    lexical=True scores word overlap with the summary and tags instead of
+    embedding similarity (no API call). verbose=False silences per-user
+    progress output (batch jobs).
+    """
+    user_id = profile.get("user_id")
 
     # Unpack user data
-    user_summary = user[0] or ""
-    goal_low = float(user[1]) if user[1] else 0
-    goal_high = float(user[2]) if user[2] else 0
-    tags_raw = user[3]
+    user_summary = profile["project_summary"] or ""
+    goal_low = float(profile["funding_goal_low"]) if profile["funding_goal_low"] else 0
+    goal_high = float(profile["funding_goal_high"]) if profile["funding_goal_high"] else 0
     
     # User demographic info for enhanced matching
-    user_name = user[4]
-    user_age = user[5]
-    user_residency = user[6]
-    user_income = user[7]
-    user_race = user[8]
-    user_gender = user[9]
-    user_student = user[10]
-    user_immigrant = user[11]
-    user_indigenous = user[12]
-    user_veteran = user[13]
+    user_name = profile["name"]
+    user_age = profile["age"]
+    user_residency = profile["residency"]
+    user_income = profile["income"]
+    user_race = profile["race"]
+    user_gender = profile["gender"]
+    user_student = profile["studentStatus"]
+    user_immigrant = profile["immigrantStatus"]
+    user_indigenous = profile["indigenousStatus"]
+    user_veteran = profile["veteranStatus"]
 
     # Parse eligibility tags
-    tags = []
-    if tags_raw:
-        if isinstance(tags_raw, str):
-            try:
-                tags = json.loads(tags_raw)
-            except:
-                tags = [t.strip().lower() for t in tags_raw.split(",")]
-        elif isinstance(tags_raw, list):
-            tags = [str(t).lower() for t in tags_raw]
-
-    print(f"🔍 Matching user: {user_name} (ID: {user_id})")
-    print(f"   Tags: {tags}")
-    print(f"   Funding goal: ${goal_low} - ${goal_high}")
-
-    # Load precomputed embeddings (no API call here!)
-    try:
-        grant_vecs = gemini_service.load_cached_embeddings()
+    tags = match_cache.parse_tags(profile["eligibility_tags"])
+
+    if verbose:
+        print(f"🔍 Matching user: {user_name} (ID: {user_id})")
+        print(f"   Tags: {tags}")
+        print(f"   Funding goal: ${goal_low} - ${goal_high}")
+
+    # Grants + precomputed embeddings from the in-memory catalog (no API call here!)
+    catalog = catalog or grant_catalog.get_catalog()
+    grant_vecs = catalog.vectors
+    if grant_vecs is None:
+        return None, []
+    if verbose:
         print(f"✅ Loaded {len(grant_vecs)} precomputed grant embeddings")
-    except FileNotFoundError as e:
-        cur.close()
-        conn.close()
-        print(str(e))
-        return []
 
-    # Fetch all grants with complete information
-    cur.execute(
-        """
-        SELECT 
-            program_name, 
-            description, 
-            eligibility, 
-            funding_low, 
-            funding_high,
-            deadline,
-            source,
-            url
-        FROM FUND_DB.PUBLIC.GRANTS
-        WHERE description IS NOT NULL
-        ORDER BY scraped_at DESC
-        """
+    if len(catalog) != len(grant_vecs):
+        print(f"⚠️ Mismatch: {len(catalog)} grants vs {len(grant_vecs)} embeddings")
+        print("   Regenerate embeddings: python scripts/generate_embeddings_with_ratelimit.py")
+        return None, []
+
+    # Drop expired and ineligible grants before scoring (precomputed masks)
+    try:
+        age_num = int(user_age) if user_age else None
+    except (ValueError, TypeError):
+        age_num = None
+    open_mask = catalog.open_mask()
+    eligible = catalog.eligible_mask(
+        age=age_num,
+        student=eligibility_criteria.is_student(user_student),
+        income=eligibility_criteria.income_floor(user_income),
+        residency=user_residency or None,
     )
-    grants = cur.fetchall()
-    cur.close()
-    conn.close()
+    candidates = np.flatnonzero(open_mask & eligible & catalog.named)
+    if verbose:
+        print(f"📊 Processing {len(candidates)} open grants for matching "
+              f"({len(catalog) - int(open_mask.sum())} expired, {int((open_mask & ~eligible).sum())} ineligible)...")
 
-    if len(grants) != len(grant_vecs):
-        print(f"⚠️ Mismatch: {len(grants)} grants vs {len(grant_vecs)} embeddings")
-        print("   Regenerate embeddings: python scripts/generate_embeddings_with_ratelimit.py")
-        return []
+    if lexical:
+        # Degraded: word overlap stands in for semantic similarity
+        query = " ".join([user_summary] + [str(t) for t in tags])
+        base_scores = (catalog.lexical_similarities(query, candidates) + 1) / 2
+    else:
+        # Stored user embedding (at most one API call, only if the summary changed)
+        if user_vec is None:
+            user_vec = stored_user_embedding(profile)
+        if catalog.projection is not None:
+            # Grants are stored reduced; project the user into the same space
+            user_vec = catalog.projection.apply(user_vec)
+
+        # Semantic similarity for every candidate at once, normalized to 0-1
+        base_scores = (catalog.similarities(user_vec, candidates) + 1) / 2
+
+    # Rule-based funding overlap check (unparseable amounts never filter)
+    funding_ok = catalog.funding_overlap(goal_low, goal_high)[candidates]
+
+    # Boosts from scoring_rules.json, compiled to a mat-vec over grant features
+    rules = rules or scoring_rules.get_rules()
+    rule_profile = {
+        "age": user_age,
+        "residency": user_residency,
+        "income": user_income,
+        "race": user_race,
+        "gender": user_gender,
+        "studentStatus": user_student,
+        "immigrantStatus": user_immigrant,
+        "indigenousStatus": user_indigenous,
+        "veteranStatus": user_veteran,
+        "boost_closing_soon": boost_closing_soon,
+    }
+    boosts = rules.boosts(catalog, rule_profile)[candidates]
+    # Tag mentions from per-catalog tag masks (no text scanned per request)
+    boosts = boosts + rules.tag_weight * tag_matcher.tag_counts(catalog, tags, candidates)
+
+    # Calculate total score (capped), keeping grants with a reasonable match score
+    total_scores = np.minimum(base_scores + boosts, rules.max_score)
+    keep = funding_ok & (total_scores >= rules.min_score)
 
-    print(f"📊 Processing {len(grants)} grants for matching...")
-
-    # Compute user embedding (only one API call total!)
-    user_vec = gemini_service.get_embedding(user_summary)
-
-    matches = []
-    for i, g in enumerate(grants):
-        name, desc, elig, low, high, deadline, source, url = g
-        
-        # Skip grants with no name
-        if not name:
-            continue
-        
-        g_vec = grant_vecs[i]
-        
-        # Calculate semantic similarity using embeddings
-        sim = gemini_service.cosine_similarity(user_vec, g_vec)
-        # Normalize score to 0-1 range
-        base_score = (sim + 1) / 2
-
-        # Rule-based funding overlap check
-        funding_match = True
-        if goal_low and goal_high and low and high:
-            try:
-                # Clean and parse funding amounts
-                low_str = str(low).replace("$", "").replace(",", "").strip()
-                high_str = str(high).replace("$", "").replace(",", "").strip()
-                
-                if low_str and high_str:
-                    low_f = float(low_str)
-                    high_f = float(high_str)
-                    # Check if there's any overlap between user's goal and grant's range
-                    if not (low_f <= goal_high and high_f >= goal_low):
-                        funding_match = False
-            except (ValueError, TypeError):
-                # If parsing fails, don't filter out the grant
-                pass
-
-        # Skip if funding doesn't match
-        if not funding_match:
-            continue
-
-        # Demographic and eligibility matching boosts
-        tag_boost = 0
-        text_lower = f"{desc or ''} {elig or ''}".lower()
-        
-        # Boost for matching eligibility tags
-        for tag in tags:
-            if tag in text_lower:
-                tag_boost += 0.05
-        
-        # Boost for demographic matches
-        if user_student and user_student.lower() != "none":
-            if "student" in text_lower:
-                tag_boost += 0.08
-        
-        if user_immigrant and user_immigrant.lower() == "yes":
-            if "immigrant" in text_lower or "newcomer" in text_lower:
-                tag_boost += 0.08
-        
-        if user_indigenous and user_indigenous.lower() == "yes":
-            if "indigenous" in text_lower or "first nation" in text_lower or "aboriginal" in text_lower:
-                tag_boost += 0.1
-        
-        if user_veteran and user_veteran.lower() == "yes":
-            if "veteran" in text_lower or "military" in text_lower:
-                tag_boost += 0.08
-        
-        # Age-based matching
-        if user_age:
-            try:
-                age_num = int(user_age)
-                if age_num < 30 and "youth" in text_lower:
-                    tag_boost += 0.06
-                elif age_num >= 65 and ("senior" in text_lower or "elder" in text_lower):
-                    tag_boost += 0.06
-            except (ValueError, TypeError):
-                pass
-        
-        # Gender-specific programs
-        if user_gender:
-            gender_lower = user_gender.lower()
-            if "women" in text_lower and gender_lower == "female":
-                tag_boost += 0.06
-            elif "men" in text_lower and gender_lower == "male":
-                tag_boost += 0.06
-
-        # Calculate total score (cap at 1.0)
-        total_score = min(base_score + tag_boost, 1.0)
-        
-        # Only include grants with a reasonable match score (>= 0.3)
-        if total_score < 0.3:
-            continue
-
-        # Format funding amounts for display
-        funding_low_display = low
-        funding_high_display = high
-        
-        # Clean funding values if they exist
-        if low:
-            low_str = str(low).replace("$", "").replace(",", "").strip()
-            if low_str:
-                try:
-                    funding_low_display = f"{int(float(low_str)):,}"
-                except:
-                    funding_low_display = low
-        
-        if high:
-            high_str = str(high).replace("$", "").replace(",", "").strip()
-            if high_str:
-                try:
-                    funding_high_display = f"{int(float(high_str)):,}"
-                except:
-                    funding_high_display = high
-
-        matches.append({
-            "program_name": name,
-            "url": url or "",
-            "description": (desc[:200] + "...") if desc and len(desc) > 200 else (desc or "No description available"),
-            "funding_low": funding_low_display,
-            "funding_high": funding_high_display,
-            "deadline": deadline or "Rolling deadline",
-            "source": source or "Ontario",
-            "score": round(total_score, 3),
-        })
-
-    # Sort by score (highest first) and limit results
-    matches = sorted(matches, key=lambda x: x["score"], reverse=True)[:limit]
+    # Top-k on raw scores first; callers format only the grants they return
+    kept = candidates[keep]
+    return catalog, top_k(kept, total_scores[keep], limit if limit is not None else len(kept))
+
+
+def match_user_to_grants(user_id: str, limit=20, boost_closing_soon=False):
+    """
+    Top `limit` grant matches for a user, formatted for the API.
+    See rank_user_grants for how grants are filtered and scored.
+    """
+    catalog, top = rank_user_grants(user_id, limit=limit, boost_closing_soon=boost_closing_soon)
+    matches = [format_match(catalog.grants[i], score) for i, score in top]
     
     print(f"✅ Matching complete — returning top {len(matches)} results")
     if matches:
         print(f"   Top match: {matches[0]['program_name']} (score: {matches[0]['score']})")
     
-    return matches
\ No newline at end of file
+    return matches
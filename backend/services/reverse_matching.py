@@ -0,0 +1,160 @@
+"""
+Reverse Matching
+Scores newly published grants against every user, so users can be told
+about new matches without re-running full matching for everyone.
+
+Grants are "new" when their id was not in the catalog the previous run saw
+(REVERSE_MATCH_STATE_FILE); the very first run only records that baseline.
+Each user is ranked with rank_profile over a catalog of just the new grants,
+so the funding, eligibility and scoring rules are the same as /match and
+the cost is new grants x users rather than catalog x users. User vectors
+come from the user vector store; only users whose summary changed since
+their vector was stored are embedded (in batches).
+
+Matches are appended to NEW_MATCHES_FILE as JSON lines:
+    {"user_id", "grant_id", "program_name", "url", "score", "catalog_version", "created_at"}
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+
+from services import gemini_service, grant_catalog, matching_service, scoring_rules, snowflake_service, user_vectors
+
+REVERSE_MATCH_STATE_FILE = "reverse_match_state.json"
+NEW_MATCHES_FILE = "new_matches.jsonl"
+MAX_NEW_MATCHES = 5            # per user per run
+EMBED_BATCH_SIZE = 50          # summaries per embedding call
+
+USERS_SQL = f"""
+    SELECT user_id, {", ".join(matching_service.USER_PROFILE_FIELDS)}
+    FROM FUND_DB.PUBLIC.USERS
+"""
+
+
+def fetch_user_profiles():
+    """Every user's matching profile (same shape as matching_service.fetch_user_profile)"""
+    conn = snowflake_service.get_connection()
+    cur = conn.cursor()
+    try:
+        cur.execute(USERS_SQL)
+        rows = cur.fetchall()
+    finally:
+        cur.close()
+        conn.close()
+    profiles = []
+    for row in rows:
+        profile = dict(zip(matching_service.USER_PROFILE_FIELDS, row[1:]))
+        profile["user_id"] = row[0]
+        profiles.append(profile)
+    return profiles
+
+
+def load_state(path=REVERSE_MATCH_STATE_FILE):
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_state(state, path=REVERSE_MATCH_STATE_FILE):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def user_matrix(profiles, model):
+    """
+    (len(profiles), dim) user vectors from the vector store; users without a
+    current vector are embedded in batches and stored.
+    """
+    store = user_vectors.get_store()
+    summaries = {p["user_id"]: p["project_summary"] or "" for p in profiles}
+    matrix, missing = store.matrix(summaries, model)
+    if not missing:
+        return matrix, 0
+
+    fresh = {}
+    for start in range(0, len(missing), EMBED_BATCH_SIZE):
+        batch = missing[start:start + EMBED_BATCH_SIZE]
+        vectors = gemini_service.get_embeddings([summaries[uid] for uid in batch])
+        store.put_many([(uid, summaries[uid], vec) for uid, vec in zip(batch, vectors)], model)
+        fresh.update(zip(batch, vectors))
+    if matrix.shape[1] == 0:
+        matrix = np.zeros((len(profiles), gemini_service.OUTPUT_DIM), dtype=np.float32)
+    row_of = {uid: i for i, uid in enumerate(summaries)}
+    for uid, vec in fresh.items():
+        matrix[row_of[uid]] = vec
+    return matrix, len(missing)
+
+
+def match_new_grants(catalog, positions, profiles, limit=MAX_NEW_MATCHES):
+    """New-match records for the grants at `positions`, best `limit` per user"""
+    if not len(positions) or not profiles:
+        return []
+    model = gemini_service.model_id()
+    if catalog.embedding_model and catalog.embedding_model != model:
+        raise RuntimeError(f"Grant embeddings are from {catalog.embedding_model}, embedder is {model}")
+
+    new_catalog = catalog.subset(positions)
+    matrix, embedded = user_matrix(profiles, model)
+    print(f"🧮 {len(positions)} new grants x {len(profiles)} users ({embedded} user summaries embedded)")
+
+    rules = scoring_rules.get_rules()
+    created_at = datetime.now().isoformat()
+    records = []
+    for profile, user_vec in zip(profiles, matrix):
+        _, ranked = matching_service.rank_profile(
+            profile, limit=limit, catalog=new_catalog, rules=rules, user_vec=user_vec, verbose=False,
+        )
+        for i, score in ranked:
+            grant = new_catalog.grants[i]
+            records.append({
+                "user_id": profile["user_id"],
+                "grant_id": grant["id"],
+                "program_name": grant["program_name"],
+                "url": grant["url"] or "",
+                "score": round(float(score), 3),
+                "catalog_version": catalog.version,
+                "created_at": created_at,
+            })
+    return records
+
+
+def run(state_path=REVERSE_MATCH_STATE_FILE, out_path=NEW_MATCHES_FILE, limit=MAX_NEW_MATCHES):
+    """
+    Match grants published since the last run and append them to out_path.
+    Returns a summary dict (also the pipeline's notify stage result).
+    """
+    catalog = grant_catalog.load_catalog()
+    if catalog.vectors is None:
+        raise RuntimeError("No published grant embeddings to match against")
+    state = load_state(state_path)
+    new_state = {"version": catalog.version, "grant_ids": sorted(set(catalog.ids))}
+
+    if state is None:
+        save_state(new_state, state_path)
+        print(f"Recorded {len(new_state['grant_ids'])} grants as the reverse-matching baseline")
+        return {"new_grants": 0, "users": 0, "matches": 0, "baseline": True}
+
+    seen = set(state.get("grant_ids", []))
+    positions = [catalog.positions[gid] for gid in dict.fromkeys(catalog.ids) if gid not in seen]
+    positions = [i for i in positions if catalog.named[i]]
+    if not positions:
+        save_state(new_state, state_path)
+        print("No new grants since the last reverse-matching run")
+        return {"new_grants": 0, "users": 0, "matches": 0}
+
+    profiles = fetch_user_profiles()
+    records = match_new_grants(catalog, positions, profiles, limit=limit)
+    with open(out_path, "a", encoding="utf-8") as f:
+        for record in records:
+            f.write(json.dumps(record) + "\n")
+    save_state(new_state, state_path)
+
+    notified = len({r["user_id"] for r in records})
+    print(f"✅ {len(records)} new matches for {notified} users written to {out_path}")
+    return {"new_grants": len(positions), "users": len(profiles), "matches": len(records), "notified": notified}
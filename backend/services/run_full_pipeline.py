@@ -1,129 +1,547 @@
 """
 Complete Ontario Grants Pipeline
-Run this to scrape all sources and upload to Snowflake in one command
+Runs every stage in-process and checkpoints each one, so a failed or
+interrupted run picks up where it stopped instead of starting over:
 
-IMPORTANT: Make sure you have these files in the same directory:
-1. This file (run_full_pipeline.py)
-2. consolidated_scraper.py (the main scraper)
-3. snowflake_uploader.py (the upload script)
+    scrape     crawl every source; each finished page is appended to a job log
+    normalize  change-filter and clean grants into typed Parquet parts
+    upload     insert each Parquet part into Snowflake
+    embed      embed the Snowflake catalog, reusing vectors for unchanged text
+    index      assemble the embedding matrix and metadata for serving
+    publish    swap the new index into place and bump the catalog version
+    notify     score newly published grants against every user (reverse matching)
+
+Each run lives in pipeline_runs/<run_id>/ with a manifest.json recording
+stage status, outputs and timings. The run's scrape state (ETags, page and
+grant hashes) is kept in the run directory and only replaces the shared
+scrape_state.json once the upload stage has put every part in Snowflake, so
+grants from a run that fails before then are fetched again next time.
+
+Usage:
+    python services/run_full_pipeline.py                     # new run
+    python services/run_full_pipeline.py --resume            # resume latest unfinished run
+    python services/run_full_pipeline.py --resume <run_id>   # resume a specific run
 """
 
-import sys
+import argparse
+import json
 import os
+import shutil
+import sys
+import threading
+import time
 from datetime import datetime
-import subprocess
 
-def run_scraper():
-    """Run the consolidated scraper"""
-    print("="*70)
-    print("STEP 1: Running Consolidated Scraper")
-    print("="*70)
-    
-    # Check if scraper file exists
-    if not os.path.exists('consolidated_scraper.py'):
-        print("✗ Error: consolidated_scraper.py not found!")
-        print("  Please save the consolidated scraper artifact as 'consolidated_scraper.py'")
-        return None
-    
-    try:
-        # Run as subprocess to avoid import issues
-        result = subprocess.run(
-            [sys.executable, 'consolidated_scraper.py'],
-            capture_output=True,
-            text=True
-        )
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-        
-        if result.returncode != 0:
-            print("✗ Scraper failed")
-            return None
-        
-        # Find the generated CSV file
-        import glob
-        csv_files = glob.glob("ontario_grants_consolidated_*.csv")
-        if csv_files:
-            latest_csv = max(csv_files, key=os.path.getctime)
-            print(f"\n✓ Scraping complete: {latest_csv}")
-            return latest_csv
-        else:
-            print("✗ No CSV file generated")
+import numpy as np
+import pyarrow.parquet as pq
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from services import embedding_reduction, grant_dedupe, grant_neighbors, grant_stream, match_cache, scrape_state, snowflake_service, snowflake_uploader
+from services.scrape_sources import CrawlScheduler, get_sources
+
+RUNS_DIR = "pipeline_runs"
+STAGES = ["scrape", "normalize", "upload", "embed", "index", "publish", "notify"]
+
+EMBED_BATCH_SIZE = 50         # texts per embedding API call
+EMBED_DELAY = 1.0             # seconds between embedding API calls (remote embedders only)
+
+# Published artifacts (read by the matching service from the backend root)
+CACHE_FILE = "grant_embeddings.npy"
+META_FILE = "grant_metadata.json"
+CATALOG_VERSION_FILE = "catalog_version.json"
+PROJECTION_FILE = "grant_projection.npz"          # only when embeddings are reduced
+FULL_CACHE_FILE = "grant_embeddings_full.npy"     # unreduced vectors, kept for reuse
+NEIGHBORS_FILE = grant_neighbors.NEIGHBORS_FILE   # similar-grants graph
+
+
+# ============================================================================
+# RUN + MANIFEST
+# ============================================================================
+
+def _write_json(path, data):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, default=str)
+    os.replace(tmp_path, path)
+
+
+def _read_jsonl(path):
+    if not os.path.exists(path):
+        return
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue  # torn last line from an interrupted run
+
+
+class PipelineRun:
+    """A pipeline run directory plus its checkpoint manifest"""
+
+    def __init__(self, run_dir, manifest):
+        self.run_dir = run_dir
+        self.manifest = manifest
+
+    @classmethod
+    def create(cls, options):
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        run_dir = os.path.join(RUNS_DIR, run_id)
+        os.makedirs(run_dir, exist_ok=True)
+        manifest = {
+            "run_id": run_id,
+            "created_at": datetime.now().isoformat(),
+            "options": options,
+            "stages": {},
+        }
+        run = cls(run_dir, manifest)
+        run.save()
+        return run
+
+    @classmethod
+    def resume(cls, run_id=None):
+        """Load a run by id, or the most recent unfinished one"""
+        if run_id is None:
+            candidates = sorted(os.listdir(RUNS_DIR), reverse=True) if os.path.isdir(RUNS_DIR) else []
+            for candidate in candidates:
+                run = cls.resume(candidate)
+                if not run.finished:
+                    return run
             return None
-            
-    except Exception as e:
-        print(f"✗ Error running scraper: {e}")
-        return None
+        run_dir = os.path.join(RUNS_DIR, run_id)
+        with open(os.path.join(run_dir, "manifest.json"), "r", encoding="utf-8") as f:
+            return cls(run_dir, json.load(f))
 
-def run_uploader(csv_file):
-    """Run the Snowflake uploader"""
-    print("\n" + "="*70)
-    print("STEP 2: Uploading to Snowflake")
-    print("="*70)
-    
-    # Check if uploader file exists
-    if not os.path.exists('snowflake_uploader.py'):
-        print("✗ Error: snowflake_uploader.py not found!")
-        print("  Please save the upload script artifact as 'snowflake_uploader.py'")
-        return False
-    
-    try:
-        # Run as subprocess
-        result = subprocess.run(
-            [sys.executable, 'snowflake_uploader.py', csv_file],
-            capture_output=True,
-            text=True
+    @property
+    def run_id(self):
+        return self.manifest["run_id"]
+
+    @property
+    def options(self):
+        return self.manifest["options"]
+
+    @property
+    def finished(self):
+        stages = self.manifest["stages"]
+        return all(stages.get(name, {}).get("status") in ("done", "skipped") for name in STAGES)
+
+    def path(self, *parts):
+        return os.path.join(self.run_dir, *parts)
+
+    def save(self):
+        _write_json(self.path("manifest.json"), self.manifest)
+
+    def run_stage(self, name, fn):
+        """Run a stage unless its checkpoint says it already finished"""
+        entry = self.manifest["stages"].setdefault(name, {"status": "pending"})
+        if entry["status"] in ("done", "skipped"):
+            print(f"\n⏭  {name}: already {entry['status']} (checkpoint)")
+            return entry.get("result")
+
+        print("\n" + "=" * 70)
+        print(f"STAGE: {name.upper()}")
+        print("=" * 70)
+        entry.update(status="running", started_at=datetime.now().isoformat(), error=None)
+        entry["attempts"] = entry.get("attempts", 0) + 1
+        self.save()
+
+        start = time.perf_counter()
+        try:
+            result = fn(self, entry)
+        except Exception as e:
+            entry.update(status="failed", error=str(e), seconds=round(time.perf_counter() - start, 3))
+            self.save()
+            raise
+
+        entry.update(
+            status="skipped" if result == "skipped" else "done",
+            finished_at=datetime.now().isoformat(),
+            seconds=round(time.perf_counter() - start, 3),
+            result=None if result == "skipped" else result,
+        )
+        self.save()
+        print(f"✓ {name} finished in {entry['seconds']:.2f}s")
+        return result
+
+
+# ============================================================================
+# STAGES
+# ============================================================================
+
+def _run_state_path(run):
+    """Scrape state updated by this run, committed by the upload stage"""
+    return run.path("scrape_state.json")
+
+
+def scrape_stage(run, entry):
+    """Crawl all sources, logging each finished page so resumes skip it"""
+    os.makedirs(run.path("scrape"), exist_ok=True)
+    jobs_log = run.path("scrape", "jobs.jsonl")
+
+    # Leaf pages (no follow-up jobs) finished in an earlier attempt are skipped;
+    # listing pages are cheap and re-fetched to rediscover unfinished details
+    done_keys = {rec["key"] for rec in _read_jsonl(jobs_log) if rec["follow_ups"] == 0}
+    if done_keys:
+        print(f"Resuming: {len(done_keys)} pages already scraped")
+
+    options = run.options
+    state = scrape_state.load_state() if options["incremental"] else scrape_state.empty_state()
+    sources = get_sources(options.get("sources"), options={
+        "The Grant Portal": {"pages": options["grant_portal_pages"], "headless": options["headless"]},
+    })
+
+    lock = threading.Lock()
+    with open(jobs_log, "a", encoding="utf-8") as log:
+        def on_job_done(job, grants, follow_ups):
+            line = json.dumps({
+                "key": job.key,
+                "source": job.source.name,
+                "url": job.url,
+                "follow_ups": follow_ups,
+                "grants": grants,
+            }, default=str)
+            with lock:
+                log.write(line + "\n")
+                log.flush()
+
+        scheduler = CrawlScheduler(
+            state=state,
+            on_grant=lambda grant: None,  # grants are checkpointed via on_job_done
+            skip_job=lambda job: job.key in done_keys,
+            on_job_done=on_job_done,
         )
-        
-        print(result.stdout)
-        if result.stderr:
-            print(result.stderr)
-        
-        if result.returncode != 0:
-            print("✗ Upload failed")
-            return False
-        
-        print("\n✓ Upload complete")
-        return True
-        
-    except Exception as e:
-        print(f"✗ Error running uploader: {e}")
-        return False
+        scheduler.run(sources)
+
+    scrape_state.save_state(state, _run_state_path(run))
+    pages = grants = 0
+    for rec in _read_jsonl(jobs_log):
+        pages += 1
+        grants += len(rec["grants"])
+    print(f"Scraped {grants} grants from {pages} pages")
+    return {"pages": pages, "grants": grants, "resumed_pages": len(done_keys)}
+
+
+def normalize_stage(run, entry):
+    """Merge near-duplicates, change-filter and write cleaned, typed Parquet parts"""
+    out_dir = run.path("normalized")
+    shutil.rmtree(out_dir, ignore_errors=True)
+    os.makedirs(out_dir)
+
+    state = scrape_state.load_state(_run_state_path(run))
+    if not run.options["incremental"]:
+        state["grants"] = {}
+
+    grants = [g for rec in _read_jsonl(run.path("scrape", "jobs.jsonl")) for g in rec["grants"]]
+    grants, duplicates = grant_dedupe.consolidate_grants(grants)
+    changed = (g for g in grants if scrape_state.filter_changed_grants(state, [g]))
+
+    count = parts = 0
+    timings = {}
+    for batch_num, batch in enumerate(grant_stream.micro_batches(changed)):
+        df = grant_stream.normalize_batch(batch, timings=timings)
+        grant_stream.write_parquet_batch(df, out_dir, batch_num)
+        count += len(df)
+        parts += 1
+
+    scrape_state.save_state(state, _run_state_path(run))
+    timings = {stage: round(ms, 2) for stage, ms in timings.items()}
+    print(f"Normalized {count} new or changed grants into {parts} parts ({timings.get('total', 0.0):.1f} ms cleaning)")
+    return {"grants": count, "parts": parts, "duplicates": duplicates, "timings_ms": timings}
+
+
+def upload_stage(run, entry):
+    """Insert each Parquet part into Snowflake, checkpointing per part"""
+    if not run.options["upload"]:
+        # Scrape state stays uncommitted, so these grants are offered again
+        print("Upload disabled for this run (scrape state not saved)")
+        return "skipped"
+
+    out_dir = run.path("normalized")
+    parts = sorted(name for name in os.listdir(out_dir) if name.endswith(".parquet"))
+    done = entry.setdefault("parts_done", [])
+    todo = [name for name in parts if name not in done]
+    if not todo:
+        print("No new parts to upload")
+        _commit_scrape_state(run)
+        return {"uploaded": 0, "parts": len(parts)}
+
+    conn = snowflake_uploader.get_connection()
+    cur = conn.cursor()
+    uploaded = 0
+    try:
+        snowflake_uploader.create_grants_table(cur)
+        for name in todo:
+            typed = pq.read_table(os.path.join(out_dir, name)).to_pandas()
+            uploaded += snowflake_uploader.insert_grants(cur, grant_stream.to_warehouse_frame(typed))
+            conn.commit()
+            done.append(name)
+            run.save()
+            print(f"  Uploaded {name}")
+    finally:
+        cur.close()
+        conn.close()
+
+    print(f"Uploaded {uploaded} grants")
+    _commit_scrape_state(run)
+    return {"uploaded": uploaded, "parts": len(parts)}
+
+
+def _commit_scrape_state(run):
+    """Make this run's scrape state the shared one - its grants are all in Snowflake"""
+    if os.path.exists(_run_state_path(run)):
+        scrape_state.save_state(scrape_state.load_state(_run_state_path(run)))
+
+
+def _fetch_catalog():
+    """Grants in the same order the matching service reads them"""
+    conn = snowflake_service.get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        SELECT program_name, description, eligibility
+        FROM FUND_DB.PUBLIC.GRANTS
+        WHERE description IS NOT NULL
+        ORDER BY scraped_at DESC
+    """)
+    rows = cur.fetchall()
+    cur.close()
+    conn.close()
+    return [
+        {"program_name": name, "text": f"{desc or ''} {elig or ''}".strip()}
+        for name, desc, elig in rows
+    ]
+
+
+def _load_published_vectors(model_id):
+    """text_hash -> vector from the currently published index (same embedding model only)"""
+    from services import gemini_service
+
+    if not (os.path.exists(CACHE_FILE) and os.path.exists(META_FILE)):
+        return {}
+    # Reduced indexes keep the full vectors alongside; reuse needs those
+    vectors = np.load(FULL_CACHE_FILE if os.path.exists(PROJECTION_FILE) else CACHE_FILE)
+    with open(META_FILE, "r", encoding="utf-8") as f:
+        metadata = json.load(f)
+    if len(metadata) != len(vectors):
+        return {}
+    return {
+        m["text_hash"]: vectors[i] for i, m in enumerate(metadata)
+        if m.get("text_hash") and m.get("model", gemini_service.LEGACY_MODEL_ID) == model_id
+    }
+
+
+def embed_stage(run, entry):
+    """Embed the catalog in checkpointed chunks, reusing unchanged vectors"""
+    from services import embedders, gemini_service
+
+    embed_dir = run.path("embed")
+    os.makedirs(embed_dir, exist_ok=True)
+    model_id = gemini_service.model_id()
+
+    catalog = _fetch_catalog()
+    for grant in catalog:
+        grant["text_hash"] = scrape_state.content_hash(grant["text"])
+        grant["model"] = model_id
+
+    # Chunks from an earlier attempt only line up if the catalog and model are unchanged
+    catalog_path = os.path.join(embed_dir, "catalog.json")
+    if os.path.exists(catalog_path):
+        with open(catalog_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+        if [(g["text_hash"], g.get("model")) for g in previous] != [(g["text_hash"], model_id) for g in catalog]:
+            print("Catalog or embedding model changed since last attempt, discarding embedded chunks")
+            for name in os.listdir(embed_dir):
+                if name.startswith("chunk-"):
+                    os.remove(os.path.join(embed_dir, name))
+    _write_json(catalog_path, [
+        {"program_name": g["program_name"], "text_hash": g["text_hash"], "model": model_id} for g in catalog
+    ])
+
+    published = _load_published_vectors(model_id)
+    reused = embedded = 0
+    for start in range(0, len(catalog), EMBED_BATCH_SIZE):
+        chunk_path = os.path.join(embed_dir, f"chunk-{start:06d}.npy")
+        if os.path.exists(chunk_path):
+            continue
+        chunk = catalog[start:start + EMBED_BATCH_SIZE]
+        vectors = np.zeros((len(chunk), gemini_service.OUTPUT_DIM), dtype=np.float32)
+        missing = []
+        for i, grant in enumerate(chunk):
+            if grant["text_hash"] in published:
+                vectors[i] = published[grant["text_hash"]]
+                reused += 1
+            else:
+                missing.append(i)
+        if missing:
+            vectors[missing] = gemini_service.get_embeddings([chunk[i]["text"] for i in missing])
+            embedded += len(missing)
+            if embedders.get_embedder().remote:
+                time.sleep(EMBED_DELAY)
+        np.save(chunk_path, vectors)
+        print(f"  Embedded {min(start + EMBED_BATCH_SIZE, len(catalog))}/{len(catalog)}")
+
+    print(f"Catalog: {len(catalog)} grants ({reused} reused, {embedded} newly embedded with {model_id})")
+    return {"grants": len(catalog), "reused": reused, "embedded": embedded, "model": model_id}
+
+
+def index_stage(run, entry):
+    """Assemble embedding chunks into the serving matrix and metadata"""
+    embed_dir = run.path("embed")
+    with open(os.path.join(embed_dir, "catalog.json"), "r", encoding="utf-8") as f:
+        catalog = json.load(f)
+    chunks = sorted(name for name in os.listdir(embed_dir) if name.startswith("chunk-"))
+    matrix = np.concatenate([np.load(os.path.join(embed_dir, name)) for name in chunks]) if chunks else np.zeros((0, 0), dtype=np.float32)
+    if len(matrix) != len(catalog):
+        raise RuntimeError(f"Embedding chunks cover {len(matrix)} of {len(catalog)} grants")
+
+    index_dir = run.path("index")
+    os.makedirs(index_dir, exist_ok=True)
+    result = {"grants": len(catalog)}
+    reduce_dim = run.options.get("reduce_dim")
+    if reduce_dim:
+        # Serve SVD-reduced vectors; user vectors get the same projection
+        projection = embedding_reduction.fit_projection(matrix, reduce_dim)
+        projection.save(os.path.join(index_dir, PROJECTION_FILE))
+        np.save(os.path.join(index_dir, FULL_CACHE_FILE), matrix.astype(np.float32))
+        matrix = projection.apply(matrix)
+        result["projection"] = projection.id
+    np.save(os.path.join(index_dir, CACHE_FILE), matrix.astype(np.float32))
+    _write_json(os.path.join(index_dir, META_FILE), catalog)
+    print(f"Index: {matrix.shape[0]} grants x {matrix.shape[1] if matrix.ndim == 2 else 0} dims")
+
+    # Similar-grants graph over the served vectors
+    indices, scores = grant_neighbors.build_knn(matrix)
+    grant_neighbors.save_graph(os.path.join(index_dir, NEIGHBORS_FILE), indices, scores)
+    print(f"Neighbour graph: {indices.shape[1] if indices.ndim == 2 else 0} per grant")
+    return result
+
+
+def publish_stage(run, entry):
+    """Atomically swap the new index into place and bump the catalog version"""
+    # Projection and neighbour files first, so the new vectors never load without theirs
+    reduced = os.path.exists(run.path("index", PROJECTION_FILE))
+    names = ([PROJECTION_FILE, FULL_CACHE_FILE] if reduced else []) + [CACHE_FILE, META_FILE]
+    if os.path.exists(run.path("index", NEIGHBORS_FILE)):
+        names.insert(-2, NEIGHBORS_FILE)
+    for name in names:
+        tmp_path = f"{name}.tmp"
+        shutil.copyfile(run.path("index", name), tmp_path)
+        os.replace(tmp_path, name)
+    if not reduced:
+        for name in [PROJECTION_FILE, FULL_CACHE_FILE]:
+            if os.path.exists(name):
+                os.remove(name)
+
+    version = {
+        "version": run.run_id,
+        "published_at": datetime.now().isoformat(),
+        "grants": run.manifest["stages"]["index"]["result"]["grants"],
+        "embedding_model": run.manifest["stages"]["embed"]["result"].get("model"),
+        "projection": run.manifest["stages"]["index"]["result"].get("projection"),
+    }
+    _write_json(CATALOG_VERSION_FILE, version)
+    print(f"Published catalog version {run.run_id}")
+
+    # Cached match results were ranked against the previous catalog
+    backend = match_cache.open_backend()
+    if backend is not None:
+        print(f"Purged {backend.purge_versions(run.run_id)} cached match results")
+    return version
+
+
+def notify_stage(run, entry):
+    """Write new-match records for grants that were not in the previous catalog"""
+    from services import reverse_matching
+
+    if not run.options.get("notify", True):
+        print("Reverse matching disabled for this run")
+        return "skipped"
+    return reverse_matching.run()
+
+
+STAGE_FUNCTIONS = {
+    "scrape": scrape_stage,
+    "normalize": normalize_stage,
+    "upload": upload_stage,
+    "embed": embed_stage,
+    "index": index_stage,
+    "publish": publish_stage,
+    "notify": notify_stage,
+}
+
+
+# ============================================================================
+# ENTRY POINT
+# ============================================================================
+
+def print_timings(run):
+    print("\nStage timings:")
+    for name in STAGES:
+        entry = run.manifest["stages"].get(name, {})
+        seconds = entry.get("seconds")
+        timing = f"{seconds:8.2f}s" if seconds is not None else "       -"
+        print(f"  {name:<10} {entry.get('status', 'pending'):<8} {timing}")
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Scrape, upload, embed and publish Ontario grants")
+    parser.add_argument("--resume", nargs="?", const="latest", help="Resume a run (default: latest unfinished)")
+    parser.add_argument("--pages", type=int, default=5, help="Grant Portal pages to scrape")
+    parser.add_argument("--full", action="store_true", help="Ignore scrape state and re-scrape everything")
+    parser.add_argument("--no-upload", action="store_true", help="Skip the Snowflake upload stage")
+    parser.add_argument("--show-browser", action="store_true", help="Run the Grant Portal browser headful")
+    parser.add_argument("--reduce-dim", type=int, default=None,
+                        help="Serve SVD-reduced embeddings with this many dims (see scripts/benchmark_reduction.py)")
+    parser.add_argument("--no-notify", action="store_true", help="Skip reverse matching of new grants against users")
+    args = parser.parse_args()
+
+    # Artifacts (scrape state, runs, published index) live in the backend root
+    os.chdir(BACKEND_DIR)
+
+    if args.resume:
+        run = PipelineRun.resume(None if args.resume == "latest" else args.resume)
+        if run is None:
+            print("No unfinished pipeline run to resume")
+            return
+        print(f"Resuming run {run.run_id}")
+    else:
+        run = PipelineRun.create({
+            "grant_portal_pages": args.pages,
+            "headless": not args.show_browser,
+            "incremental": not args.full,
+            "upload": not args.no_upload,
+            "sources": None,
+            "reduce_dim": args.reduce_dim,
+            "notify": not args.no_notify,
+        })
+
     start_time = datetime.now()
-    
     print("\n" + "="*70)
     print("ONTARIO GRANTS - FULL PIPELINE")
     print("="*70)
-    print(f"Started: {start_time.strftime('%Y-%m-%d %H:%M:%S')}\n")
-    
-    # Step 1: Scrape
-    csv_file = run_scraper()
-    if not csv_file:
-        print("\n✗ Pipeline failed at scraping step")
-        sys.exit(1)
-    
-    # Step 2: Upload
-    upload_success = run_uploader(csv_file)
-    if not upload_success:
-        print(f"\n⚠ Upload failed, but CSV is saved: {csv_file}")
-        print("  You can upload manually using snowflake_uploader.py")
-        sys.exit(1)
-    
-    # Complete
-    end_time = datetime.now()
-    duration = end_time - start_time
-    
+    print(f"Run: {run.run_id}  ({run.run_dir})")
+    print(f"Started: {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
+
+    for name in STAGES:
+        try:
+            run.run_stage(name, STAGE_FUNCTIONS[name])
+        except Exception as e:
+            print(f"\n✗ Pipeline failed at {name} stage: {e}")
+            print(f"  Fix the problem and rerun with: python services/run_full_pipeline.py --resume {run.run_id}")
+            print_timings(run)
+            sys.exit(1)
+
+    duration = datetime.now() - start_time
     print("\n" + "="*70)
     print("PIPELINE COMPLETE ✓")
     print("="*70)
-    print(f"Started:  {start_time.strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Finished: {end_time.strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"Duration: {duration}")
-    print(f"Data file: {csv_file}")
+    print_timings(run)
     print("="*70)
 
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,145 @@
+"""
+Declarative Scoring Rules
+Match boosts live in scoring_rules.json instead of if-chains in the matcher:
+
+    features   named per-grant features, computed once per catalog:
+                 {"text_any": [...]}            description/eligibility mentions any word
+                 {"criteria": "newcomer"}       an extracted eligibility flag
+                 {"closing_within_days": 14}    deadline within N days (per request)
+    rules      {"name", "when": {"field", <op>: value}, "feature", "weight"}
+               ops: in, not_in (case-insensitive), lt, lte, gt, gte
+    tag_weight boost per user eligibility tag found in the grant text
+    min_score  matches scoring below this are dropped
+    max_score  scores are capped here
+
+Static features are compiled into a (grants x rules) matrix per catalog, so
+a request's boosts are one mat-vec product over every grant. The file is
+reloaded when it changes on disk; `version` is a hash of its contents.
+"""
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+RULES_FILE = os.getenv("SCORING_RULES_FILE", "scoring_rules.json")
+
+_OPS = {
+    "lt": lambda a, b: a < b,
+    "lte": lambda a, b: a <= b,
+    "gt": lambda a, b: a > b,
+    "gte": lambda a, b: a >= b,
+}
+
+
+def _normalize(value):
+    if isinstance(value, bool) or value is None:
+        return value if value is not None else ""
+    return str(value).strip().lower()
+
+
+def compile_condition(when):
+    """Turn a rule's `when` clause into a predicate over a profile dict"""
+    field = when["field"]
+    if "in" in when:
+        allowed = {_normalize(v) for v in when["in"]}
+        return lambda profile: _normalize(profile.get(field)) in allowed
+    if "not_in" in when:
+        blocked = {_normalize(v) for v in when["not_in"]}
+        return lambda profile: _normalize(profile.get(field)) not in blocked
+    for op, compare in _OPS.items():
+        if op in when:
+            bound = float(when[op])
+
+            def predicate(profile, compare=compare, bound=bound):
+                try:
+                    return compare(float(profile.get(field)), bound)
+                except (TypeError, ValueError):
+                    return False
+            return predicate
+    raise ValueError(f"Rule condition on '{field}' has no supported operator")
+
+
+class ScoringRules:
+    def __init__(self, spec, version):
+        self.version = version
+        self.min_score = float(spec.get("min_score", 0.3))
+        self.max_score = float(spec.get("max_score", 1.0))
+        self.tag_weight = float(spec.get("tag_weight", 0.05))
+        self.features = spec.get("features", {})
+
+        self.rules = spec.get("rules", [])
+        for rule in self.rules:
+            if rule["feature"] not in self.features:
+                raise ValueError(f"Rule '{rule.get('name')}' uses unknown feature '{rule['feature']}'")
+        self.predicates = [compile_condition(rule["when"]) for rule in self.rules]
+        self.weights = np.array([float(rule["weight"]) for rule in self.rules], dtype=np.float64)
+        self.dynamic = np.array(["closing_within_days" in self.features[r["feature"]] for r in self.rules], dtype=bool)
+
+        self._compiled = None
+        self._compiled_for = None
+        self._lock = threading.Lock()
+
+    def _feature_vector(self, catalog, spec):
+        if "text_any" in spec:
+            words = [w.lower() for w in spec["text_any"]]
+            return np.array([any(w in text for w in words) for text in catalog.texts], dtype=np.float64)
+        if "criteria" in spec:
+            return getattr(catalog, spec["criteria"]).astype(np.float64)
+        if "closing_within_days" in spec:
+            vec = np.zeros(len(catalog), dtype=np.float64)
+            vec[catalog.closing_soon(days=int(spec["closing_within_days"]))] = 1.0
+            return vec
+        raise ValueError(f"Unsupported feature spec: {spec}")
+
+    def feature_matrix(self, catalog):
+        """(grants x rules) matrix of static features, compiled once per catalog"""
+        with self._lock:
+            if self._compiled_for is not catalog:
+                matrix = np.zeros((len(catalog), len(self.rules)), dtype=np.float64)
+                for j, rule in enumerate(self.rules):
+                    if not self.dynamic[j]:
+                        matrix[:, j] = self._feature_vector(catalog, self.features[rule["feature"]])
+                self._compiled, self._compiled_for = matrix, catalog
+            return self._compiled
+
+    def boosts(self, catalog, profile):
+        """Total rule boost for every grant in the catalog for this profile"""
+        active = np.array([predicate(profile) for predicate in self.predicates], dtype=bool)
+        if not len(active):
+            return np.zeros(len(catalog), dtype=np.float64)
+        weights = np.where(active & ~self.dynamic, self.weights, 0).astype(np.float64)
+        total = self.feature_matrix(catalog) @ weights
+        for j in np.flatnonzero(active & self.dynamic):
+            total += self.weights[j] * self._feature_vector(catalog, self.features[self.rules[j]["feature"]])
+        return total
+
+
+def load_rules(path=RULES_FILE):
+    with open(path, "rb") as f:
+        raw = f.read()
+    return ScoringRules(json.loads(raw), version=hashlib.sha1(raw).hexdigest()[:12])
+
+
+_rules = None
+_rules_mtime = None
+_rules_lock = threading.Lock()
+
+
+def get_rules():
+    """Current scoring rules, reloaded if the file changed (bad edits keep the old rules)"""
+    global _rules, _rules_mtime
+    mtime = os.path.getmtime(RULES_FILE)
+    with _rules_lock:
+        if _rules is None or mtime != _rules_mtime:
+            try:
+                _rules = load_rules()
+                print(f"📐 Loaded scoring rules {_rules.version} ({len(_rules.rules)} rules)")
+            except (ValueError, KeyError) as e:
+                if _rules is None:
+                    raise
+                print(f"⚠️ Invalid scoring rules, keeping {_rules.version}: {e}")
+            _rules_mtime = mtime
+        return _rules
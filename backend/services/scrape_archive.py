@@ -0,0 +1,183 @@
+"""
+Scrape Archive (record / replay)
+Record mode saves every page the scrapers fetch - raw HTTP responses and the
+rendered content of Playwright pages - into a local archive directory.
+Replay mode serves that archive from a local stand-in HTTP server and
+routes scraper traffic to it, so the scrapers can be benchmarked and
+regression-tested offline against a fixed snapshot of each site.
+
+Archive layout:
+    index.json       url -> {file, kind, status, headers, recorded_at}
+    pages/<sha>.html page bodies
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+INDEX_FILE = "index.json"
+PAGES_DIR = "pages"
+
+# Headers worth keeping so replayed responses behave like the originals
+KEPT_HEADERS = ["Content-Type", "ETag", "Last-Modified"]
+
+_SCRIPT_RE = re.compile(r"<script\b[^>]*>.*?</script\s*>", re.IGNORECASE | re.DOTALL)
+
+_recorder = None
+_replay = None
+
+
+# ----------------------------------------------------------------------
+#  RECORDING
+# ----------------------------------------------------------------------
+class ArchiveRecorder:
+    def __init__(self, archive_dir):
+        self.archive_dir = archive_dir
+        os.makedirs(os.path.join(archive_dir, PAGES_DIR), exist_ok=True)
+        self.index = load_index(archive_dir)
+        self._lock = threading.Lock()
+
+    def record(self, url, body, kind="http", status=200, headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        name = f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html"
+        with open(os.path.join(self.archive_dir, PAGES_DIR, name), "wb") as f:
+            f.write(body)
+        entry = {
+            "file": name,
+            "kind": kind,
+            "status": status,
+            "headers": {k: headers[k] for k in KEPT_HEADERS if headers and headers.get(k)},
+            "recorded_at": datetime.utcnow().isoformat(),
+        }
+        with self._lock:
+            self.index[url] = entry
+            tmp_path = os.path.join(self.archive_dir, f"{INDEX_FILE}.tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self.index, f, indent=2, sort_keys=True)
+            os.replace(tmp_path, os.path.join(self.archive_dir, INDEX_FILE))
+
+
+def load_index(archive_dir):
+    path = os.path.join(archive_dir, INDEX_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def start_recording(archive_dir):
+    """Save every page fetched from now on into `archive_dir`"""
+    global _recorder
+    _recorder = ArchiveRecorder(archive_dir)
+    return _recorder
+
+
+def stop_recording():
+    global _recorder
+    _recorder = None
+
+
+def record_http(url, response):
+    """Archive a requests response (no-op unless recording)"""
+    if _recorder is not None and response.status_code == 200:
+        _recorder.record(url, response.content, kind="http", headers=response.headers)
+
+
+def record_browser(url, page):
+    """Archive a Playwright page's rendered HTML (no-op unless recording)"""
+    if _recorder is not None:
+        _recorder.record(url, page.content(), kind="browser", headers={"Content-Type": "text/html; charset=utf-8"})
+
+
+# ----------------------------------------------------------------------
+#  REPLAY
+# ----------------------------------------------------------------------
+def _archive_path(url):
+    """Path on the replay server for an original URL: /<host><path>?<query>"""
+    parts = urlsplit(url)
+    path = f"/{parts.netloc}{parts.path or '/'}"
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+class ReplayServer:
+    """Local stand-in server answering archived URLs from disk"""
+
+    def __init__(self, archive_dir, host="127.0.0.1", port=0):
+        self.archive_dir = archive_dir
+        self.routes = {_archive_path(url): entry for url, entry in load_index(archive_dir).items()}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self.base_url = f"http://{host}:{self.httpd.server_address[1]}"
+        self._thread = None
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                entry = server.routes.get(self.path)
+                if entry is None:
+                    self.send_error(404, "Not in archive")
+                    return
+                headers = entry.get("headers", {})
+                etag = headers.get("ETag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                with open(os.path.join(server.archive_dir, PAGES_DIR, entry["file"]), "rb") as f:
+                    body = f.read()
+                if entry.get("kind") == "browser":
+                    # Rendered DOM is already complete; don't let scripts re-run
+                    body = _SCRIPT_RE.sub("", body.decode("utf-8", errors="replace")).encode("utf-8")
+                self.send_response(entry.get("status", 200))
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def url_for(self, url):
+        return self.base_url + _archive_path(url)
+
+    def start(self):
+        global _replay
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        _replay = self
+        return self
+
+    def stop(self):
+        global _replay
+        _replay = None
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def resolve(url):
+    """URL to actually fetch: the replay server's copy while replaying"""
+    return _replay.url_for(url) if _replay is not None else url
+
+
+def replaying():
+    return _replay is not None
+
+
+def is_replay_url(url):
+    return _replay is not None and url.startswith(_replay.base_url)
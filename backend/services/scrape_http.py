@@ -0,0 +1,176 @@
+"""
+Shared HTTP Client for the Scrapers
+One keep-alive connection pool shared by every requests-based source, plus
+per-host rate budgets (token bucket + concurrency limit) used by the crawl
+scheduler to stay polite to each site. Each scheduler run keeps its own
+HostBudgets, so a budget configured in one run never leaks into the next.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from services import scrape_archive, scrape_state
+
+POOL_SIZE = 10             # keep-alive connections kept per host
+
+# Default budget for hosts no source has configured
+DEFAULT_RATE = 1.0         # requests per second
+DEFAULT_BURST = 1          # requests allowed back-to-back after idling
+DEFAULT_CONCURRENCY = 2    # requests in flight at once
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """Return the process-wide keep-alive session (created on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+
+# ----------------------------------------------------------------------
+#  PER-HOST RATE BUDGETS
+# ----------------------------------------------------------------------
+class TokenBucket:
+    """Classic token bucket: `rate` tokens/second, holding at most `burst`"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def configure(self, rate, burst=1):
+        """Change rate and burst in place; waiting callers pick it up on their next check"""
+        with self._lock:
+            self._refill()
+            self.rate = float(rate)
+            self.capacity = max(1.0, float(burst))
+            self._tokens = min(self._tokens, self.capacity)
+
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class HostBudget:
+    """Rate and concurrency budget for a single host"""
+
+    def __init__(self, host, rate=DEFAULT_RATE, burst=DEFAULT_BURST, concurrency=DEFAULT_CONCURRENCY):
+        self.host = host
+        self.bucket = TokenBucket(rate, burst)
+        self.concurrency = max(1, int(concurrency))
+        self._in_flight = 0
+        self._slots = threading.Condition()
+
+    def update(self, rate, burst, concurrency):
+        """Change the budget in place, so workers already holding it follow the new limits"""
+        self.bucket.configure(rate, burst)
+        with self._slots:
+            self.concurrency = max(1, int(concurrency))
+            self._slots.notify_all()
+
+    @contextmanager
+    def slot(self):
+        """Hold one of the host's `concurrency` request slots"""
+        with self._slots:
+            while self._in_flight >= self.concurrency:
+                self._slots.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._slots:
+                self._in_flight -= 1
+                self._slots.notify()
+
+
+class HostBudgets:
+    """
+    The host budgets of one crawl. If several sources share a host the
+    strictest budget wins, so the host never sees more than any one source
+    allows; a host no source configured gets the default budget.
+    """
+
+    def __init__(self):
+        self._budgets = {}
+        self._configured = set()
+        self._lock = threading.Lock()
+
+    def configure(self, host, rate=DEFAULT_RATE, burst=DEFAULT_BURST, concurrency=DEFAULT_CONCURRENCY):
+        """Register a source's budget for a host; returns the host's budget"""
+        with self._lock:
+            budget = self._budgets.get(host)
+            if budget is None:
+                budget = self._budgets[host] = HostBudget(host, rate, burst, concurrency)
+            elif host not in self._configured:
+                # Replaces the default a job picked up before any source configured the host
+                budget.update(rate, burst, concurrency)
+            else:
+                budget.update(min(rate, budget.bucket.rate), min(burst, budget.bucket.capacity),
+                              min(concurrency, budget.concurrency))
+            self._configured.add(host)
+            return budget
+
+    def budget_for(self, host):
+        """Budget for a host (default budget if none was configured)"""
+        with self._lock:
+            if host not in self._budgets:
+                self._budgets[host] = HostBudget(host)
+            return self._budgets[host]
+
+
+# ----------------------------------------------------------------------
+#  FETCHING
+# ----------------------------------------------------------------------
+def fetch_html(url, state=None, headers=None, timeout=30):
+    """
+    GET a page through the shared session, using the scrape state for
+    conditional requests. Rate budgets are enforced by the scheduler; the
+    scrape archive may record the page or serve it from a replay server.
+
+    Returns:
+        Page HTML, or None if the page is unchanged since the last run
+        (304 Not Modified or identical body).
+    """
+    request_headers = dict(headers or {})
+    if state is not None:
+        request_headers.update(scrape_state.conditional_headers(state, url))
+
+    r = get_session().get(scrape_archive.resolve(url), headers=request_headers, timeout=timeout)
+    if r.status_code == 304:
+        print(f"  Not modified: {url}")
+        return None
+    r.raise_for_status()
+    scrape_archive.record_http(url, r)
+
+    if state is not None:
+        changed = scrape_state.record_page(state, url, r, scrape_state.content_hash(r.content))
+        if not changed:
+            print(f"  Unchanged content: {url}")
+            return None
+    return r.text
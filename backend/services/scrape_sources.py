@@ -0,0 +1,315 @@
+"""
+Scraper Source Plugins
+Every grant source is a GrantSource plugin (fetch, parse, standardize)
+registered by name. The CrawlScheduler runs all registered sources at once,
+giving each host its own token-bucket rate budget and concurrency limit.
+
+Adding a new portal means dropping a module into services/sources/ that
+defines a GrantSource subclass decorated with @register_source; the
+orchestrator picks it up automatically.
+"""
+
+import importlib
+import pkgutil
+import queue
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+
+from services import scrape_http
+
+# ============================================================================
+# STANDARDIZED SCHEMA
+# ============================================================================
+STANDARD_COLUMNS = [
+    "program_name",
+    "description",
+    "deadline",
+    "funding_low",
+    "funding_high",
+    "eligibility",
+    "interests",
+    "application_link",
+    "url",
+    "source",
+    "scraped_at"
+]
+
+
+def clean_text(text):
+    """Remove extra whitespace and clean text"""
+    if not text:
+        return None
+    return re.sub(r'\s+', ' ', text).strip()
+
+
+def standardize_grant(grant_dict, source):
+    """Convert any grant dict to standard schema"""
+    standardized = {col: None for col in STANDARD_COLUMNS}
+
+    # Map common fields
+    if "program_name" in grant_dict:
+        standardized["program_name"] = grant_dict["program_name"]
+    elif "title" in grant_dict:
+        standardized["program_name"] = grant_dict["title"]
+
+    standardized["description"] = grant_dict.get("description") or grant_dict.get("summary")
+    standardized["deadline"] = grant_dict.get("deadline")
+    standardized["funding_low"] = grant_dict.get("funding_low")
+    standardized["funding_high"] = grant_dict.get("funding_high")
+    standardized["eligibility"] = grant_dict.get("eligibility")
+    standardized["interests"] = grant_dict.get("interests")
+    standardized["application_link"] = grant_dict.get("application_link")
+    standardized["url"] = grant_dict.get("url")
+    standardized["source"] = source
+    standardized["scraped_at"] = grant_dict.get("scraped_at", datetime.utcnow().isoformat())
+
+    return standardized
+
+
+# ============================================================================
+# PLUGIN INTERFACE
+# ============================================================================
+class FetchJob:
+    """A single page to fetch for a source; `context` carries parse hints"""
+
+    def __init__(self, source, url, kind="page", context=None):
+        self.source = source
+        self.url = url
+        self.kind = kind
+        self.context = context or {}
+
+    @property
+    def host(self):
+        return urlparse(self.url).netloc
+
+    @property
+    def key(self):
+        """Stable identity used by checkpoints"""
+        return f"{self.source.name}|{self.kind}|{self.url}"
+
+
+class GrantSource:
+    """
+    Base class for grant sources.
+
+    Subclasses set `name` (written to the `source` column) and the host
+    budget, then implement start_jobs() and parse(). The default fetch() is
+    a conditional GET over the shared session; browser-based sources
+    override it and can use start_worker()/stop_worker() to manage
+    per-thread resources.
+    """
+
+    name = None
+    rate = scrape_http.DEFAULT_RATE                # requests per second per host
+    burst = scrape_http.DEFAULT_BURST
+    concurrency = scrape_http.DEFAULT_CONCURRENCY  # requests in flight per host
+    headers = None
+
+    def start_jobs(self, state=None):
+        """Seed jobs (listing pages) for this run"""
+        raise NotImplementedError
+
+    def fetch(self, job, state=None):
+        """Fetch a job; return raw content, or None if unchanged"""
+        return scrape_http.fetch_html(job.url, state=state, headers=self.headers)
+
+    def parse(self, job, raw, state=None):
+        """Yield raw grant dicts and/or follow-up FetchJobs"""
+        raise NotImplementedError
+
+    def standardize(self, grant):
+        return standardize_grant(grant, self.name)
+
+    def start_worker(self):
+        """Called once in each worker thread before its first job"""
+
+    def stop_worker(self):
+        """Called once in each worker thread after its last job"""
+
+
+# ============================================================================
+# REGISTRY
+# ============================================================================
+_registry = {}
+
+
+def register_source(cls):
+    """Class decorator registering a GrantSource under its name"""
+    if not cls.name:
+        raise ValueError(f"{cls.__name__} must define a source name")
+    _registry[cls.name] = cls
+    return cls
+
+
+def load_plugins():
+    """Import every module in services/sources so its sources register"""
+    from services import sources
+    for module in pkgutil.iter_modules(sources.__path__):
+        importlib.import_module(f"{sources.__name__}.{module.name}")
+
+
+def get_sources(names=None, options=None):
+    """
+    Instantiate registered sources.
+
+    Args:
+        names: Source names to include (default: every registered source)
+        options: Dict of source name -> constructor kwargs
+    """
+    load_plugins()
+    if names is None:
+        names = list(_registry)
+    missing = [n for n in names if n not in _registry]
+    if missing:
+        raise KeyError(f"Unknown grant source(s): {', '.join(missing)}")
+    options = options or {}
+    return [_registry[n](**options.get(n, {})) for n in names]
+
+
+# ============================================================================
+# SCHEDULER
+# ============================================================================
+class CrawlScheduler:
+    """
+    Runs fetch jobs from many sources concurrently.
+
+    Each host gets its own job queue worked by `concurrency` threads, and
+    every fetch takes a concurrency slot and a token from the host's bucket
+    first. Hosts never wait on each other, so total throughput is the sum of
+    every host's budget while no single host sees more than it allows.
+
+    Budgets belong to the scheduler (scrape_http.HostBudgets). A host is
+    configured from the budget of each source that submits a job for it,
+    follow-up jobs included.
+    """
+
+    def __init__(self, state=None, on_grant=None, skip_job=None, on_job_done=None):
+        self.state = state
+        self.on_grant = on_grant        # called with each standardized grant instead of collecting
+        self.skip_job = skip_job        # predicate: job already done in a checkpointed run
+        self.on_job_done = on_job_done  # called with (job, grants, follow_up_count) per finished job
+        self.budgets = scrape_http.HostBudgets()
+        self._configured = set()        # (host, source name) pairs whose budget is registered
+        self._lanes = {}
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0
+        self._results = {}
+
+    def run(self, sources):
+        """
+        Crawl every source to completion.
+
+        Returns:
+            Dict of source name -> list of standardized grants (empty lists
+            when an on_grant callback consumes them instead)
+        """
+        for source in sources:
+            self._results.setdefault(source.name, [])
+            for job in source.start_jobs(self.state):
+                self.submit(job)
+
+        with self._idle:
+            while self._outstanding:
+                self._idle.wait()
+            lanes = list(self._lanes.values())
+
+        for jobs, threads in lanes:
+            for _ in threads:
+                jobs.put(None)
+        for _, threads in lanes:
+            for t in threads:
+                t.join()
+        return self._results
+
+    def stream(self, sources, max_pending=100):
+        """
+        Crawl in the background, yielding standardized grants as soon as
+        they are parsed. At most `max_pending` grants are buffered; workers
+        block when the consumer falls behind, keeping memory flat.
+        """
+        buffer = queue.Queue(maxsize=max_pending)
+        done = object()
+        self.on_grant = buffer.put
+
+        def crawl():
+            try:
+                self.run(sources)
+            finally:
+                buffer.put(done)
+
+        thread = threading.Thread(target=crawl, daemon=True)
+        thread.start()
+        while True:
+            grant = buffer.get()
+            if grant is done:
+                break
+            yield grant
+        thread.join()
+
+    def submit(self, job):
+        source = job.source
+        with self._lock:
+            self._outstanding += 1
+            if (job.host, source.name) not in self._configured:
+                self._configured.add((job.host, source.name))
+                budget = self.budgets.configure(job.host, source.rate, source.burst, source.concurrency)
+            else:
+                budget = self.budgets.budget_for(job.host)
+            jobs, threads = self._lanes.setdefault(job.host, (queue.Queue(), []))
+            # Enough workers for the current limit; budget.slot() enforces a lower one
+            while len(threads) < budget.concurrency:
+                t = threading.Thread(target=self._work, args=(jobs, budget), daemon=True)
+                threads.append(t)
+                t.start()
+        jobs.put(job)
+
+    def _work(self, jobs, budget):
+        started = []
+        try:
+            while True:
+                job = jobs.get()
+                if job is None:
+                    return
+                source = job.source
+                try:
+                    if self.skip_job is not None and self.skip_job(job):
+                        continue
+                    if source not in started:
+                        source.start_worker()
+                        started.append(source)
+                    with budget.slot():
+                        budget.bucket.acquire()
+                        raw = source.fetch(job, self.state)
+                    items = source.parse(job, raw, self.state) if raw is not None else []
+                    grants = []
+                    follow_ups = 0
+                    for item in items:
+                        if isinstance(item, FetchJob):
+                            self.submit(item)
+                            follow_ups += 1
+                        else:
+                            grant = source.standardize(item)
+                            grants.append(grant)
+                            if self.on_grant is not None:
+                                self.on_grant(grant)
+                            else:
+                                with self._lock:
+                                    self._results[source.name].append(grant)
+                    if self.on_job_done is not None:
+                        self.on_job_done(job, grants, follow_ups)
+                except Exception as e:
+                    print(f"    [{source.name}] Failed {job.url}: {e}")
+                finally:
+                    with self._idle:
+                        self._outstanding -= 1
+                        if not self._outstanding:
+                            self._idle.notify_all()
+        finally:
+            for source in started:
+                try:
+                    source.stop_worker()
+                except Exception as e:
+                    print(f"    [{source.name}] Worker shutdown failed: {e}")
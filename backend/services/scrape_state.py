@@ -0,0 +1,146 @@
+"""
+Scrape State Store
+Remembers what every source looked like on the previous run so the scraper
+can send conditional GETs, skip unchanged Grant Portal detail pages and only
+pass new or edited grants downstream to the uploader and embedder.
+
+State is a single JSON file:
+    pages   - url -> {etag, last_modified, content_hash, fetched_at}
+    details - Grant Portal detail url -> {grant_id, snippet_hash, seen_at}
+    grants  - grant key -> {content_hash, seen_at}
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+STATE_FILE = "scrape_state.json"
+
+# Columns that change on every run and must not count as a content change
+VOLATILE_FIELDS = {"scraped_at"}
+
+
+def empty_state():
+    return {"pages": {}, "details": {}, "grants": {}}
+
+
+def load_state(path=STATE_FILE):
+    """Load scrape state from disk (empty state if missing or unreadable)"""
+    if not os.path.exists(path):
+        return empty_state()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Could not read scrape state ({e}), starting fresh")
+        return empty_state()
+    for section in empty_state():
+        state.setdefault(section, {})
+    return state
+
+
+def save_state(state, path=STATE_FILE):
+    """Atomically write scrape state to disk"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+
+def pending_path(output_file):
+    """Where a run's not-yet-uploaded scrape state is kept, next to its output"""
+    return os.path.splitext(output_file)[0] + ".state.json"
+
+
+def commit_pending(pending, path=STATE_FILE):
+    """Make a pending state the saved one once its grants are uploaded; False if there is none"""
+    if not os.path.exists(pending):
+        return False
+    save_state(load_state(pending), path)
+    os.remove(pending)
+    return True
+
+
+def content_hash(value):
+    """Stable SHA-256 of a string or JSON-serializable value"""
+    if not isinstance(value, (str, bytes)):
+        value = json.dumps(value, sort_keys=True, default=str)
+    if isinstance(value, str):
+        value = value.encode("utf-8")
+    return hashlib.sha256(value).hexdigest()
+
+
+# ----------------------------------------------------------------------
+#  PAGES (conditional GET)
+# ----------------------------------------------------------------------
+def conditional_headers(state, url):
+    """Build If-None-Match / If-Modified-Since headers from the last fetch"""
+    entry = state["pages"].get(url)
+    if not entry:
+        return {}
+    headers = {}
+    if entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def record_page(state, url, response, body_hash):
+    """
+    Store validators and body hash for a fetched page.
+
+    Returns:
+        True if the page body changed since the previous run
+    """
+    previous = state["pages"].get(url, {})
+    state["pages"][url] = {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_hash": body_hash,
+        "fetched_at": datetime.utcnow().isoformat(),
+    }
+    return previous.get("content_hash") != body_hash
+
+
+# ----------------------------------------------------------------------
+#  GRANT PORTAL DETAIL PAGES
+# ----------------------------------------------------------------------
+def detail_unchanged(state, detail_url, snippet):
+    """True if a detail page was already scraped with the same listing snippet"""
+    entry = state["details"].get(detail_url)
+    return bool(entry and entry.get("grant_id") and entry.get("snippet_hash") == content_hash(snippet))
+
+
+def record_detail(state, detail_url, grant_id, snippet):
+    state["details"][detail_url] = {
+        "grant_id": grant_id,
+        "snippet_hash": content_hash(snippet),
+        "seen_at": datetime.utcnow().isoformat(),
+    }
+
+
+# ----------------------------------------------------------------------
+#  GRANT RECORDS
+# ----------------------------------------------------------------------
+def grant_key(grant):
+    """Identity of a standardized grant (one page can hold many grants)"""
+    return "|".join(str(grant.get(k) or "") for k in ("source", "url", "program_name"))
+
+
+def filter_changed_grants(state, grants):
+    """
+    Keep only standardized grants that are new or whose content changed,
+    updating the stored hashes as it goes.
+    """
+    changed = []
+    now = datetime.utcnow().isoformat()
+    for grant in grants:
+        key = grant_key(grant)
+        digest = content_hash({k: v for k, v in grant.items() if k not in VOLATILE_FIELDS})
+        entry = state["grants"].get(key)
+        if not entry or entry.get("content_hash") != digest:
+            changed.append(grant)
+        state["grants"][key] = {"content_hash": digest, "seen_at": now}
+    return changed
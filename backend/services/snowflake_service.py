@@ -1,9 +1,23 @@
 import snowflake.connector
+import asyncio
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Blocking warehouse calls from async routes run on this bounded pool, so
+# they never starve the event loop or FastAPI's default threadpool
+WAREHOUSE_WORKERS = int(os.getenv("SNOWFLAKE_WORKERS", "8"))
+_executor = ThreadPoolExecutor(max_workers=WAREHOUSE_WORKERS, thread_name_prefix="snowflake")
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Await a blocking (warehouse) call on the bounded warehouse pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+
 def get_connection():
     """Create and return a Snowflake connection"""
     return snowflake.connector.connect(
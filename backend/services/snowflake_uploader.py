@@ -1,12 +1,15 @@
 import snowflake.connector
 import pandas as pd
 import os
+import sys
 from dotenv import load_dotenv
-from datetime import datetime
-import numpy as np
-import re
 import glob
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import scrape_state
+from services.grant_normalize import SNOWFLAKE_COLUMNS, normalize_grants
+
 load_dotenv()
 
 
@@ -28,6 +31,26 @@ def get_connection():
 # ----------------------------------------------------------------------
 #  TABLE CREATION
 # ----------------------------------------------------------------------
+# Columns added after the original schema, as (name, type). Existing tables
+# get them through ALTER TABLE ... ADD COLUMN IF NOT EXISTS.
+DERIVED_COLUMNS = [
+    ("deadline_date", "DATE"),
+    ("deadline_kind", "STRING"),
+    ("age_min", "NUMBER"),
+    ("age_max", "NUMBER"),
+    ("student_only", "BOOLEAN"),
+    ("newcomer", "BOOLEAN"),
+    ("indigenous", "BOOLEAN"),
+    ("veteran", "BOOLEAN"),
+    ("income_max", "NUMBER"),
+    ("org_types", "STRING"),
+    ("region", "STRING"),
+]
+
+
+STAGE_TABLE = "FUND_DB.PUBLIC.GRANTS_STAGE"
+
+
 def create_grants_table(cur):
     """Create grants table if it doesn't exist - matches your existing schema"""
     create_table_sql = """
@@ -49,9 +72,70 @@ def create_grants_table(cur):
     )
     """
     cur.execute(create_table_sql)
+
+    # Deadline and eligibility columns derived at ingest
+    for name, col_type in DERIVED_COLUMNS:
+        cur.execute(f"ALTER TABLE FUND_DB.PUBLIC.GRANTS ADD COLUMN IF NOT EXISTS {name} {col_type}")
+    # Session-scoped staging table for upserts (DDL, so created before any insert transaction)
+    cur.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {STAGE_TABLE} LIKE FUND_DB.PUBLIC.GRANTS")
     print("✓ Grants table ready")
 
 
+# ----------------------------------------------------------------------
+#  INSERT
+# ----------------------------------------------------------------------
+# A grant's identity: the fields of scrape_state.grant_key, compared the way
+# grant_catalog.grant_id does (trimmed, case-insensitive, NULL as empty)
+GRANT_KEY = ["source", "url", "program_name"]
+
+
+def _key_sql(alias, col):
+    return f"LOWER(TRIM(COALESCE({alias}.{col}, '')))"
+
+
+STAGE_SQL = f"""
+INSERT INTO {STAGE_TABLE} (
+    {", ".join(SNOWFLAKE_COLUMNS)}
+) VALUES ({", ".join(["%s"] * len(SNOWFLAKE_COLUMNS))})
+"""
+
+# Rows a re-scraped grant supersedes, including duplicates from older appends
+DELETE_SUPERSEDED_SQL = f"""
+DELETE FROM FUND_DB.PUBLIC.GRANTS t USING {STAGE_TABLE} s
+WHERE {" AND ".join(f"{_key_sql('t', c)} = {_key_sql('s', c)}" for c in GRANT_KEY)}
+"""
+
+INSERT_SQL = f"""
+INSERT INTO FUND_DB.PUBLIC.GRANTS ({", ".join(SNOWFLAKE_COLUMNS)})
+SELECT {", ".join(SNOWFLAKE_COLUMNS)} FROM {STAGE_TABLE}
+"""
+
+
+def _key(record):
+    return tuple(str(record[c] or "").strip().lower() for c in GRANT_KEY)
+
+
+def insert_grants(cur, df):
+    """
+    Upsert cleaned grants (SNOWFLAKE_COLUMNS order); returns row count.
+    Each grant replaces any GRANTS rows with the same identity, so a changed
+    grant doesn't leave its old version behind. Runs in one transaction the
+    caller commits (needs create_grants_table on this connection first).
+    """
+    rows = df[SNOWFLAKE_COLUMNS].astype(object).where(df[SNOWFLAKE_COLUMNS].notna(), None)
+    # Last version of each grant in the batch wins
+    latest = {_key(record): record for record in rows.to_dict("records")}
+    records = [tuple(record[c] for c in SNOWFLAKE_COLUMNS) for record in latest.values()]
+    if not records:
+        return 0
+    cur.execute("BEGIN")
+    cur.execute(f"DELETE FROM {STAGE_TABLE}")
+    cur.executemany(STAGE_SQL, records)
+    cur.execute(DELETE_SUPERSEDED_SQL)
+    cur.execute(INSERT_SQL)
+    return len(records)
+
+
 # ----------------------------------------------------------------------
 #  UPLOAD CSV
 # ----------------------------------------------------------------------
@@ -71,82 +155,12 @@ def upload_csv_to_snowflake(csv_file):
         print(f"✗ Failed to read CSV: {e}")
         return
 
-    # -----------------------------------------------------------
-    # CLEANING PHASE
-    # -----------------------------------------------------------
-    # 1️⃣ Replace NaNs / None
-    df = df.replace({np.nan: "", pd.NA: "", None: "", "nan": "", "NaN": ""})
-
-    # 2️⃣ Clean funding columns (remove symbols, normalize)
-    for col in ["funding_low", "funding_high"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).apply(lambda x: re.sub(r"[^\d.]", "", x.strip()))
-            df[col] = df[col].replace("", None)
-
-    # 3️⃣ Ensure deadlines and scraped_at are strings
-    for col in ["deadline", "scraped_at"]:
-        if col in df.columns:
-            df[col] = df[col].astype(str).replace({"NaT": "", "nat": "", "NaN": ""})
-
-    # 4️⃣ Trim long whitespace in text fields
-    text_cols = [
-        "program_name",
-        "description",
-        "summary",
-        "eligibility",
-        "interests",
-        "application_process",
-        "contact",
-        "url",
-    ]
-    for col in text_cols:
-        if col in df.columns:
-            df[col] = df[col].astype(str).str.strip()
-
-    # 5️⃣ Fill missing cells final sweep
-    df = df.fillna("").astype(str)
-
-    # 6️⃣ Map application_link if present
-    if "application_link" in df.columns:
-        df["application_process"] = df["application_link"]
-        df = df.drop("application_link", axis=1)
-        print("✓ Mapped application_link -> application_process")
-
-    # 7️⃣ Add missing columns
-    for c in ["summary", "contact", "grant_id"]:
-        if c not in df.columns:
-            df[c] = None
-
-    # 8️⃣ Clean & normalize funding values and create display string
-    for col in ["funding_low", "funding_high"]:
-        if col in df.columns:
-            df[col] = df[col].replace({"": None, np.nan: None}).astype(str)
-
-    df["funding_display"] = df.apply(
-        lambda r: f"${r['funding_low']}–${r['funding_high']}"
-        if r["funding_low"] and r["funding_high"]
-        else (f"${r['funding_low']}" if r["funding_low"] else "-"),
-        axis=1,
-    )
+    if df.empty:
+        print("✓ No new or changed grants to upload")
+        _commit_scrape_state(csv_file)
+        return
 
-    # 9️⃣ Reorder columns for Snowflake
-    snowflake_columns = [
-        "source",
-        "grant_id",
-        "program_name",
-        "description",
-        "summary",
-        "deadline",
-        "funding_low",
-        "funding_high",
-        "eligibility",
-        "interests",
-        "application_process",
-        "contact",
-        "url",
-        "scraped_at",
-    ]
-    df = df[snowflake_columns]
+    df = normalize_grants(df)
     print("✓ Column mapping complete")
     print(f"  Columns: {list(df.columns)}")
 
@@ -164,20 +178,11 @@ def upload_csv_to_snowflake(csv_file):
     try:
         create_grants_table(cur)
 
-        insert_sql = """
-        INSERT INTO FUND_DB.PUBLIC.GRANTS (
-            source, grant_id, program_name, description, summary,
-            deadline, funding_low, funding_high, eligibility, interests,
-            application_process, contact, url, scraped_at
-        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        """
-
-        records = [tuple(row) for _, row in df.iterrows()]
-
-        print(f"Uploading {len(records)} records...")
-        cur.executemany(insert_sql, records)
+        print(f"Uploading {len(df)} records...")
+        uploaded = insert_grants(cur, df)
         conn.commit()
-        print(f"✓ Successfully uploaded {len(records)} grants to Snowflake")
+        print(f"✓ Successfully uploaded {uploaded} grants to Snowflake")
+        _commit_scrape_state(csv_file)
 
         # Verify upload
         cur.execute("SELECT COUNT(*) FROM FUND_DB.PUBLIC.GRANTS;")
@@ -206,6 +211,12 @@ def upload_csv_to_snowflake(csv_file):
         print("\n✓ Connection closed")
 
 
+def _commit_scrape_state(csv_file):
+    """The CSV's grants are in Snowflake: its scrape state becomes the shared one"""
+    if scrape_state.commit_pending(scrape_state.pending_path(csv_file)):
+        print("✓ Scrape state saved")
+
+
 # ----------------------------------------------------------------------
 #  RETRIEVAL
 # ----------------------------------------------------------------------
@@ -0,0 +1,5 @@
+"""
+Grant source plugins.
+Every module in this package is imported by scrape_sources.load_plugins();
+sources register themselves with @register_source.
+"""
@@ -0,0 +1,278 @@
+"""
+The Grant Portal (ontario-canada.thegrantportal.com)
+JavaScript-rendered, so pages are loaded with Playwright. Each worker thread
+gets its own browser; listing pages yield detail-page jobs, and detail pages
+whose GrantID and listing snippet are unchanged since the last run are
+skipped.
+"""
+
+import re
+import threading
+from datetime import datetime
+
+from playwright.sync_api import sync_playwright
+
+from services import scrape_archive, scrape_state
+from services.scrape_sources import FetchJob, GrantSource, clean_text, register_source
+
+BASE_URL = "https://ontario-canada.thegrantportal.com"
+
+
+def extract_grant_details(detail_page):
+    """Extract grant details from The Grant Portal detail page"""
+    details = {
+        "title": None,
+        "grant_id": None,
+        "funding_low": None,
+        "funding_high": None,
+        "deadline": None,
+        "summary": None,
+        "interests": None,
+        "eligibility": None,
+        "application_link": None
+    }
+    
+    try:
+        # Extract title
+        if detail_page.locator("h1").count() > 0:
+            details["title"] = clean_text(detail_page.locator("h1").first.inner_text())
+        
+        # Extract GrantID
+        grant_id_elem = detail_page.locator("text=/GrantID:/i")
+        if grant_id_elem.count() > 0:
+            grant_id_text = grant_id_elem.first.inner_text()
+            details["grant_id"] = clean_text(grant_id_text.replace("GrantID:", "").strip())
+        
+        # Extract Funding Amount Low
+        funding_low_elem = detail_page.locator("text=/Grant Funding Amount Low:/i")
+        if funding_low_elem.count() > 0:
+            funding_text = funding_low_elem.first.inner_text()
+            match = re.search(r'\$[\d,]+', funding_text)
+            if match:
+                details["funding_low"] = match.group()
+        
+        # Extract Funding Amount High
+        funding_high_elem = detail_page.locator("text=/Grant Amount High:|Funding Amount High:/i")
+        if funding_high_elem.count() > 0:
+            funding_text = funding_high_elem.first.inner_text()
+            if "Open" in funding_text:
+                details["funding_high"] = "Open"
+            else:
+                match = re.search(r'\$[\d,]+', funding_text)
+                if match:
+                    details["funding_high"] = match.group()
+        
+        # Extract Deadline
+        deadline_elem = detail_page.locator("text=/Deadline:/i")
+        if deadline_elem.count() > 0:
+            deadline_text = deadline_elem.first.inner_text()
+            details["deadline"] = clean_text(deadline_text.replace("Deadline:", "").strip())
+        
+        # Extract Summary
+        summary_heading = detail_page.locator("h4:has-text('Summary'), h3:has-text('Summary')")
+        if summary_heading.count() > 0:
+            parent = summary_heading.first.locator("xpath=ancestor::div[contains(@class, 'pt-')]")
+            if parent.count() > 0:
+                paragraphs = parent.locator("p, div.text-sm")
+                summary_parts = []
+                for i in range(paragraphs.count()):
+                    text = clean_text(paragraphs.nth(i).inner_text())
+                    if text and len(text) > 20:
+                        summary_parts.append(text)
+                if summary_parts:
+                    details["summary"] = " ".join(summary_parts)
+        
+        # Extract Interests
+        interests_heading = detail_page.locator("h4:has-text('Interests'), h3:has-text('Interests')")
+        if interests_heading.count() > 0:
+            parent = interests_heading.first.locator("xpath=ancestor::div[contains(@class, 'pt-')]")
+            if parent.count() > 0:
+                labels = parent.locator("label")
+                interests = []
+                for i in range(labels.count()):
+                    label = labels.nth(i)
+                    checkbox = label.locator("input[type='checkbox']")
+                    if checkbox.count() > 0:
+                        try:
+                            if checkbox.first.is_checked():
+                                text = clean_text(label.inner_text())
+                                if text:
+                                    interests.append(text)
+                        except:
+                            continue
+                if interests:
+                    details["interests"] = "; ".join(interests)
+        
+        # Extract Eligibility
+        eligible_heading = detail_page.locator("h4:has-text('Eligible Requirements'), h3:has-text('Eligible Requirements')")
+        if eligible_heading.count() > 0:
+            parent = eligible_heading.first.locator("xpath=ancestor::div[contains(@class, 'pt-')]")
+            if parent.count() > 0:
+                labels = parent.locator("label")
+                eligible_items = []
+                for i in range(labels.count()):
+                    label = labels.nth(i)
+                    checkbox = label.locator("input[type='checkbox']")
+                    if checkbox.count() > 0:
+                        try:
+                            if checkbox.first.is_checked():
+                                text = clean_text(label.inner_text())
+                                if text:
+                                    eligible_items.append(text)
+                        except:
+                            continue
+                if eligible_items:
+                    details["eligibility"] = "; ".join(eligible_items)
+        
+        # Extract Application Link
+        apply_button = detail_page.locator("a:has-text('Grant Application'), a:has-text('Apply Here')")
+        if apply_button.count() > 0:
+            href = apply_button.first.get_attribute("href")
+            if href:
+                details["application_link"] = href if href.startswith("http") else f"https://ontario-canada.thegrantportal.com{href}"
+        
+    except Exception as e:
+        print(f"    Error extracting details: {e}")
+    
+    return details
+
+
+@register_source
+class GrantPortalSource(GrantSource):
+    name = "The Grant Portal"
+    rate = 2.0          # page loads per second across both browsers
+    burst = 2
+    concurrency = 2     # one headless browser per worker
+
+    def __init__(self, pages=5, headless=True):
+        self.pages = pages
+        self.headless = headless
+        self._local = threading.local()
+
+    def start_jobs(self, state=None):
+        for page_num in range(1, self.pages + 1):
+            yield FetchJob(self, f"{BASE_URL}/?page={page_num}", kind="listing", context={"page_num": page_num})
+
+    def start_worker(self):
+        local = self._local
+        local.playwright = sync_playwright().start()
+        try:
+            local.browser = local.playwright.chromium.launch(headless=self.headless)
+        except Exception:
+            local.playwright.stop()
+            raise
+        local.context = local.browser.new_context(
+            viewport={'width': 1920, 'height': 1080},
+            user_agent='Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+        )
+        if scrape_archive.replaying():
+            # Offline replay: only the archive server may be contacted
+            local.context.route("**/*", lambda route: route.continue_()
+                                if scrape_archive.is_replay_url(route.request.url) else route.abort())
+        local.page = local.context.new_page()
+
+    def stop_worker(self):
+        local = self._local
+        local.browser.close()
+        local.playwright.stop()
+
+    def fetch(self, job, state=None):
+        page = self._local.page
+        if job.kind == "listing":
+            print(f"\nPage {job.context['page_num']}/{self.pages}: {job.url}")
+            page.goto(scrape_archive.resolve(job.url), timeout=60000, wait_until="domcontentloaded")
+            page.wait_for_selector("div.p-2", timeout=15000)
+            scrape_archive.record_browser(job.url, page)
+            return page
+        
+        # A broken detail page still leaves us the listing card
+        try:
+            page.goto(scrape_archive.resolve(job.url), timeout=60000, wait_until="domcontentloaded")
+            page.wait_for_selector("h1", timeout=10000)
+            scrape_archive.record_browser(job.url, page)
+            return page
+        except Exception as e:
+            print(f"    Failed detail page: {e}")
+            return False
+
+    def parse(self, job, page, state=None):
+        if job.kind == "listing":
+            return self._parse_listing(page, state)
+        if page is False:
+            return [job.context["card"]]
+        return [self._parse_detail(job, page, state)]
+
+    def _parse_listing(self, page, state):
+        cards = page.locator("div.p-2")
+        card_count = cards.count()
+        print(f"  Found {card_count} grants")
+
+        items = []
+        skipped = 0
+        for card_idx in range(card_count):
+            try:
+                card = cards.nth(card_idx)
+                
+                # Extract card info
+                card_title = None
+                title_elem = card.locator(".text-xs.lg\\:text-lg, h3, h2")
+                if title_elem.count() > 0:
+                    card_title = clean_text(title_elem.first.inner_text())
+                
+                card_desc = None
+                desc_elem = card.locator("p")
+                if desc_elem.count() > 0:
+                    card_desc = clean_text(desc_elem.first.inner_text())
+                
+                # Get detail page link
+                view_grant_link = None
+                view_btn = card.locator("a:has-text('View Grant')")
+                if view_btn.count() > 0:
+                    href = view_btn.first.get_attribute("href")
+                    if href:
+                        view_grant_link = href if href.startswith("http") else BASE_URL + href
+                
+                grant_data = {
+                    "program_name": card_title,
+                    "description": card_desc,
+                    "url": view_grant_link,
+                    "scraped_at": datetime.utcnow().isoformat()
+                }
+                if not view_grant_link:
+                    items.append(grant_data)
+                    continue
+                
+                # Skip detail pages we already have an up-to-date copy of
+                snippet = f"{card_title or ''}|{card_desc or ''}"
+                if state is not None and scrape_state.detail_unchanged(state, view_grant_link, snippet):
+                    skipped += 1
+                    continue
+                
+                items.append(FetchJob(self, view_grant_link, kind="detail", context={"card": grant_data, "snippet": snippet}))
+                
+            except Exception as e:
+                print(f"    Error on card {card_idx + 1}: {e}")
+                continue
+
+        if skipped:
+            print(f"  Skipped unchanged: {skipped} grants")
+        return items
+
+    def _parse_detail(self, job, detail_page, state):
+        grant_data = dict(job.context["card"])
+        details = extract_grant_details(detail_page)
+        if state is not None:
+            scrape_state.record_detail(state, job.url, details["grant_id"], job.context["snippet"])
+        
+        # Update with detail info
+        grant_data.update({
+            "program_name": details["title"] or grant_data["program_name"],
+            "description": details["summary"] or grant_data["description"],
+            "funding_low": details["funding_low"],
+            "funding_high": details["funding_high"],
+            "deadline": details["deadline"],
+            "interests": details["interests"],
+            "eligibility": details["eligibility"],
+            "application_link": details["application_link"]
+        })
+        return grant_data
@@ -0,0 +1,79 @@
+"""
+Ontario Government funding page
+A single static page listing every open program under its own <h2>.
+"""
+
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from services.scrape_sources import FetchJob, GrantSource, register_source
+
+URL = "https://www.ontario.ca/page/available-funding-opportunities-ontario-government"
+
+
+@register_source
+class OntarioGovernmentSource(GrantSource):
+    name = "Ontario Government"
+    rate = 1.0
+    concurrency = 1
+
+    def start_jobs(self, state=None):
+        yield FetchJob(self, URL)
+
+    def parse(self, job, html, state=None):
+        soup = BeautifulSoup(html, "lxml")
+        url = job.url
+
+        grants = []
+        for header in soup.find_all("h2"):
+            program_name = header.get_text(strip=True)
+            if not program_name or "Overview" in program_name or "Closed funding" in program_name:
+                continue
+
+            # Collect siblings until next h2
+            block = []
+            for sib in header.find_next_siblings():
+                if sib.name == "h2":
+                    break
+                block.append(sib)
+
+            # Parse each h3 subsection
+            details = {
+                "program_name": program_name,
+                "url": url,
+                "scraped_at": datetime.utcnow().isoformat()
+            }
+        
+            for h3 in [b for b in block if b.name == "h3"]:
+                key = h3.get_text(strip=True).lower()
+                texts = []
+                for sib in h3.find_next_siblings():
+                    if sib.name in ["h3", "h2"]:
+                        break
+                    texts.append(sib.get_text(" ", strip=True))
+                content = " ".join(texts).strip()
+            
+                # Map to standard fields
+                if "eligibility" in key or "who can apply" in key:
+                    details["eligibility"] = content
+                elif "description" in key or "overview" in key or "about" in key:
+                    details["description"] = content
+                elif "deadline" in key or "when to apply" in key:
+                    details["deadline"] = content
+                elif "amount" in key or "funding" in key:
+                    # Try to extract funding amounts
+                    amounts = re.findall(r'\$[\d,]+', content)
+                    if amounts:
+                        details["funding_low"] = amounts[0] if len(amounts) > 0 else None
+                        details["funding_high"] = amounts[-1] if len(amounts) > 1 else amounts[0]
+                elif "apply" in key or "application" in key:
+                    details["application_link"] = content
+                else:
+                    details[key] = content
+
+            grants.append(details)
+
+        print(f"  Ontario Government: {len(grants)} grants")
+        return grants
@@ -0,0 +1,80 @@
+"""
+Ontario Trillium Foundation (otf.ca)
+One static page per grant stream.
+"""
+
+import re
+from datetime import datetime
+
+from bs4 import BeautifulSoup
+
+from services.scrape_sources import FetchJob, GrantSource, register_source
+
+GRANT_URLS = [
+    "https://otf.ca/our-grants/community-investments-grants/seed-grant",
+    "https://otf.ca/our-grants/community-investments-grants/grow-grant",
+    "https://otf.ca/our-grants/community-investments-grants/capital-grant",
+    "https://otf.ca/our-grants/youth-opportunities-fund",
+]
+
+
+@register_source
+class OTFSource(GrantSource):
+    name = "Ontario Trillium Foundation"
+    rate = 1.0
+    burst = 2
+    concurrency = 2
+    headers = {"User-Agent": "Mozilla/5.0 (compatible; GrantBot/1.0)"}
+
+    def start_jobs(self, state=None):
+        for url in GRANT_URLS:
+            yield FetchJob(self, url)
+
+    def parse(self, job, html, state=None):
+        url = job.url
+        soup = BeautifulSoup(html, "lxml")
+
+        grant = {"url": url, "scraped_at": datetime.utcnow().isoformat()}
+
+        # Title
+        title = soup.find("h1")
+        grant["program_name"] = title.get_text(strip=True) if title else None
+
+        # Grant info table
+        for wrapper in soup.select("section.grant_info div.grant_info_wrapper"):
+            label = wrapper.select_one(".grant_info_label")
+            value = wrapper.select_one(".grant_info_content")
+            if label and value:
+                key = label.get_text(strip=True).lower()
+                val = value.get_text(" ", strip=True)
+                
+                if "deadline" in key:
+                    grant["deadline"] = val
+                elif "amount" in key or "funding" in key:
+                    # Extract amounts
+                    amounts = re.findall(r'\$[\d,]+', val)
+                    if amounts:
+                        grant["funding_low"] = amounts[0] if len(amounts) > 0 else None
+                        grant["funding_high"] = amounts[-1] if len(amounts) > 1 else amounts[0]
+                else:
+                    grant[key.replace(" ", "_")] = val
+
+        # Descriptive sections
+        for section in soup.select("section"):
+            h3 = section.find("h3")
+            if not h3:
+                continue
+            key = h3.get_text(strip=True).lower()
+            text = " ".join(p.get_text(" ", strip=True) for p in section.find_all(["p", "li"]))
+            
+            if text:
+                if "eligibility" in key or "who can apply" in key:
+                    grant["eligibility"] = text
+                elif "purpose" in key or "description" in key:
+                    grant["description"] = text
+                elif "apply" in key:
+                    grant["application_link"] = text
+                else:
+                    grant[key.replace(" ", "_")] = text
+
+        return [grant]
@@ -0,0 +1,30 @@
+"""
+Eligibility Tag Matching
+Counts how many of a user's eligibility tags each grant's text mentions.
+
+Each distinct tag becomes a boolean mask over the catalog the first time a
+request uses it (one substring test per grant, cached on the catalog, so it
+lives as long as that catalog version). A request's tag counts are then a
+weighted sum of cached masks over its candidate grants.
+"""
+
+import numpy as np
+
+
+def tag_weights(tags):
+    """{tag: occurrences} for the trimmed, lowercased, non-blank tags"""
+    weights = {}
+    for tag in tags:
+        tag = str(tag).strip().lower()
+        if tag:
+            # Repeated tags keep counting once each, like the original per-tag loop
+            weights[tag] = weights.get(tag, 0) + 1
+    return weights
+
+
+def tag_counts(catalog, tags, indices):
+    """Weighted number of `tags` mentioned by each grant at `indices`"""
+    counts = np.zeros(len(indices), dtype=np.float64)
+    for tag, weight in tag_weights(tags).items():
+        counts += weight * catalog.tag_mask(tag)[indices]
+    return counts
@@ -0,0 +1,106 @@
+"""
+User Vector Store
+Project-summary embeddings for users, kept in a local SQLite file. Profile
+saves fill it in the background, and /match and batch jobs (reverse
+matching) read from it instead of re-embedding users.
+
+Each vector is stored with the hash of the summary it was computed from and
+the embedder's model id; a vector is only used while both still match.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+USER_VECTORS_FILE = os.getenv("USER_VECTORS_FILE", "user_vectors.sqlite3")
+
+
+def summary_hash(summary):
+    return hashlib.sha256(str(summary or "").strip().encode("utf-8")).hexdigest()[:20]
+
+
+class UserVectorStore:
+    def __init__(self, path=USER_VECTORS_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_vectors (
+                    user_id TEXT PRIMARY KEY,
+                    summary_hash TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, user_id, summary, model):
+        """The user's stored vector if it is for this summary and model, else None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM user_vectors WHERE user_id = ? AND summary_hash = ? AND model = ?",
+                (user_id, summary_hash(summary), model),
+            ).fetchone()
+        return np.frombuffer(row[0], dtype=np.float32).copy() if row else None
+
+    def put(self, user_id, summary, model, vector):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO user_vectors (user_id, summary_hash, model, vector, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, summary_hash(summary), model, np.asarray(vector, dtype=np.float32).tobytes(), time.time()),
+            )
+
+    def put_many(self, rows, model):
+        """Store (user_id, summary, vector) rows in one transaction"""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO user_vectors (user_id, summary_hash, model, vector, updated_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(uid, summary_hash(s), model, np.asarray(v, dtype=np.float32).tobytes(), now) for uid, s, v in rows],
+            )
+
+    def matrix(self, users, model):
+        """
+        (vectors, missing) for a {user_id: summary} mapping: a (len(users), dim)
+        matrix in the mapping's order, and the user ids with no current vector
+        (their rows are zero).
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT user_id, summary_hash, vector FROM user_vectors WHERE model = ?", (model,)
+            ).fetchall()
+        stored = {uid: (h, blob) for uid, h, blob in rows}
+        vectors, missing = [], []
+        for uid, summary in users.items():
+            entry = stored.get(uid)
+            if entry and entry[0] == summary_hash(summary):
+                vectors.append(np.frombuffer(entry[1], dtype=np.float32))
+            else:
+                vectors.append(None)
+                missing.append(uid)
+        dim = next((len(v) for v in vectors if v is not None), 0)
+        matrix = np.zeros((len(vectors), dim), dtype=np.float32)
+        for i, v in enumerate(vectors):
+            if v is not None:
+                matrix[i] = v
+        return matrix, missing
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """The process-wide user vector store"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = UserVectorStore()
+        return _store
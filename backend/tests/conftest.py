@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend the way the app does: `from services import ...`
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.grant_catalog import GRANT_FIELDS
+
+
+@pytest.fixture
+def make_grant():
+    """Factory for catalog grant dicts: every GRANTS field None unless given"""
+    def make(**fields):
+        grant = dict.fromkeys(GRANT_FIELDS)
+        grant.update(deadline_kind="rolling", region="ontario")
+        grant.update(fields)
+        return grant
+    return make
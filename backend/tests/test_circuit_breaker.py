@@ -0,0 +1,46 @@
+import asyncio
+
+import pytest
+
+from services import circuit_breaker, matching_service
+
+
+@pytest.fixture
+def breaker(monkeypatch):
+    breaker = circuit_breaker.CircuitBreaker("test", failure_threshold=1, reset_timeout=0)
+    monkeypatch.setattr(circuit_breaker, "get_breaker", lambda name: breaker)
+    return breaker
+
+
+def test_a_cancelled_half_open_trial_frees_the_slot(breaker, monkeypatch):
+    breaker.record_failure()
+    assert breaker.state == circuit_breaker.OPEN
+    started = None
+
+    async def hanging_embed(text, timeout=None):
+        started.set()
+        await asyncio.Event().wait()
+
+    monkeypatch.setattr(matching_service.embedding_batcher, "embed", hanging_embed)
+
+    async def scenario():
+        nonlocal started
+        started = asyncio.Event()
+        trial = asyncio.create_task(matching_service._user_embedding("summary"))
+        await started.wait()
+        assert breaker.state == circuit_breaker.HALF_OPEN
+        assert not breaker.allow()          # the trial holds the slot
+        trial.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await trial
+
+    asyncio.run(scenario())
+    assert breaker.state == circuit_breaker.HALF_OPEN
+    assert breaker.allow()
+
+
+def test_release_leaves_a_closed_breaker_alone(breaker):
+    assert breaker.allow()
+    breaker.release()
+    assert breaker.state == circuit_breaker.CLOSED
+    assert breaker.failures == 0
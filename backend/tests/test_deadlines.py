@@ -0,0 +1,43 @@
+from datetime import date
+
+import pytest
+
+from services import deadlines, grant_catalog
+from services.deadlines import DATE, ROLLING, UNKNOWN, parse_deadline
+
+
+@pytest.mark.parametrize("text", [
+    "Rolling; next review September 30, 2024",
+    "Ongoing intake - applications reviewed 2024-03-01",
+    "Open until filled (first review 15/01/2024)",
+])
+def test_rolling_wording_wins_over_mentioned_dates(text):
+    assert parse_deadline(text) == (None, ROLLING)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Open until March 31, 2026", date(2026, 3, 31)),
+    ("March 2026", date(2026, 3, 31)),
+    ("Applications close in Feb. 2028", date(2028, 2, 29)),
+    ("15/04/2026", date(2026, 4, 15)),
+    ("04-15-2026", date(2026, 4, 15)),
+    ("04/05/2026", date(2026, 5, 4)),          # ambiguous: the later reading
+    ("2026/04/15", date(2026, 4, 15)),
+    ("28 October 2025", date(2025, 10, 28)),   # not widened to the end of the month
+])
+def test_dates(text, expected):
+    assert parse_deadline(text) == (expected, DATE)
+
+
+@pytest.mark.parametrize("text", [None, "", "Spring 2026", "13/13/2026", "See website"])
+def test_unknown(text):
+    assert parse_deadline(text) == (None, UNKNOWN)
+
+
+def test_catalog_reparses_rolling_rows_stored_as_dates(make_grant):
+    grant = make_grant(deadline="Rolling; next review September 30, 2024",
+                       deadline_date=date(2024, 9, 30), deadline_kind=DATE)
+    row = tuple(grant[field] for field in grant_catalog.GRANT_FIELDS)
+    loaded = grant_catalog._row_to_grant(row)
+    assert (loaded["deadline_date"], loaded["deadline_kind"]) == (None, ROLLING)
+    assert deadlines.is_rolling(grant["deadline"])
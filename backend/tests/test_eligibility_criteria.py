@@ -0,0 +1,67 @@
+import pandas as pd
+
+from services import eligibility_criteria
+
+
+def test_category_label_does_not_make_a_grant_student_only():
+    # "Creative Research and Arts Fellowship for Mid-Career Innovators"
+    criteria = eligibility_criteria.extract_criteria(
+        "Arts, Culture, History & Humanities; College Scholarship; Individual; Individuals",
+        "Funding for researchers, graduate students, and sometimes faculty.",
+    )
+    assert criteria["student_only"] is False
+
+
+def test_students_in_description_do_not_make_a_grant_student_only():
+    criteria = eligibility_criteria.extract_criteria(
+        "Open to all Ontario residents", "Past recipients include students who must be enrolled elsewhere.",
+    )
+    assert criteria["student_only"] is False
+
+
+def test_stated_enrolment_requirement_is_student_only():
+    assert eligibility_criteria.extract_criteria("Applicants must be enrolled full-time")["student_only"] is True
+    assert eligibility_criteria.extract_criteria("Full-time students only")["student_only"] is True
+
+
+def test_working_in_the_north_is_not_a_region_restriction():
+    # "Winter Roads Program: Bridges and Culverts Stream"
+    criteria = eligibility_criteria.extract_criteria(
+        "Project funding is open to remote communities in Northern Ontario that are not connected "
+        "to a provincial highway network by an all-season road.",
+        "Projects are located on the Ontario winter roads network, which provides vital seasonal "
+        "connections between the Far North and the provincial highway network.",
+    )
+    assert criteria["region"] == "ontario"
+
+
+def test_northern_ontario_in_description_only_is_not_a_region_restriction():
+    criteria = eligibility_criteria.extract_criteria("Individuals", "Applicants must be located in Northern Ontario")
+    assert criteria["region"] == "ontario"
+
+
+def test_stated_residency_requirement_is_a_region_restriction():
+    criteria = eligibility_criteria.extract_criteria("Applicants must be residents of Northern Ontario")
+    assert criteria["region"] == "northern_ontario"
+
+
+def test_columns_match_single_grant_extraction():
+    eligibility = pd.Series(["Ages 15 to 29", "18 or older; household income below $50,000", None, "veterans"])
+    description = pd.Series(["", "newcomers welcome", None, None])
+    frame = eligibility_criteria.extract_criteria_columns(eligibility, description)
+    for i in range(len(eligibility)):
+        assert frame.iloc[i].to_dict() == eligibility_criteria.extract_criteria(eligibility[i], description[i])
+    assert frame["age_min"].tolist() == [15.0, 18.0, None, None]
+    assert frame["age_max"].tolist() == [29.0, None, None, None]
+    assert frame["income_max"].tolist() == [None, 50000.0, None, None]
+    assert frame["newcomer"].tolist() == [False, True, False, False]
+    assert frame["veteran"].tolist() == [False, False, False, True]
+
+
+def test_demographic_flags_use_the_original_boost_terms():
+    flags = ["newcomer", "indigenous", "veteran"]
+    matched = eligibility_criteria.extract_criteria("Immigrant, First Nations and military applicants")
+    assert [matched[f] for f in flags] == [True, True, True]
+    # Terms the original boosts never matched stay unmatched
+    unmatched = eligibility_criteria.extract_criteria("Refugees, Métis and Inuit youth, Canadian Armed Forces members")
+    assert [unmatched[f] for f in flags] == [False, False, False]
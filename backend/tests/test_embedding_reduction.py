@@ -0,0 +1,30 @@
+import numpy as np
+
+from services import embedding_reduction
+
+
+def _grants(n=40, rank=12, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    matrix = rng.standard_normal((n, rank)) @ rng.standard_normal((rank, dim)) + 3.0
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def test_dims_at_the_fit_rank_keep_every_ranking():
+    # Why the benchmark skips dim >= rank: the catalog lies in the projected subspace
+    grants = _grants()
+    rank = np.linalg.matrix_rank(grants)
+    queries = np.random.default_rng(1).standard_normal((10, grants.shape[1])).astype(np.float32)
+    projection = embedding_reduction.fit_projection(grants, rank)
+    reduced = projection.apply(queries) @ projection.apply(grants).T
+    overlap = embedding_reduction.top_k_overlap(queries @ grants.T, reduced, k=5)
+    assert overlap.tolist() == [1.0] * len(queries)
+
+
+def test_centered_fit_removes_the_mean_direction():
+    grants = _grants()
+    mean = grants.mean(axis=0) / np.linalg.norm(grants.mean(axis=0))
+    uncentered = embedding_reduction.fit_projection(grants, 1)
+    centered = embedding_reduction.fit_projection(grants, 1, centered=True)
+    assert abs(float(uncentered.components[0] @ mean)) > 0.9
+    assert abs(float(centered.components[0] @ mean)) < 0.5
+    assert centered.apply(grants).shape == (len(grants), 1)
@@ -0,0 +1,83 @@
+import re
+
+import pytest
+
+from services import grant_catalog, snowflake_service
+
+ORIGINAL_COLUMNS = [
+    "source", "grant_id", "program_name", "description", "summary", "deadline", "funding_low",
+    "funding_high", "eligibility", "interests", "application_process", "contact", "url", "scraped_at",
+]
+ROWS = {
+    "program_name": "Youth Fund",
+    "description": "Support for young people",
+    "eligibility": "Ages 15 to 29; must be enrolled full-time",
+    "funding_low": "100",
+    "funding_high": "500",
+    "deadline": "Ongoing",
+    "source": "Ontario",
+    "url": "https://example.org/youth",
+}
+
+
+class FakeWarehouse:
+    """GRANTS as created before the derived columns existed"""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self.queries = []
+
+    def get_connection(self):
+        return self
+
+    def cursor(self):
+        return self
+
+    def close(self):
+        pass
+
+    def execute(self, sql, params=None):
+        self.queries.append(sql)
+        if "INFORMATION_SCHEMA" in sql:
+            self.result = [(c,) for c in self.columns]
+            return
+        select = sql.split("FROM")[0].replace("SELECT", "")
+        fields = [f.strip() for f in select.split(",")]
+        for field in fields:
+            if not re.match(r"NULL AS \w+$", field) and field not in self.columns:
+                raise RuntimeError(f"SQL compilation error: invalid identifier '{field.upper()}'")
+        self.result = [tuple(None if f.startswith("NULL AS") else ROWS.get(f) for f in fields)]
+
+    def fetchall(self):
+        return self.result
+
+
+@pytest.fixture
+def warehouse(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)                       # no published embeddings / version
+    monkeypatch.setattr(grant_catalog, "_schema_complete", False)
+
+    def use(columns):
+        fake = FakeWarehouse(columns)
+        monkeypatch.setattr(snowflake_service, "get_connection", fake.get_connection)
+        return fake
+    return use
+
+
+def test_catalog_loads_from_table_without_derived_columns(warehouse):
+    warehouse(ORIGINAL_COLUMNS)
+    catalog = grant_catalog.load_catalog()
+
+    grant = catalog.grants[0]
+    assert grant["deadline_kind"] == "rolling"
+    assert (grant["age_min"], grant["age_max"]) == (15.0, 29.0)
+    assert grant["student_only"] is True
+    assert grant["region"] == "ontario"
+    assert catalog.eligible_mask(age=40).tolist() == [False]
+
+
+def test_schema_is_not_rechecked_once_complete(warehouse):
+    fake = warehouse(ORIGINAL_COLUMNS + grant_catalog.DERIVED_FIELDS)
+    grant_catalog.load_catalog()
+    grant_catalog.load_catalog()
+    assert sum("INFORMATION_SCHEMA" in q for q in fake.queries) == 1
@@ -0,0 +1,30 @@
+import pandas as pd
+import pyarrow.parquet as pq
+import pytest
+
+from services import grant_stream
+from services.grant_normalize import SNOWFLAKE_COLUMNS
+
+
+def _cleaned(scraped_at):
+    rows = []
+    for i, value in enumerate(scraped_at):
+        row = dict.fromkeys(SNOWFLAKE_COLUMNS, "")
+        row.update(program_name=f"Grant {i}", scraped_at=value)
+        rows.append(row)
+    return pd.DataFrame(rows, columns=SNOWFLAKE_COLUMNS)
+
+
+def test_mixed_isoformat_precision_keeps_every_timestamp(tmp_path):
+    # datetime.isoformat() drops the fraction when microsecond == 0
+    values = ["2025-10-01T12:00:00", "2025-10-01T12:00:01.250000", "2025-10-01T12:00:02+00:00", ""]
+    path = grant_stream.write_parquet_batch(_cleaned(values), tmp_path, 0)
+    stored = pq.read_table(path).column("scraped_at").to_pylist()
+    assert [ts.isoformat() if ts else None for ts in stored] == [
+        "2025-10-01T12:00:00", "2025-10-01T12:00:01.250000", "2025-10-01T12:00:02", None,
+    ]
+
+
+def test_unparseable_timestamps_are_an_error():
+    with pytest.raises(ValueError, match="scraped_at"):
+        grant_stream.to_typed_frame(_cleaned(["2025-10-01T12:00:00", "last Tuesday"]))
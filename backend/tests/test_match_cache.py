@@ -0,0 +1,58 @@
+import pytest
+
+from services import grant_catalog, match_cache
+from services.grant_catalog import GrantCatalog
+
+PROFILE = {"project_summary": "community garden", "age": 30, "eligibility_tags": '["youth"]'}
+
+
+@pytest.fixture
+def backend_path(tmp_path):
+    return str(tmp_path / "match_cache.sqlite3")
+
+
+def _worker(path):
+    """A worker process's cache: its own memory, the shared SQLite file"""
+    return match_cache.MatchCache(match_cache.SqliteBackend(path))
+
+
+def test_profile_save_on_one_worker_is_seen_by_another(backend_path):
+    a, b = _worker(backend_path), _worker(backend_path)
+    old_hash = match_cache.profile_hash(PROFILE)
+    a.remember_profile("u1", old_hash)
+    a.put("u1", old_hash, "v1", "r1", [["g1", 0.9]])
+    assert a.get("u1", a.known_profile_hash("u1"), "v1", "r1") == [["g1", 0.9]]
+
+    changed = dict(PROFILE, project_summary="solar panels")
+    b.invalidate_user("u1", changed)
+
+    assert a.known_profile_hash("u1") == match_cache.profile_hash(changed)
+    assert a.get("u1", a.known_profile_hash("u1"), "v1", "r1") is None
+
+
+def test_unpublished_cache_version_is_stable_until_content_changes(make_grant):
+    first = GrantCatalog([make_grant(program_name="A"), make_grant(program_name="B")])
+    reloaded = GrantCatalog([make_grant(program_name="A"), make_grant(program_name="B")])
+    changed = GrantCatalog([make_grant(program_name="A"), make_grant(program_name="C")])
+    assert first.cache_version == reloaded.cache_version
+    assert first.cache_version != changed.cache_version
+    assert GrantCatalog([make_grant(program_name="A")], version="run-1").cache_version == "run-1"
+
+
+def test_catalog_reload_with_new_version_purges_other_versions(monkeypatch, backend_path, make_grant):
+    cache = _worker(backend_path)
+    monkeypatch.setattr(match_cache, "_cache", cache)
+    catalogs = iter([GrantCatalog([make_grant(program_name=name)]) for name in "AAB"])
+    monkeypatch.setattr(grant_catalog, "load_catalog", lambda: next(catalogs))
+    monkeypatch.setattr(grant_catalog, "_catalog", None)
+
+    first = grant_catalog.get_catalog()
+    cache.put("u1", "h", first.cache_version, "r1", [["g1", 0.9]])
+
+    # Same content on reload: the entry survives
+    assert grant_catalog.get_catalog(force=True).cache_version == first.cache_version
+    assert cache.backend.get(cache._key("u1", "h", first.cache_version, "r1", None)) is not None
+
+    # Changed content: the old version's rows are purged
+    grant_catalog.get_catalog(force=True)
+    assert cache.backend.get(cache._key("u1", "h", first.cache_version, "r1", None)) is None
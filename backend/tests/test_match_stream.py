@@ -0,0 +1,53 @@
+import asyncio
+import json
+
+from routers import match as match_router
+from services.grant_catalog import GrantCatalog
+
+
+def _events(chunks):
+    return [json.loads(line) for chunk in chunks for line in chunk.splitlines() if line]
+
+
+def test_start_is_sent_before_the_ranking_finishes(monkeypatch, make_grant):
+    catalog = GrantCatalog([make_grant(id=1, program_name="Arts grant"), make_grant(id=2, program_name="Tech grant")])
+
+    async def scenario():
+        release, ranking_done = asyncio.Event(), False
+
+        async def slow_rank(user_id, boost_closing_soon=False):
+            nonlocal ranking_done
+            await release.wait()
+            ranking_done = True
+            return catalog, [(1, 0.9), (0, 0.5)], False
+
+        monkeypatch.setattr(match_router, "cached_rank_user_grants", slow_rank)
+        response = await asyncio.wait_for(match_router.stream_matches("u1"), timeout=1)
+        body = response.body_iterator
+
+        first = await asyncio.wait_for(body.__anext__(), timeout=1)
+        assert not ranking_done
+        release.set()
+        rest = [chunk async for chunk in body]
+        return _events([first]), _events(rest)
+
+    first, rest = asyncio.run(scenario())
+    assert first == [{"type": "start", "user_id": "u1"}]
+    assert [e["type"] for e in rest] == ["meta", "match", "match", "done"]
+    assert rest[0] == {"type": "meta", "user_id": "u1", "total": 2, "degraded": False}
+    assert rest[1]["program_name"] == "Tech grant"
+
+
+def test_ranking_failure_ends_the_stream_with_an_error(monkeypatch):
+    async def failing_rank(user_id, boost_closing_soon=False):
+        raise RuntimeError("warehouse unavailable")
+
+    async def scenario():
+        monkeypatch.setattr(match_router, "cached_rank_user_grants", failing_rank)
+        response = await match_router.stream_matches("u1", format="sse")
+        return [chunk async for chunk in response.body_iterator]
+
+    chunks = asyncio.run(scenario())
+    assert chunks[0].startswith("event: start\n")
+    assert chunks[-1].startswith("event: error\n")
+    assert len(chunks) == 2
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from services import scrape_http
+from services.scrape_sources import CrawlScheduler, FetchJob, GrantSource
+
+
+def test_configure_updates_the_budget_workers_already_hold():
+    budgets = scrape_http.HostBudgets()
+    held = budgets.budget_for("example.org")             # a lane picked up the default first
+    assert budgets.configure("example.org", rate=5, burst=3, concurrency=4) is held
+    assert (held.bucket.rate, held.bucket.capacity, held.concurrency) == (5, 3, 4)
+
+    # A second source on the same host: strictest wins
+    budgets.configure("example.org", rate=2, burst=5, concurrency=1)
+    assert (held.bucket.rate, held.bucket.capacity, held.concurrency) == (2, 3, 1)
+
+
+def test_budgets_are_scoped_to_a_run():
+    strict = scrape_http.HostBudgets()
+    strict.configure("example.org", rate=0.5, burst=1, concurrency=1)
+    looser = scrape_http.HostBudgets().configure("example.org", rate=4, burst=2, concurrency=3)
+    assert (looser.bucket.rate, looser.concurrency) == (4, 3)
+
+
+def test_slots_follow_a_tightened_concurrency():
+    budget = scrape_http.HostBudget("example.org", rate=100, concurrency=2)
+    budget.update(rate=100, burst=1, concurrency=1)
+    entered = []
+
+    def request():
+        with budget.slot():
+            entered.append(time.monotonic())
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert entered[1] - entered[0] >= 0.04
+
+
+class PortalSource(GrantSource):
+    name = "Portal"
+    rate, burst, concurrency = 50, 4, 3
+
+    def start_jobs(self, state=None):
+        return [FetchJob(self, "https://listings.example.org/")]
+
+    def fetch(self, job, state=None):
+        return job.url
+
+    def parse(self, job, raw, state=None):
+        if job.kind == "page":
+            yield FetchJob(self, "https://details.example.org/1", kind="detail")
+        else:
+            yield {"program_name": "Detail grant", "url": job.url}
+
+
+def test_follow_up_hosts_get_the_source_budget():
+    scheduler = CrawlScheduler()
+    results = scheduler.run([PortalSource()])
+    assert [g["program_name"] for g in results["Portal"]] == ["Detail grant"]
+    detail = scheduler.budgets.budget_for("details.example.org")
+    assert (detail.bucket.rate, detail.bucket.capacity, detail.concurrency) == (50, 4, 3)
@@ -0,0 +1,87 @@
+import pandas as pd
+import pytest
+
+from services import consolidated_scraper, scrape_state, snowflake_uploader
+from services.scrape_sources import STANDARD_COLUMNS
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+def _grant(name):
+    grant = dict.fromkeys(STANDARD_COLUMNS)
+    grant.update(source="Ontario", url=f"https://example.org/{name}", program_name=name, description="Funding")
+    return grant
+
+
+class FakeScheduler:
+    def __init__(self, state=None, **kwargs):
+        pass
+
+    def stream(self, sources):
+        yield from [_grant("a"), _grant("b")]
+
+
+def test_streaming_never_saves_the_shared_state(workdir, monkeypatch):
+    monkeypatch.setattr(consolidated_scraper, "CrawlScheduler", FakeScheduler)
+    monkeypatch.setattr(consolidated_scraper, "get_sources", lambda names, options: [])
+    state = consolidated_scraper.pending_state()
+    grants = list(consolidated_scraper.stream_all_sources(state=state))
+    assert [g["program_name"] for g in grants] == ["a", "b"]
+    assert len(state["grants"]) == 2
+    assert not (workdir / scrape_state.STATE_FILE).exists()
+
+
+def _pending_csv(workdir):
+    csv_file = "ontario_grants_consolidated_test.csv"
+    pd.DataFrame([_grant("a")], columns=STANDARD_COLUMNS).to_csv(csv_file, index=False)
+    state = scrape_state.empty_state()
+    scrape_state.filter_changed_grants(state, [_grant("a")])
+    scrape_state.save_state(state, scrape_state.pending_path(csv_file))
+    return csv_file
+
+
+def test_failed_upload_keeps_the_state_pending(workdir, monkeypatch):
+    csv_file = _pending_csv(workdir)
+
+    def no_connection():
+        raise RuntimeError("warehouse unavailable")
+
+    monkeypatch.setattr(snowflake_uploader, "get_connection", no_connection)
+    snowflake_uploader.upload_csv_to_snowflake(csv_file)
+    assert not (workdir / scrape_state.STATE_FILE).exists()
+    assert (workdir / scrape_state.pending_path(csv_file)).exists()
+
+
+def test_successful_upload_commits_the_state(workdir, monkeypatch):
+    csv_file = _pending_csv(workdir)
+
+    class Warehouse:
+        def cursor(self):
+            return self
+
+        def execute(self, sql, params=None):
+            pass
+
+        def executemany(self, sql, records):
+            pass
+
+        def fetchone(self):
+            return (1,)
+
+        def fetchall(self):
+            return []
+
+        def commit(self):
+            pass
+
+        def close(self):
+            pass
+
+    monkeypatch.setattr(snowflake_uploader, "get_connection", Warehouse)
+    snowflake_uploader.upload_csv_to_snowflake(csv_file)
+    assert len(scrape_state.load_state()["grants"]) == 1
+    assert not (workdir / scrape_state.pending_path(csv_file)).exists()
@@ -0,0 +1,57 @@
+import pandas as pd
+
+from services import snowflake_uploader
+from services.grant_catalog import grant_id
+from services.grant_normalize import SNOWFLAKE_COLUMNS
+
+
+class RecordingCursor:
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=None):
+        self.statements.append((sql.strip(), None))
+
+    def executemany(self, sql, records):
+        self.statements.append((sql.strip(), list(records)))
+
+
+def _row(name, description, url="https://example.org/fund"):
+    row = dict.fromkeys(SNOWFLAKE_COLUMNS)
+    row.update(source="Ontario", url=url, program_name=name, description=description)
+    return row
+
+
+def test_changed_grants_replace_their_old_rows():
+    df = pd.DataFrame([
+        _row("Youth Fund", "old text"),
+        _row(" youth fund ", "new text"),          # same grant, later version
+        _row("Arts Fund", "arts", url=None),
+    ], columns=SNOWFLAKE_COLUMNS)
+    cur = RecordingCursor()
+    assert snowflake_uploader.insert_grants(cur, df) == 2
+
+    sql = [statement for statement, _ in cur.statements]
+    assert sql[0] == "BEGIN"
+    assert sql[1] == f"DELETE FROM {snowflake_uploader.STAGE_TABLE}"
+    assert sql[2].startswith(f"INSERT INTO {snowflake_uploader.STAGE_TABLE}")
+    assert sql[3].startswith("DELETE FROM FUND_DB.PUBLIC.GRANTS t USING")
+    assert all(f"COALESCE(t.{c}, '')" in sql[3] for c in snowflake_uploader.GRANT_KEY)
+    assert sql[4].startswith("INSERT INTO FUND_DB.PUBLIC.GRANTS")
+
+    staged = cur.statements[2][1]
+    description = SNOWFLAKE_COLUMNS.index("description")
+    assert [r[description] for r in staged] == ["new text", "arts"]
+    assert staged[1][SNOWFLAKE_COLUMNS.index("url")] is None
+
+
+def test_upsert_identity_matches_the_catalog_grant_id():
+    a, b = _row("Youth Fund", "x"), _row(" YOUTH FUND", "y")
+    assert snowflake_uploader._key(a) == snowflake_uploader._key(b)
+    assert grant_id(a) == grant_id(b)
+
+
+def test_empty_batch_touches_nothing():
+    cur = RecordingCursor()
+    assert snowflake_uploader.insert_grants(cur, pd.DataFrame(columns=SNOWFLAKE_COLUMNS)) == 0
+    assert cur.statements == []
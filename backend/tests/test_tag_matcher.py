@@ -0,0 +1,30 @@
+import numpy as np
+
+from services import grant_catalog, tag_matcher
+from services.grant_catalog import GrantCatalog
+
+
+def test_counts_match_a_substring_scan_per_tag(make_grant):
+    catalog = GrantCatalog([
+        make_grant(description="Funding for Women in technology", eligibility="Students; Women"),
+        make_grant(description="Arts council grant"),
+        make_grant(eligibility="Indigenous youth"),
+    ])
+    tags = ["women", " Students ", "youth", "", "women"]
+    counts = tag_matcher.tag_counts(catalog, tags, np.array([0, 1, 2]))
+    assert counts.tolist() == [3.0, 0.0, 1.0]      # "women" listed twice counts twice
+    assert tag_matcher.tag_counts(catalog, tags, np.array([2])).tolist() == [1.0]
+
+
+def test_no_tags_count_zero(make_grant):
+    catalog = GrantCatalog([make_grant(description="anything", eligibility="anyone")])
+    assert tag_matcher.tag_counts(catalog, [], np.array([0])).tolist() == [0.0]
+
+
+def test_tag_mask_cache_keeps_the_most_recently_used_tags(make_grant, monkeypatch):
+    monkeypatch.setattr(grant_catalog, "MAX_TAG_MASKS", 2)
+    catalog = GrantCatalog([make_grant(description="women in tech", eligibility="youth")])
+    for tag in ["women", "youth", "women", "tech"]:
+        catalog.tag_mask(tag)
+    assert list(catalog._tag_masks) == ["women", "tech"]
+    assert catalog.tag_mask("youth").tolist() == [True]